@@ -0,0 +1,178 @@
+# instrumentation.py
+
+import json
+import time
+
+class NullTimer:
+    """A timer that does nothing, returned while instrumentation is disabled."""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+NULL_TIMER = NullTimer()
+
+class Timer:
+    """A context manager that records how long its block took into an Instrumentation."""
+    __slots__ = ("instrumentation", "name", "start")
+
+    def __init__(self, instrumentation, name):
+        self.instrumentation = instrumentation
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.instrumentation.record(self.name, time.perf_counter() - self.start)
+        return False
+
+class Instrumentation:
+    """A class representing opt-in counters and timers for the race pipeline.
+    While disabled, timer() returns a shared no-op context manager and count()
+    returns straight away, so the instrumented code pays one attribute check.
+    Methods:
+        __init__(): Initializes disabled instrumentation
+        enable(): Starts collecting counters and timers
+        disable(): Stops collecting
+        reset(): Clears everything collected so far
+        count(): Adds to a counter
+        timer(): Returns a context manager that times its block
+        record(): Adds one duration to a timer
+        profile_next_race(): Attaches a profiler around the next race
+        race_profile(): Returns the context manager armed by profile_next_race
+        snapshot(): Returns the counters and timer statistics as a dictionary
+        export_jsonl(): Appends a snapshot to a JSON-lines file
+    """
+
+    def __init__(self):
+        """Initializes Instrumentation
+        Attributes:
+            enabled: Whether counters and timers are collected
+            counters: Counter name -> count
+            timers: Timer name -> [count, total seconds, max seconds]
+            profile_hook: Function returning a context manager to wrap the next race in
+            last_profile: pstats.Stats of the last race profiled with cProfile
+        """
+        self.enabled = False
+        self.counters = {}
+        self.timers = {}
+        self.profile_hook = None
+        self.last_profile = None
+
+    def enable(self):
+        """Starts collecting counters and timers"""
+        self.enabled = True
+
+    def disable(self):
+        """Stops collecting counters and timers, keeping what was collected"""
+        self.enabled = False
+
+    def reset(self):
+        """Clears every counter and timer"""
+        self.counters = {}
+        self.timers = {}
+
+    def count(self, name, amount=1):
+        """Adds 'amount' to counter 'name'
+        Args:
+            name (str): counter name
+            amount (int): amount to add
+        Returns:
+            None
+        """
+        if self.enabled:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def timer(self, name):
+        """Returns a context manager that records the duration of its block under 'name'
+        Args:
+            name (str): timer name
+        Returns:
+            Timer, or NULL_TIMER while disabled
+        """
+        return Timer(self, name) if self.enabled else NULL_TIMER
+
+    def record(self, name, seconds):
+        """Adds one duration to timer 'name'
+        Args:
+            name (str): timer name
+            seconds (float): duration
+        Returns:
+            None
+        """
+        stats = self.timers.get(name)
+        if stats is None:
+            self.timers[name] = [1, seconds, seconds]
+        else:
+            stats[0] += 1
+            stats[1] += seconds
+            if seconds > stats[2]:
+                stats[2] = seconds
+
+    def profile_next_race(self, hook=None):
+        """Attaches 'hook' around the next race's start_race. Works whether or not
+        counters and timers are enabled.
+        Args:
+            hook: function returning a context manager, defaults to cprofile
+        Returns:
+            None
+        """
+        self.profile_hook = hook or self.cprofile
+
+    def race_profile(self):
+        """Returns the context manager armed by profile_next_race, or NULL_TIMER, and disarms it"""
+        hook, self.profile_hook = self.profile_hook, None
+        return hook() if hook is not None else NULL_TIMER
+
+    def cprofile(self):
+        """Returns a context manager that runs cProfile and stores the stats in last_profile"""
+        import cProfile
+        import pstats
+        instrumentation = self
+
+        class CProfileHook:
+            def __enter__(self):
+                self.profiler = cProfile.Profile()
+                self.profiler.enable()
+                return self.profiler
+
+            def __exit__(self, *exc_info):
+                self.profiler.disable()
+                instrumentation.last_profile = pstats.Stats(self.profiler)
+                return False
+
+        return CProfileHook()
+
+    def snapshot(self):
+        """Returns the counters and timers as a dictionary
+        Args:
+            self: Instrumentation
+        Returns:
+            dict: {"counters": {name: count}, "timers": {name: {count, total, mean, max}}}
+        """
+        return {
+            "counters": dict(self.counters),
+            "timers": {
+                name: {"count": count, "total": total, "mean": total / count, "max": maximum}
+                for name, (count, total, maximum) in self.timers.items()
+            },
+        }
+
+    def export_jsonl(self, path, **labels):
+        """Appends the current snapshot to 'path' as one JSON line
+        Args:
+            path: JSON-lines file
+            labels: extra fields stored with the snapshot, such as a race ID
+        Returns:
+            None
+        """
+        line = {"time": time.time(), **labels, **self.snapshot()}
+        with open(path, "a") as jsonl_file:
+            jsonl_file.write(json.dumps(line) + "\n")
+
+instrumentation = Instrumentation() # shared by the whole pipeline, disabled until enable() is called
@@ -0,0 +1,253 @@
+# data_cache.py
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import numpy as np
+from horse_race_simulator.instrumentation import instrumentation
+
+CACHE_VERSION = 2
+MANIFEST_NAME = "manifest.json"
+COMPLETE_NAME = "complete" # written into a data directory once its manifest has been published
+# directory that contains the package, where the bundled runs.csv lives
+DATA_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+def resolve_data_path(csv_filename):
+    """Returns 'csv_filename' if it exists from the working directory, otherwise the
+    bundled file of that name next to the package, so the data set is found from any
+    working directory
+    Args:
+        csv_filename: CSV data set such as runs.csv
+    Returns:
+        str: path to the data set
+    """
+    if os.path.isabs(csv_filename) or os.path.exists(csv_filename):
+        return csv_filename
+    bundled = os.path.join(DATA_DIR, csv_filename)
+    return bundled if os.path.exists(bundled) else csv_filename
+
+class DataCache:
+    """A class representing a binary columnar cache of a CSV data set such as runs.csv.
+    Numeric columns are downcast to the smallest dtype that holds them exactly and text
+    columns are stored as categorical codes. Each column is a .npy file that is
+    memory-mapped on load, so only the columns a caller asks for are read. The column
+    files of each build go in their own data directory that the manifest points at, so
+    a rebuild never removes files a reader is about to open, and only data directories
+    of finished builds that the current manifest no longer names are removed.
+    pandas is only imported when a data set is actually loaded.
+    Methods:
+        __init__(): Initializes the cache for a data set
+        is_fresh(): Checks the cache against the source file's mtime, size and hash
+        build(): Converts the source CSV into the cache
+        load(): Returns the data set as a DataFrame, rebuilding the cache if needed
+    """
+
+    def __init__(self, csv_filename, cache_dir=None):
+        """Initializes DataCache
+        Args:
+            csv_filename: CSV data set to cache, see resolve_data_path
+            cache_dir: Directory holding the cache, defaults to '<csv_filename>.cache'
+        """
+        self.csv_filename = resolve_data_path(csv_filename)
+        self.cache_dir = cache_dir or f"{self.csv_filename}.cache"
+        self.manifest_path = os.path.join(self.cache_dir, MANIFEST_NAME)
+
+    def file_hash(self):
+        """Returns the sha256 hash of the source file"""
+        digest = hashlib.sha256()
+        with open(self.csv_filename, "rb") as source:
+            for block in iter(lambda: source.read(1 << 20), b""):
+                digest.update(block)
+        return digest.hexdigest()
+
+    def read_manifest(self):
+        """Returns the cache manifest, or None if there is no usable cache"""
+        try:
+            with open(self.manifest_path) as manifest_file:
+                manifest = json.load(manifest_file)
+        except (OSError, ValueError):
+            return None
+        if manifest.get("version") != CACHE_VERSION:
+            return None
+        return manifest
+
+    def is_fresh(self, manifest):
+        """Checks whether the cache matches the source file. The mtime and size are
+        compared first; if they changed, the file hash decides, and a matching hash
+        only refreshes the recorded mtime instead of rebuilding.
+        Args:
+            manifest (dict): cache manifest from read_manifest
+        Returns:
+            bool: True if the cache can be used
+        """
+        if manifest is None:
+            return False
+        stat = os.stat(self.csv_filename)
+        if manifest["mtime_ns"] == stat.st_mtime_ns and manifest["size"] == stat.st_size:
+            return True
+        if manifest["sha256"] != self.file_hash():
+            return False
+        manifest["mtime_ns"] = stat.st_mtime_ns
+        manifest["size"] = stat.st_size
+        try:
+            self.write_manifest(self.cache_dir, manifest)
+        except OSError:
+            pass # a read-only cache is still valid
+        return True
+
+    def write_manifest(self, directory, manifest):
+        """Writes 'manifest' into 'directory'"""
+        temp_path = os.path.join(directory, f"{MANIFEST_NAME}.{os.getpid()}.tmp")
+        with open(temp_path, "w") as manifest_file:
+            json.dump(manifest, manifest_file)
+        os.replace(temp_path, os.path.join(directory, MANIFEST_NAME))
+
+    def compact_frame(self, data_frame):
+        """Downcasts numeric columns and dictionary encodes text columns. Float columns
+        become float32 only when every value survives the round trip, so the cache
+        returns the values of the CSV.
+        Args:
+            data_frame (DataFrame): data set parsed from the CSV
+        Returns:
+            DataFrame: the same data with compact dtypes
+        """
+        import pandas as pd
+        columns = {}
+        for name in data_frame.columns:
+            column = data_frame[name]
+            if column.dtype.kind in "iu":
+                columns[name] = pd.to_numeric(column, downcast="integer")
+            elif column.dtype.kind == "f":
+                narrow = column.astype(np.float32)
+                columns[name] = narrow if narrow.astype(np.float64).equals(column) else column
+            else:
+                columns[name] = column.astype("category")
+        return pd.DataFrame(columns)
+
+    def build(self):
+        """Converts the source CSV into the cache. The columns are written to a new data
+        directory and the manifest is then replaced to point at it, so readers see either
+        the old cache or the new one. The data directory is then marked complete, and
+        complete data directories that the manifest on disk does not name are removed.
+        A build still writing its columns has no mark yet, so concurrent builds never
+        remove each other's files, and a build that has published its manifest is only
+        removed once a later manifest has replaced it.
+        Args:
+            self: DataCache
+        Returns:
+            DataFrame: the compacted data set
+        """
+        import pandas as pd
+        stat = os.stat(self.csv_filename)
+        data_frame = self.compact_frame(pd.read_csv(self.csv_filename))
+        manifest = {
+            "version": CACHE_VERSION,
+            "mtime_ns": stat.st_mtime_ns,
+            "size": stat.st_size,
+            "sha256": self.file_hash(),
+            "columns": [],
+        }
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        data_dir = tempfile.mkdtemp(prefix="data-", dir=self.cache_dir)
+        manifest["data_dir"] = os.path.basename(data_dir)
+        for index, name in enumerate(data_frame.columns):
+            column = data_frame[name]
+            entry = {"name": name, "file": f"{index}.npy"}
+            if isinstance(column.dtype, pd.CategoricalDtype):
+                entry["categories"] = column.cat.categories.tolist()
+                values = column.cat.codes.to_numpy()
+            else:
+                values = column.to_numpy()
+            np.save(os.path.join(data_dir, entry["file"]), values)
+            manifest["columns"].append(entry)
+        self.write_manifest(self.cache_dir, manifest)
+        open(os.path.join(data_dir, COMPLETE_NAME), "w").close()
+        self.remove_old_builds()
+        return data_frame
+
+    def remove_old_builds(self):
+        """Removes the data directories of complete builds that the manifest on disk does
+        not name, and the column files of a version 1 cache. The directories are listed
+        before the manifest is read: a build marks its directory complete only after
+        publishing its manifest, so any directory found complete here is either the
+        current one or has been replaced by a later build.
+        Args:
+            self: DataCache
+        Returns:
+            None
+        """
+        names = os.listdir(self.cache_dir)
+        complete = [name for name in names if name.startswith("data-") and os.path.exists(os.path.join(self.cache_dir, name, COMPLETE_NAME))]
+        current = self.read_manifest()
+        if current is None:
+            return
+        for name in complete:
+            if name != current["data_dir"]:
+                shutil.rmtree(os.path.join(self.cache_dir, name), ignore_errors=True)
+        for name in names:
+            if name.endswith(".npy"): # column files of a version 1 cache
+                try:
+                    os.remove(os.path.join(self.cache_dir, name))
+                except FileNotFoundError:
+                    pass # removed by another build
+
+    def load(self, columns=None):
+        """Returns the data set, building or rebuilding the cache when the source changed.
+        If the cache cannot be written the compacted CSV is returned directly.
+        Args:
+            self: DataCache
+            columns (list): names of the columns to load, all columns if None
+        Returns:
+            DataFrame: the data set with compact dtypes
+        """
+        import pandas as pd
+        manifest = self.read_manifest()
+        for _ in range(2):
+            if not self.is_fresh(manifest):
+                break
+            try:
+                return self.read_columns(manifest, columns)
+            except FileNotFoundError:
+                # another process rebuilt the cache after the manifest was read
+                manifest = self.read_manifest()
+        try:
+            data_frame = self.build()
+        except FileNotFoundError:
+            raise
+        except OSError: # cache directory not writable
+            data_frame = self.compact_frame(pd.read_csv(self.csv_filename))
+        return data_frame if columns is None else data_frame[list(columns)]
+
+    def read_columns(self, manifest, columns=None):
+        """Memory-maps the columns of the data directory named in 'manifest'
+        Args:
+            manifest (dict): cache manifest from read_manifest
+            columns (list): names of the columns to load, all columns if None
+        Returns:
+            DataFrame: the data set with compact dtypes
+        """
+        import pandas as pd
+        data_dir = os.path.join(self.cache_dir, manifest["data_dir"])
+        entries = {entry["name"]: entry for entry in manifest["columns"]}
+        data = {}
+        for name in (columns if columns is not None else entries):
+            entry = entries[name]
+            values = np.load(os.path.join(data_dir, entry["file"]), mmap_mode="r")
+            if "categories" in entry:
+                values = pd.Categorical.from_codes(values, categories=entry["categories"])
+            data[name] = values
+        return pd.DataFrame(data, copy=False)
+
+def load_runs(csv_filename="runs.csv", columns=None):
+    """Loads 'csv_filename' through its binary cache
+    Args:
+        csv_filename: CSV data set such as runs.csv, see resolve_data_path
+        columns (list): names of the columns to load, all columns if None
+    Returns:
+        DataFrame: the data set with compact dtypes
+    """
+    with instrumentation.timer("dataset_load"):
+        return DataCache(csv_filename).load(columns)
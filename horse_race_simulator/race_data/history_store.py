@@ -0,0 +1,207 @@
+# history_store.py
+
+import os
+import re
+import sqlite3
+from horse_race_simulator.race_data.data_cache import resolve_data_path
+from horse_race_simulator.race_data.horse_history import SECTION_COLUMNS
+
+# columns every store has, the rest of runs.csv is added on ingest
+CORE_COLUMNS = {
+    'race_id': 'INTEGER', 'horse_id': 'INTEGER', 'result': 'INTEGER', 'won': 'INTEGER', 'finish_time': 'REAL',
+    **{column: 'REAL' for column in SECTION_COLUMNS},
+    'jockey_id': 'INTEGER', 'trainer_id': 'INTEGER',
+}
+INDEXED_COLUMNS = ['horse_id', 'race_id', 'jockey_id', 'trainer_id']
+IDENTIFIER = re.compile(r"[A-Za-z_][A-Za-z0-9_]*")
+
+def check_table_name(table):
+    """Returns 'table' if it is a plain SQL identifier, since table names cannot be bound as query parameters
+    Args:
+        table (str): table name
+    Returns:
+        str: the table name
+    """
+    if not isinstance(table, str) or not IDENTIFIER.fullmatch(table):
+        raise ValueError(f"Invalid table name {table!r}, use letters, digits and underscores")
+    return table
+
+class HistoryStore:
+    """A class representing historical race results in an indexed SQLite file.
+    Lookups are index queries instead of filters over a DataFrame held in memory,
+    and the file is opened in WAL mode, so several worker processes can read it
+    while one writes. Each process opens its own connection on first use.
+    A horse has at most one run per race, so adding a race again replaces its runs.
+    Methods:
+        __init__(): Opens or creates the store
+        ingest_csv(): Loads a data set in the runs.csv format
+        add_results(): Adds the results of one simulated race
+        lookup(): Returns the historical stats for one horse
+        runs_for(): Returns the runs matching a horse, race, jockey or trainer
+        count(): Returns the number of stored runs
+        close(): Closes this process's connection
+    """
+
+    def __init__(self, path, table="runs"):
+        """Initializes HistoryStore, creating the table and indexes if needed
+        Args:
+            path: SQLite file
+            table (str): table holding the runs, 'runs' as written by ResultsWriter
+        """
+        self.path = path
+        self.table = check_table_name(table)
+        self._connection = None
+        self._pid = None
+        with self.connection:
+            self.connection.execute(f"CREATE TABLE IF NOT EXISTS {table} ({', '.join(f'{name} {kind}' for name, kind in CORE_COLUMNS.items())})")
+            self.add_missing_columns(CORE_COLUMNS) # tables written by ResultsWriter lack some core columns
+            for column in INDEXED_COLUMNS:
+                self.connection.execute(f"CREATE INDEX IF NOT EXISTS {table}_{column} ON {table} ({column})")
+            self.connection.execute(f"CREATE UNIQUE INDEX IF NOT EXISTS {table}_race_horse ON {table} (race_id, horse_id)")
+
+    @property
+    def connection(self):
+        """This process's connection, opened on first use and after a fork"""
+        if self._connection is None or self._pid != os.getpid():
+            self._connection = sqlite3.connect(self.path, timeout=30)
+            self._connection.execute("PRAGMA journal_mode=WAL") # readers do not block the writer or each other
+            self._connection.execute("PRAGMA synchronous=NORMAL")
+            self._pid = os.getpid()
+        return self._connection
+
+    def close(self):
+        """Closes this process's connection"""
+        if self._connection is not None and self._pid == os.getpid():
+            self._connection.close()
+        self._connection = None
+
+    def columns(self):
+        """Returns the names of the table's columns"""
+        return [row[1] for row in self.connection.execute(f"PRAGMA table_info({self.table})")]
+
+    def add_missing_columns(self, columns):
+        """Adds the columns of 'columns' (name -> SQLite type) that the table does not have"""
+        existing = set(self.columns())
+        for name, kind in columns.items():
+            if name not in existing:
+                self.connection.execute(f"ALTER TABLE {self.table} ADD COLUMN {name} {kind}")
+
+    def ingest_csv(self, csv_filename="runs.csv", chunksize=100000, if_empty=False):
+        """Appends every row of a data set in the runs.csv format, reading it in chunks
+        so the data set never has to fit in memory
+        Args:
+            csv_filename: data set to load, see resolve_data_path
+            chunksize (int): rows read and inserted at a time
+            if_empty (bool): load only into an empty table. The check and the load run in one
+                write transaction, so when several processes open a new store only one loads it
+        Returns:
+            int: number of rows added
+        """
+        import pandas as pd
+        chunks = pd.read_csv(resolve_data_path(csv_filename), chunksize=chunksize)
+        if if_empty:
+            with self.connection:
+                self.connection.execute("BEGIN IMMEDIATE") # holds the write lock from the check to the commit
+                if self.count():
+                    return 0
+                return sum(self.insert_chunk(chunk) for chunk in chunks)
+        added = 0
+        for chunk in chunks:
+            with self.connection:
+                added += self.insert_chunk(chunk)
+        return added
+
+    def insert_chunk(self, chunk):
+        """Inserts the rows of a runs.csv DataFrame, adding the columns the table lacks
+        Args:
+            chunk (DataFrame): rows to insert
+        Returns:
+            int: number of rows inserted
+        """
+        kinds = {name: 'INTEGER' if kind in 'iub' else 'REAL' if kind == 'f' else 'TEXT' for name, kind in chunk.dtypes.map(lambda dtype: dtype.kind).items()}
+        self.add_missing_columns(kinds)
+        self.insert_rows(list(chunk.columns), chunk.astype(object).where(chunk.notna(), None).itertuples(index=False, name=None))
+        return len(chunk)
+
+    def add_results(self, race_id, results):
+        """Adds the results of one simulated race
+        Args:
+            race_id (int): Race ID
+            results (DataFrame): one row per horse with horse_id, result, finish_time and
+                optionally time1..time6 (such as RaceResults.data)
+        Returns:
+            None
+        """
+        sections = [column for column in SECTION_COLUMNS if column in results.columns]
+        columns = ['race_id', 'horse_id', 'result', 'won', 'finish_time'] + sections
+        rows = zip(
+            [race_id] * len(results),
+            results['horse_id'].tolist(),
+            results['result'].tolist(),
+            [int(result == 1) for result in results['result'].tolist()],
+            results['finish_time'].tolist(),
+            *(results[column].tolist() for column in sections),
+        )
+        with self.connection:
+            self.insert_rows(columns, rows)
+
+    def insert_rows(self, columns, rows):
+        """Inserts 'rows' (tuples in the order of 'columns') in one statement per batch,
+        replacing the stored run of a horse in a race that is already stored"""
+        self.connection.executemany(
+            f"INSERT OR REPLACE INTO {self.table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})", rows
+        )
+
+    def lookup(self, horse_id):
+        """Returns the historical stats for a horse, in the format of HorseHistoryIndex.lookup
+        Args:
+            horse_id (int): Horse ID
+        Returns:
+            dict: races, wins, win_ratio, mean/median/best finish time, mean rank and
+            sectional averages (None for missing values), or None if the horse has no history
+        """
+        horse_id = int(horse_id)
+        row = self.connection.execute(
+            f"SELECT COUNT(*), SUM(won), AVG(finish_time), COUNT(finish_time), MIN(finish_time), AVG(result)"
+            f"{''.join(f', AVG({column})' for column in SECTION_COLUMNS)} FROM {self.table} WHERE horse_id = ?",
+            (horse_id,),
+        ).fetchone()
+        races, wins, mean_finish_time, finish_count, best_finish_time, mean_rank, *section_means = row
+        if races == 0: # one run per race, counted like HorseHistoryIndex
+            return None
+
+        median_finish_time = None
+        if finish_count:
+            middle = self.connection.execute(
+                f"SELECT finish_time FROM {self.table} WHERE horse_id = ? AND finish_time IS NOT NULL ORDER BY finish_time LIMIT ? OFFSET ?",
+                (horse_id, 2 - finish_count % 2, (finish_count - 1) // 2),
+            ).fetchall()
+            median_finish_time = sum(value for value, in middle) / len(middle)
+        wins = int(wins or 0)
+        return {
+            'races': races,
+            'wins': wins,
+            'win_ratio': wins / races * 100 if races else 0.0,
+            'mean_finish_time': mean_finish_time,
+            'median_finish_time': median_finish_time,
+            'best_finish_time': best_finish_time,
+            'mean_rank': mean_rank,
+            'sectional_times': section_means,
+        }
+
+    def runs_for(self, column, value):
+        """Returns every run where 'column' equals 'value', using the column's index
+        Args:
+            column (str): one of horse_id, race_id, jockey_id or trainer_id
+            value (int): ID to match
+        Returns:
+            DataFrame: the matching runs
+        """
+        import pandas as pd
+        if column not in INDEXED_COLUMNS:
+            raise ValueError(f"'{column}' is not indexed, use one of {', '.join(INDEXED_COLUMNS)}")
+        return pd.read_sql_query(f"SELECT * FROM {self.table} WHERE {column} = ?", self.connection, params=(int(value),))
+
+    def count(self):
+        """Returns the number of stored runs"""
+        return self.connection.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
@@ -0,0 +1,134 @@
+# horse_history.py
+
+from bisect import insort
+import numpy as np
+
+SECTION_COLUMNS = ['time1', 'time2', 'time3', 'time4', 'time5', 'time6']
+
+class HorseHistoryIndex:
+    """A class representing per horse aggregates of historical race results.
+    The index is built once with a groupby and keeps running totals per horse,
+    so lookups are a dictionary access and new results are added incrementally.
+    Methods:
+        __init__(): Builds the index from a history frame
+        lookup(): Returns the historical stats for one horse
+        append(): Adds new race results to the index
+    """
+
+    def __init__(self, history):
+        """Builds the index from 'history', a frame in the runs.csv format
+        (horse_id, race_id, won, result, finish_time and optionally time1..time6).
+        Args:
+            history (DataFrame): historical race results
+        """
+        sections = [column for column in SECTION_COLUMNS if column in history.columns]
+        grouped = history.groupby('horse_id', sort=False, observed=True)
+        totals = grouped.agg(
+            races=('race_id', 'nunique'),
+            wins=('won', 'sum'),
+            finish_sum=('finish_time', 'sum'),
+            finish_count=('finish_time', 'count'),
+            rank_sum=('result', 'sum'),
+            rank_count=('result', 'count'),
+        )
+        # sections missing from the frame are treated as never run
+        missing = len(SECTION_COLUMNS) - len(sections)
+        section_sums = np.pad(grouped[sections].sum().to_numpy(dtype=float), ((0, 0), (0, missing)))
+        section_counts = np.pad(grouped[sections].count().to_numpy(dtype=int), ((0, 0), (0, missing)))
+
+        # sorted finish times per horse, kept for the median and best time
+        finish = history[['horse_id', 'finish_time']].dropna()
+        horse_ids = finish['horse_id'].to_numpy()
+        finish_times = finish['finish_time'].to_numpy(dtype=float)
+        order = np.lexsort((finish_times, horse_ids))
+        horse_ids, finish_times = horse_ids[order], finish_times[order]
+        starts = np.flatnonzero(np.r_[True, horse_ids[1:] != horse_ids[:-1]]) if len(horse_ids) else np.array([], dtype=int)
+        finish_lists = {horse_ids[start].item(): times.tolist() for start, times in zip(starts, np.split(finish_times, starts[1:]))}
+
+        # races already counted per horse, so a race is never counted twice
+        horse_ids = history['horse_id'].to_numpy()
+        order = np.argsort(horse_ids, kind='stable')
+        horse_ids, race_ids = horse_ids[order], history['race_id'].to_numpy()[order]
+        starts = np.flatnonzero(np.r_[True, horse_ids[1:] != horse_ids[:-1]]) if len(horse_ids) else np.array([], dtype=int)
+        race_sets = {horse_ids[start].item(): set(ids.tolist()) for start, ids in zip(starts, np.split(race_ids, starts[1:]))}
+
+        self.stats = {}
+        for i, (horse_id, row) in enumerate(zip(totals.index.tolist(), totals.itertuples(index=False))):
+            self.stats[horse_id] = {
+                'races': int(row.races),
+                'wins': int(row.wins),
+                'finish_sum': float(row.finish_sum),
+                'finish_count': int(row.finish_count),
+                'rank_sum': float(row.rank_sum),
+                'rank_count': int(row.rank_count),
+                'section_sums': section_sums[i].tolist(),
+                'section_counts': section_counts[i].tolist(),
+                'finish_times': finish_lists.get(horse_id, []),
+                'race_ids': race_sets[horse_id],
+            }
+
+    def lookup(self, horse_id):
+        """Returns the historical stats for a horse
+        Args:
+            horse_id (int): Horse ID
+        Returns:
+            dict: races, wins, win_ratio, mean/median/best finish time, mean rank and
+            sectional averages (None for missing values), or None if the horse has no history
+        """
+        totals = self.stats.get(horse_id)
+        if totals is None:
+            return None
+        finish_times = totals['finish_times']
+        count = len(finish_times)
+        if count:
+            middle = count // 2
+            median = finish_times[middle] if count % 2 else (finish_times[middle - 1] + finish_times[middle]) / 2
+        return {
+            'races': totals['races'],
+            'wins': totals['wins'],
+            'win_ratio': totals['wins'] / totals['races'] * 100 if totals['races'] else 0.0,
+            'mean_finish_time': totals['finish_sum'] / totals['finish_count'] if totals['finish_count'] else None,
+            'median_finish_time': median if count else None,
+            'best_finish_time': finish_times[0] if count else None,
+            'mean_rank': totals['rank_sum'] / totals['rank_count'] if totals['rank_count'] else None,
+            'sectional_times': [total / number if number else None for total, number in zip(totals['section_sums'], totals['section_counts'])],
+        }
+
+    def append(self, results, race_id=None):
+        """Adds the results of one new race to the index, updating only the horses in it.
+        A horse whose stats already include 'race_id' is skipped, so adding a race twice
+        counts it once, like HistoryStore.
+        Args:
+            results (DataFrame): one row per horse with horse_id, result, finish_time
+                and optionally time1..time6 (such as RaceResults.data)
+            race_id (int): Race ID of the results, None adds them without the check
+        Returns:
+            int: number of horses updated
+        """
+        sections = [results[column].tolist() if column in results.columns else [None] * len(results) for column in SECTION_COLUMNS]
+        rows = zip(results['horse_id'].tolist(), results['result'].tolist(), results['finish_time'].tolist(), *sections)
+        updated = 0
+        for horse_id, result, finish_time, *section_times in rows:
+            totals = self.stats.setdefault(horse_id, {
+                'races': 0, 'wins': 0, 'finish_sum': 0.0, 'finish_count': 0, 'rank_sum': 0.0, 'rank_count': 0,
+                'section_sums': [0.0] * len(SECTION_COLUMNS), 'section_counts': [0] * len(SECTION_COLUMNS), 'finish_times': [],
+                'race_ids': set(),
+            })
+            if race_id is not None:
+                if race_id in totals['race_ids']:
+                    continue
+                totals['race_ids'].add(race_id)
+            updated += 1
+            totals['races'] += 1
+            totals['wins'] += int(result == 1)
+            totals['rank_sum'] += result
+            totals['rank_count'] += 1
+            if finish_time == finish_time: # skip NaN
+                totals['finish_sum'] += finish_time
+                totals['finish_count'] += 1
+                insort(totals['finish_times'], finish_time)
+            for i, section_time in enumerate(section_times):
+                if section_time is not None and section_time == section_time:
+                    totals['section_sums'][i] += section_time
+                    totals['section_counts'][i] += 1
+        return updated
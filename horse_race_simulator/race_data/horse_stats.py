@@ -1,7 +1,11 @@
 # horse_stats.py
 
-from pandas import read_csv
-from random import uniform
+import random
+import numpy as np
+from horse_race_simulator.race_data.data_cache import load_runs
+
+# columns of the data set used to build a Horse, in the order of Horse.__init__ arguments
+HORSE_COLUMNS = ['horse_id', 'horse_age', 'actual_weight', 'horse_type', 'horse_rating', 'jockey_id']
 
 class Horse:
     """A class representing a Horse object.
@@ -9,10 +13,14 @@ class Horse:
         __init__(): Initializes 'Horse' instance.
         create_horse(): Retreives a subset of horses from the Kaggle data set.
         update_horse_stats(): Updates speed of a horse.
+        use_speed_model(): Draws speeds from a SpeedModel fitted on a data set.
         get_horse_info(): Displays horse details.
     """
 
-    def __init__(self, horse_id, horse_age, actual_weight, horse_type, horse_rating, jockey_id):
+    __slots__ = ('horse_id', 'horse_age', 'actual_weight', 'horse_type', 'horse_rating', 'jockey_id', 'speed') # no per-instance __dict__
+    speed_model = None # optional SpeedModel, used instead of the fixed speed rules when set
+
+    def __init__(self, horse_id, horse_age, actual_weight, horse_type, horse_rating, jockey_id, rng=None):
         """
         Initializes instance of the 'Horse' class.
 
@@ -23,6 +31,7 @@ class Horse:
             horse_type (str): Horse type such as Colt, Mare, Gelding etc.
             horse_rating (int): Horse rating.
             jockey_id (int): Jockey ID.
+            rng (random.Random): Random source for the speed, defaults to the shared random module.
         """
 
         self.horse_id = horse_id
@@ -31,7 +40,7 @@ class Horse:
         self.horse_type = horse_type
         self.horse_rating = horse_rating
         self.jockey_id = jockey_id
-        self.speed = self.update_horse_stats()
+        self.speed = self.update_horse_stats(rng)
 
     def create_horse(csv_filename):
         """
@@ -41,35 +50,30 @@ class Horse:
             csv_filename: Kaggle data set containing horse data.
         """
         try:
-            horse_df = read_csv(csv_filename)
+            horse_pool = HorsePool.load(csv_filename) # parsed once and shared between calls
         except FileNotFoundError:
             print(f"The file '{csv_filename}' was not found")
             return None
         try:
-            horse_selection = horse_df.sample(n=1).iloc[0] # randomly taking one horse from the dataset
-        except IndexError:
+            horse_object = horse_pool.draw(1)[0] # randomly taking one horse from the dataset
+        except (IndexError, ValueError):
             print("Issue with dataset")
             return None
-            
-        horse_id = horse_selection['horse_id']
-        horse_age = horse_selection['horse_age']
-        actual_weight = horse_selection['actual_weight']
-        horse_type = horse_selection['horse_type']
-        horse_rating = horse_selection['horse_rating']
-        jockey_id = horse_selection['jockey_id']
-
-        horse_object = Horse(horse_id, horse_age, actual_weight, horse_type, horse_rating, jockey_id)
 
         return horse_object
 
-    def update_horse_stats(self):
+    def update_horse_stats(self, rng=None):
         """
         Updates speed of a horse based on factors; horse rating, horse age, actual weight of a horse and uses randomization to ensure that values vary with each simulation.
 
         Args:
             self: Instance of the class.
+            rng (random.Random): Random source, defaults to the shared random module.
         """
-        random_speed = uniform(30.0, 50.0)
+        if Horse.speed_model is not None:
+            return Horse.speed_model.draw_one(self.horse_rating, self.horse_age, self.actual_weight, rng)
+        rng = random if rng is None else rng
+        random_speed = rng.uniform(30.0, 50.0)
         if self.horse_rating > 50:
             random_speed += 5
         if self.horse_age < 3:
@@ -81,6 +85,21 @@ class Horse:
 
         return round(random_speed, 2)
 
+    @classmethod
+    def use_speed_model(cls, csv_filename='runs.csv'):
+        """
+        Draws the speed of every new horse from a SpeedModel fitted on 'csv_filename' instead of the fixed rules. Set Horse.speed_model to None to go back.
+
+        Args:
+            csv_filename: Data set the model is fitted on, the fitted model is cached next to it.
+
+        Returns:
+            SpeedModel: The model in use.
+        """
+        from horse_race_simulator.race_data.speed_model import SpeedModel
+        cls.speed_model = SpeedModel.load(csv_filename)
+        return cls.speed_model
+
     def get_horse_info(self):
         """
         Prints out horse information.
@@ -96,3 +115,210 @@ class Horse:
             f' Rating: {self.horse_rating:<3} | '
             f' Speed: {self.speed:.2f} km/h |'
         )
+
+class HorsePool:
+    """A class representing the horses of a data set, parsed once and shared between races.
+    Methods:
+        __init__(): Parses the data set into column arrays.
+        load(): Returns the shared pool for a data set, parsing it on first use.
+        pick_rows(): Picks one random run of distinct horses.
+        draw(): Draws a field of distinct horses.
+        draw_table(): Draws a field of distinct horses as a HorseTable.
+    """
+
+    _pools = {} # module-level cache of parsed data sets, keyed by file name
+
+    def __init__(self, csv_filename):
+        """
+        Parses 'csv_filename' and groups its runs by horse.
+
+        Args:
+            csv_filename: Kaggle data set containing horse data.
+        """
+        horse_df = load_runs(csv_filename, columns=HORSE_COLUMNS)
+        horse_df = horse_df.sort_values('horse_id', kind='stable') # runs of the same horse are next to each other
+        self.columns = {column: horse_df[column].to_numpy() for column in HORSE_COLUMNS}
+        self.horse_ids, self.first_run, self.run_counts = np.unique(self.columns['horse_id'], return_index=True, return_counts=True)
+
+    @classmethod
+    def load(cls, csv_filename):
+        """
+        Returns the shared pool for 'csv_filename', parsing the file only the first time.
+
+        Args:
+            csv_filename: Kaggle data set containing horse data.
+        """
+        horse_pool = cls._pools.get(csv_filename)
+        if horse_pool is None:
+            horse_pool = cls._pools[csv_filename] = cls(csv_filename)
+        return horse_pool
+
+    def pick_rows(self, num_horses, rng):
+        """
+        Picks 'num_horses' distinct horses in one vectorized sample and one random run of each.
+
+        Args:
+            num_horses (int): Number of horses in the field.
+            rng: NumPy random generator.
+
+        Returns:
+            ndarray: Rows of the picked runs in self.columns.
+        """
+        picks = rng.choice(len(self.horse_ids), size=num_horses, replace=False) # without replacement, no horse appears twice
+        return self.first_run[picks] + (rng.random(num_horses) * self.run_counts[picks]).astype(int)
+
+    def draw(self, num_horses, rng=None):
+        """
+        Draws 'num_horses' distinct horses, using one random run of each horse.
+
+        Args:
+            num_horses (int): Number of horses in the field.
+            rng (random.Random): Random source for the field and the speeds, defaults to the shared
+                random module like Horse.update_horse_stats, so random.seed makes a field reproducible.
+
+        Returns:
+            list: Horse objects for the field.
+        """
+        rng = random if rng is None else rng
+        rows = self.pick_rows(num_horses, np.random.default_rng(rng.getrandbits(64)))
+        values = [self.columns[column][rows].tolist() for column in HORSE_COLUMNS]
+        return [Horse(*horse_values, rng=rng) for horse_values in zip(*values)]
+
+    def draw_table(self, num_horses, np_rng=None):
+        """
+        Draws 'num_horses' distinct horses like draw(), returned as a HorseTable instead of Horse objects.
+        The whole table is sampled with NumPy, so it takes a NumPy generator rather than the
+        random.Random that draw() takes.
+
+        Args:
+            num_horses (int): Number of horses in the field.
+            np_rng: NumPy random generator, defaults to the global NumPy random state.
+
+        Returns:
+            HorseTable: Column arrays for the field.
+        """
+        np_rng = np.random if np_rng is None else np_rng
+        rows = self.pick_rows(num_horses, np_rng)
+        return HorseTable(*(self.columns[column][rows] for column in HORSE_COLUMNS), rng=np_rng)
+
+class HorseTable:
+    """A class representing many horses as one array per attribute (struct of arrays).
+    Speeds for the whole table are computed in one vectorized pass of the
+    Horse.update_horse_stats rules, and rows are exposed as HorseView objects
+    that read and write the arrays, so existing Horse callers keep working.
+    Methods:
+        __init__(): Builds the table from column arrays.
+        from_horses(): Builds a table from Horse objects.
+        update_horse_stats(): Recomputes the speed of every horse.
+        horses(): Returns a HorseView for every row.
+    """
+
+    def __init__(self, horse_id, horse_age, actual_weight, horse_type, horse_rating, jockey_id, speed=None, rng=None):
+        """
+        Initializes instance of the 'HorseTable' class.
+
+        Args:
+            horse_id: Horse IDs.
+            horse_age: Horse ages.
+            actual_weight: Actual weights of the horses.
+            horse_type: Horse types such as Colt, Mare, Gelding etc., stored as codes into type_names.
+            horse_rating: Horse ratings.
+            jockey_id: Jockey IDs.
+            speed: Speeds of the horses, computed with update_horse_stats if None.
+            rng: NumPy random generator used for the speeds, defaults to the global NumPy random state.
+        """
+        self.horse_id = np.asarray(horse_id)
+        self.horse_age = np.asarray(horse_age)
+        self.actual_weight = np.asarray(actual_weight)
+        type_names, type_code = np.unique(np.asarray(horse_type, dtype=object).astype(str), return_inverse=True)
+        self.type_names = type_names.tolist()
+        self.type_code = type_code.astype(np.int8 if len(type_names) < 128 else np.int32)
+        self.horse_rating = np.asarray(horse_rating)
+        self.jockey_id = np.asarray(jockey_id)
+        self.speed = self.update_horse_stats(rng) if speed is None else np.asarray(speed, dtype=float)
+
+    @classmethod
+    def from_horses(cls, horses):
+        """
+        Builds a table from Horse objects, keeping their current speeds.
+
+        Args:
+            horses (list): Horse objects.
+        """
+        columns = [[getattr(horse, column) for horse in horses] for column in HORSE_COLUMNS + ['speed']]
+        return cls(*columns)
+
+    def __len__(self):
+        return len(self.horse_id)
+
+    def __getitem__(self, index):
+        if not -len(self) <= index < len(self):
+            raise IndexError("HorseTable index out of range")
+        return HorseView(self, index % len(self))
+
+    def update_horse_stats(self, rng=None):
+        """
+        Computes the speed of every horse with the rules of Horse.update_horse_stats (or Horse.speed_model) in one vectorized pass.
+
+        Args:
+            rng: NumPy random generator, defaults to the global NumPy random state.
+
+        Returns:
+            ndarray: Speed of every horse.
+        """
+        if Horse.speed_model is not None:
+            return Horse.speed_model.draw(self.horse_rating, self.horse_age, self.actual_weight, rng)
+        rng = np.random if rng is None else rng
+        random_speed = rng.uniform(30.0, 50.0, size=len(self))
+        random_speed += np.where(self.horse_rating > 50, 5, 0)
+        random_speed += np.select(
+            [self.horse_age < 3, self.horse_age > 5, self.actual_weight < 125],
+            [-2, -5, 5],
+            default=0,
+        )
+        return np.round(random_speed, 2)
+
+    def horses(self):
+        """
+        Returns a HorseView for every row, for callers that expect Horse objects.
+        """
+        return [HorseView(self, index) for index in range(len(self))]
+
+def _column_property(column):
+    """Returns a property that reads and writes row 'index' of a HorseTable column."""
+    def get_value(view):
+        return getattr(view.table, column)[view.index].item()
+    def set_value(view, value):
+        getattr(view.table, column)[view.index] = value
+    return property(get_value, set_value)
+
+class HorseView(Horse):
+    """A class representing one row of a HorseTable as a Horse. Attributes are read
+    from and written to the table's arrays, so creating a view copies nothing.
+    Methods:
+        __init__(): Initializes a view of one row.
+    """
+
+    __slots__ = ('table', 'index')
+
+    horse_id = _column_property('horse_id')
+    horse_age = _column_property('horse_age')
+    actual_weight = _column_property('actual_weight')
+    horse_rating = _column_property('horse_rating')
+    jockey_id = _column_property('jockey_id')
+    speed = _column_property('speed')
+
+    def __init__(self, table, index):
+        """
+        Initializes instance of the 'HorseView' class.
+
+        Args:
+            table (HorseTable): Table holding the horse.
+            index (int): Row of the horse.
+        """
+        self.table = table
+        self.index = index
+
+    @property
+    def horse_type(self):
+        return self.table.type_names[self.table.type_code[self.index]]
@@ -1,9 +1,11 @@
 # race_details.py
 from datetime import datetime
 from datetime import timedelta
-from random import choice
+import random
+import uuid
 from horse_race_simulator.race_data.track_data import Track
-from horse_race_simulator.race_data.horse_stats import Horse
+from horse_race_simulator.race_data.horse_stats import HorsePool
+from horse_race_simulator.instrumentation import instrumentation
 
 class Race:
     """A class representing a horse race (not the actual simulation)
@@ -13,23 +15,28 @@ class Race:
         get_race_info(): Prints details about the race
     """
 
-    def __init__(self, num_horses=5):
-        """Initialize race with race details."""
+    def __init__(self, num_horses=5, csv_filename="runs.csv", rng=None):
+        """Initialize race with race details. The field is drawn from the horses in 'csv_filename'.
+        The track, prize, field and horse speeds come from 'rng' (a random.Random), or from
+        the shared random module if None, so random.seed makes a race reproducible."""
+        rng = random if rng is None else rng
         self.track = Track()
-        self.track.create_track() 
-        self.track.weather_factor()
+        self.track.create_track(rng)
+        self.track.weather_factor(rng)
 
         self.venue = self.track.track_venue[0]
         self.distance = self.track.track_venue[1]
         self.weather = self.track.track_weather[0]
 
         self.date = datetime.now().strftime("%Y-%m-%d") 
-        self.prize = choice(range(5000, 25001, 5000)) 
+        self.prize = rng.choice(range(5000, 25001, 5000))
         self.num_horses = num_horses
-        self.race_id = id(self)
+        self.race_id = uuid.uuid4().int >> 65 # unique across processes and runs, and fits an SQLite INTEGER
 
-        # Create horses based on the number of horses for this race
-        self.horses = [Horse.create_horse("runs.csv") for _ in range(self.num_horses)]
+        # Draw the field for this race from the shared horse pool
+        with instrumentation.timer("race_field"):
+            self.horses = HorsePool.load(csv_filename).draw(self.num_horses, rng)
+        instrumentation.count("horses_drawn", self.num_horses)
 
     def set_date(self, date):
         """Change the date for the race
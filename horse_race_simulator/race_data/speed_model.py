@@ -0,0 +1,170 @@
+# speed_model.py
+
+import os
+import random
+from bisect import bisect_right
+import numpy as np
+from horse_race_simulator.race_data.data_cache import DataCache, load_runs
+from horse_race_simulator.race_data.horse_history import SECTION_COLUMNS
+
+MODEL_VERSION = 1
+MODEL_NAME = "speed_model.npz" # stored in the data set's cache directory
+SECTION_LENGTH = 400 # approximate metres per sectional; runs.csv has no distance column
+BASE_SPEED = 40.0 # speed of an average run, the centre of Horse.update_horse_stats' uniform(30, 50)
+RATING_EDGES = [55, 60, 65, 70, 80] # bucket boundaries; a value on an edge goes to the upper bucket
+AGE_EDGES = [3, 4, 6]
+WEIGHT_EDGES = [115, 120, 125, 130]
+
+def bucket(edges, value):
+    """Returns the bucket of 'value' between 'edges' (0 below the first edge)"""
+    return bisect_right(edges, value)
+
+class SpeedModel:
+    """A class representing speed distributions fitted from the finish times in runs.csv,
+    one per rating, age and weight bucket. Each run's speed is its distance over its
+    finish time, relative to the mean speed of runs over the same distance and scaled
+    to BASE_SPEED, so it uses the units of Horse.speed. Each bucket keeps a table of
+    quantiles, and a speed is drawn by indexing the bucket and interpolating between two
+    quantiles at a uniform random point, which takes constant time. Buckets with fewer
+    than 'min_runs' runs use the quantiles of their rating bucket, or of all runs.
+    The fitted tables are saved in the data set's cache directory and refitted when
+    the data set changes.
+    Methods:
+        fit(): Fits the quantile tables from a runs DataFrame
+        load(): Returns the model for a data set, fitting and saving it only when needed
+        save(): Writes the tables to a .npz file
+        draw(): Draws speeds for arrays of horses
+        draw_one(): Draws the speed of one horse
+    """
+
+    _models = {} # models already loaded in this process, keyed by file name
+
+    def __init__(self, quantiles, counts, source_hash=None):
+        """Initializes SpeedModel
+        Args:
+            quantiles: (ratings, ages, weights, levels) array of speed quantiles per bucket
+            counts: (ratings, ages, weights) array of runs per bucket
+            source_hash (str): sha256 of the data set the model was fitted on
+        """
+        self.quantiles = np.asarray(quantiles, dtype=float)
+        self.counts = np.asarray(counts)
+        self.source_hash = source_hash
+        self.levels = self.quantiles.shape[-1]
+
+    @classmethod
+    def fit(cls, runs, levels=33, min_runs=20, source_hash=None):
+        """Fits the quantile tables
+        Args:
+            runs (DataFrame): runs with horse_rating, horse_age, actual_weight, finish_time and time1..time6
+            levels (int): quantiles kept per bucket, evenly spaced from 0 to 1
+            min_runs (int): runs a bucket needs to use its own quantiles
+            source_hash (str): sha256 of the data set, stored with the model
+        Returns:
+            SpeedModel: the fitted model
+        """
+        runs = runs[runs['finish_time'] > 0]
+        sections = runs[SECTION_COLUMNS].notna().sum(axis=1).to_numpy()
+        metres_per_second = SECTION_LENGTH * sections / runs['finish_time'].to_numpy(dtype=float)
+        # relative to runs over the same distance, so the bucket mix of distances does not matter
+        distance_means = np.bincount(sections, weights=metres_per_second) / np.maximum(np.bincount(sections), 1)
+        speeds = BASE_SPEED * metres_per_second / distance_means[sections]
+
+        ratings = np.searchsorted(RATING_EDGES, runs['horse_rating'].to_numpy(), side='right')
+        ages = np.searchsorted(AGE_EDGES, runs['horse_age'].to_numpy(), side='right')
+        weights = np.searchsorted(WEIGHT_EDGES, runs['actual_weight'].to_numpy(), side='right')
+        shape = (len(RATING_EDGES) + 1, len(AGE_EDGES) + 1, len(WEIGHT_EDGES) + 1)
+        cells = np.ravel_multi_index((ratings, ages, weights), shape)
+        counts = np.bincount(cells, minlength=np.prod(shape)).reshape(shape)
+
+        probabilities = np.linspace(0, 1, levels)
+        overall = np.quantile(speeds, probabilities)
+        by_rating = [np.quantile(speeds[ratings == rating], probabilities) if (ratings == rating).sum() >= min_runs else overall for rating in range(shape[0])]
+        quantiles = np.empty(shape + (levels,))
+        for cell in range(np.prod(shape)):
+            index = np.unravel_index(cell, shape)
+            quantiles[index] = np.quantile(speeds[cells == cell], probabilities) if counts[index] >= min_runs else by_rating[index[0]]
+        return cls(quantiles, counts, source_hash)
+
+    @classmethod
+    def load(cls, csv_filename="runs.csv"):
+        """Returns the model for a data set. It is read from the cache directory when it
+        was fitted on the current file, otherwise fitted and saved there.
+        Args:
+            csv_filename: data set in the runs.csv format, see resolve_data_path
+        Returns:
+            SpeedModel: the model
+        """
+        model = cls._models.get(csv_filename)
+        cache = DataCache(csv_filename)
+        manifest = cache.read_manifest()
+        fresh = cache.is_fresh(manifest)
+        if model is not None and fresh and model.source_hash == manifest["sha256"]:
+            return model
+
+        path = os.path.join(cache.cache_dir, MODEL_NAME)
+        model = None
+        if fresh:
+            try:
+                with np.load(path) as archive:
+                    if archive["version"].item() == MODEL_VERSION and archive["source_hash"].item() == manifest["sha256"]:
+                        model = cls(archive["quantiles"], archive["counts"], manifest["sha256"])
+            except (OSError, KeyError, ValueError):
+                pass # no usable model, fitted below
+        if model is None:
+            runs = load_runs(csv_filename, columns=['horse_rating', 'horse_age', 'actual_weight', 'finish_time'] + SECTION_COLUMNS) # rebuilds a stale cache
+            model = cls.fit(runs, source_hash=cache.read_manifest()["sha256"])
+            try:
+                model.save(path)
+            except OSError:
+                pass # a read-only cache directory only costs a refit next time
+        cls._models[csv_filename] = model
+        return model
+
+    def save(self, path):
+        """Writes the model to a .npz file, through a temporary file so readers never see a partial model
+        Args:
+            path: file to write
+        Returns:
+            None
+        """
+        temp_path = f"{path}.{os.getpid()}.tmp.npz"
+        np.savez(temp_path, quantiles=self.quantiles, counts=self.counts, source_hash=np.array(self.source_hash or ""), version=np.array(MODEL_VERSION))
+        os.replace(temp_path, path)
+
+    def draw(self, horse_rating, horse_age, actual_weight, rng=None):
+        """Draws one speed per horse for arrays of horse attributes
+        Args:
+            horse_rating: ratings
+            horse_age: ages
+            actual_weight: weights
+            rng: NumPy random generator, defaults to the global NumPy random state
+        Returns:
+            ndarray: speeds rounded to 2 decimals
+        """
+        rng = np.random if rng is None else rng
+        rows = self.quantiles[
+            np.searchsorted(RATING_EDGES, horse_rating, side='right'),
+            np.searchsorted(AGE_EDGES, horse_age, side='right'),
+            np.searchsorted(WEIGHT_EDGES, actual_weight, side='right'),
+        ]
+        point = rng.random(len(rows)) * (self.levels - 1)
+        level = np.minimum(point.astype(int), self.levels - 2)
+        low = np.take_along_axis(rows, level[:, None], axis=1)[:, 0]
+        high = np.take_along_axis(rows, level[:, None] + 1, axis=1)[:, 0]
+        return np.round(low + (point - level) * (high - low), 2)
+
+    def draw_one(self, horse_rating, horse_age, actual_weight, rng=None):
+        """Draws the speed of one horse, like Horse.update_horse_stats
+        Args:
+            horse_rating (int): rating
+            horse_age (int): age
+            actual_weight (int): weight
+            rng (random.Random): random source, defaults to the shared random module
+        Returns:
+            float: speed rounded to 2 decimals
+        """
+        row = self.quantiles[bucket(RATING_EDGES, horse_rating), bucket(AGE_EDGES, horse_age), bucket(WEIGHT_EDGES, actual_weight)]
+        point = (random if rng is None else rng).random() * (self.levels - 1)
+        level = min(int(point), self.levels - 2)
+        low, high = row[level], row[level + 1]
+        return round(float(low + (point - level) * (high - low)), 2)
@@ -1,6 +1,6 @@
 # track_data.py
 
-from random import choice
+import random
 
 class Track:
     """A class representing horse race track with venue options and weather factors
@@ -21,11 +21,12 @@ class Track:
         self.track_weather = None
         self.track_color = "DarkGreen" 
 
-    def create_track(self):
+    def create_track(self, rng=None):
         """Randomly selects track venue and corresponding race distance.
         Stores details in track_venue.
         Args:
            self: track_data
+           rng: random.Random used for the choice, defaults to the shared random module
         Returns:
            None
         """
@@ -40,14 +41,15 @@ class Track:
             "Riders Run": 2400
             }
         
-        self.track_venue = choice(list(venues.items())) 
+        self.track_venue = (random if rng is None else rng).choice(list(venues.items()))
     
-    def weather_factor(self):
+    def weather_factor(self, rng=None):
         """Randomly selects weather factors to apply to horse race and
         corresponding impact the selected factor has on horse speed.
         Stores details in track_weather.
         Args:
            self: track_data
+           rng: random.Random used for the choice, defaults to the shared random module
         Returns:
            None
         """
@@ -60,7 +62,7 @@ class Track:
             "Snowy": -5,
         }
 
-        self.track_weather = choice(list(weather.items()))
+        self.track_weather = (random if rng is None else rng).choice(list(weather.items()))
     
     def get_track_info(self):
         """Prints details about the track venue, distance and track weather
@@ -0,0 +1,275 @@
+# backtest.py
+
+import argparse
+import json
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from horse_race_simulator.simulation.betting import User
+from horse_race_simulator.simulation.odds import MAX_ODDS
+from horse_race_simulator.simulation.strategies import STRATEGIES, best_runs, get_strategy
+
+# columns of the runs table every strategy scores, one row per horse per race
+RUN_COLUMNS = ['race_id', 'horse_id', 'horse_age', 'actual_weight', 'horse_rating', 'win_odds', 'won']
+
+def select_bets(runs, strategy, rng):
+    """Picks the highest scoring horse of every race in one vectorized pass
+    Args:
+        runs (DataFrame): RUN_COLUMNS rows, grouped by race_id
+        strategy: function(runs, rng) returning one score per row, see STRATEGIES
+        rng: NumPy random generator passed to the strategy
+    Returns:
+        tuple: (race_ids, horse_ids, odds, won) arrays with one entry per race that got a bet.
+        Races where every score or the backed horse's odds are missing get no bet.
+    """
+    picks, scored = best_runs(runs, strategy, rng)
+    odds = runs['win_odds'].to_numpy(dtype=float)[picks]
+    keep = scored & ~np.isnan(odds)
+    picks = picks[keep]
+    return runs['race_id'].to_numpy()[picks], runs['horse_id'].to_numpy()[picks], odds[keep], runs['won'].to_numpy()[picks].astype(bool)
+
+def simulated_chunk(task):
+    """Draws and simulates a chunk of races, prices them and picks the bets. Runs inside a worker process.
+    Args:
+        task (tuple): (first race number, races, num_horses, odds_samples, fixed_odds, strategy, seed)
+    Returns:
+        tuple: output of select_bets, with race numbers as race IDs
+    """
+    import pandas as pd
+    from horse_race_simulator.race_data.race_details import Race
+    from horse_race_simulator.simulation.batch_simulator import BatchRaceSimulation
+    first_race, count, num_horses, odds_samples, fixed_odds, strategy, seed = task
+    rng = random.Random(seed) # the chunk's own source, the caller's random state is left alone
+    races = [Race(num_horses=num_horses, rng=rng) for _ in range(count)]
+
+    # repeat 0 of each race is the race bet on, the other repeats price it
+    repeats = odds_samples + 1
+    batch = BatchRaceSimulation(races, repeats=repeats, seed=seed)
+    batch.start_race()
+    positions = batch.get_positions().reshape(count, repeats, num_horses)
+    if odds_samples > 0:
+        wins = (positions[:, 1:] == 1).sum(axis=1)
+        # fair odds capped at MAX_ODDS, as OddsEngine prices the game
+        odds = np.minimum(np.round(odds_samples / np.maximum(wins, 1), 2), MAX_ODDS)
+        odds[wins == 0] = MAX_ODDS
+    else:
+        odds = np.full((count, num_horses), fixed_odds)
+
+    runs = pd.DataFrame({
+        'race_id': np.repeat(np.arange(first_race, first_race + count), num_horses),
+        'horse_id': [horse.horse_id for race in races for horse in race.horses],
+        'horse_age': [horse.horse_age for race in races for horse in race.horses],
+        'actual_weight': [horse.actual_weight for race in races for horse in race.horses],
+        'horse_rating': [horse.horse_rating for race in races for horse in race.horses],
+        'speed': [horse.speed for race in races for horse in race.horses],
+        'win_odds': odds.ravel(),
+        'won': (positions[:, 0] == 1).ravel(),
+    })
+    return select_bets(runs, strategy, np.random.default_rng(seed))
+
+def historical_chunk(task):
+    """Picks the bets for a chunk of historical races. Runs inside a worker process.
+    Args:
+        task (tuple): (runs, strategy, seed)
+    Returns:
+        tuple: output of select_bets
+    """
+    runs, strategy, seed = task
+    return select_bets(runs, strategy, np.random.default_rng(seed))
+
+class Backtester:
+    """A class that evaluates a betting strategy over many races. Bets are picked
+    for chunks of races in parallel worker processes with array operations, then
+    settled in race order through User, so the balance follows the same rules as
+    the game: the stake is taken when the bet is placed and bet * odds is paid
+    back on a win. Betting stops once the balance cannot cover the stake.
+    Methods:
+        __init__(): Initializes the backtester
+        run_simulated(): Backtests over newly simulated races
+        run_historical(): Backtests over the races of a runs.csv style data set
+        settle(): Settles the picked bets in race order and computes the report
+        get_backtest_info(): Prints the report of the last backtest
+    """
+    def __init__(self, strategy="top_rated", stake=10.0, stake_fraction=None, start_balance=1000, workers=None, chunk_size=500, master_seed=0):
+        """Initializes Backtester
+        Args:
+            strategy: name in STRATEGIES or a module level function(runs, rng) returning scores
+            stake (float): amount bet on every race
+            stake_fraction (float): bet this fraction of the balance instead of a fixed stake
+            start_balance (float): balance before the first race
+            workers (int): worker processes, defaults to the number of cores
+            chunk_size (int): races handled by a worker at a time
+            master_seed (int): seed every chunk's random stream is spawned from, so results
+                do not depend on the number of workers
+        Attributes:
+            balances: balance after every bet, starting with start_balance
+            report: metrics of the last backtest
+        """
+        strategy = get_strategy(strategy)
+        if stake_fraction is None and stake <= 0 or stake_fraction is not None and not 0 < stake_fraction <= 1:
+            raise ValueError("Bet amount must be greater than zero")
+        self.strategy = strategy
+        self.stake = stake
+        self.stake_fraction = stake_fraction
+        self.start_balance = start_balance
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self.master_seed = master_seed
+        self.balances = None
+        self.report = None
+
+    def chunk_seeds(self, count):
+        """Returns one independent seed per chunk, spawned from master_seed"""
+        return [int(child.generate_state(1)[0]) for child in np.random.SeedSequence(self.master_seed).spawn(count)]
+
+    def map_chunks(self, function, tasks):
+        """Runs 'function' over every task, in worker processes when there is more than one worker"""
+        if self.workers == 1 or len(tasks) == 1:
+            return list(map(function, tasks))
+        with ProcessPoolExecutor(max_workers=min(self.workers, len(tasks))) as executor:
+            return list(executor.map(function, tasks))
+
+    def run_simulated(self, races, num_horses=5, odds_samples=50, fixed_odds=2.0):
+        """Backtests the strategy over 'races' newly drawn and simulated races. Each race
+        is priced from 'odds_samples' further simulations of it (fair odds, as OddsEngine).
+        Args:
+            races (int): number of races
+            num_horses (int): horses per race
+            odds_samples (int): simulations used to price each race, 0 pays 'fixed_odds'
+            fixed_odds (float): odds paid on a win when odds_samples is 0
+        Returns:
+            dict: report, see settle
+        """
+        start_time = time.perf_counter()
+        starts = range(0, races, self.chunk_size)
+        tasks = [
+            (start, min(self.chunk_size, races - start), num_horses, odds_samples, fixed_odds, self.strategy, seed)
+            for start, seed in zip(starts, self.chunk_seeds(len(starts)))
+        ]
+        return self.settle(self.map_chunks(simulated_chunk, tasks), races, start_time)
+
+    def run_historical(self, csv_filename="runs.csv"):
+        """Backtests the strategy over the races of a data set in the runs.csv format,
+        grouped by race_id and paid at each horse's win_odds
+        Args:
+            csv_filename: data set to replay, see resolve_data_path
+        Returns:
+            dict: report, see settle
+        """
+        from horse_race_simulator.race_data.data_cache import load_runs
+        start_time = time.perf_counter()
+        runs = load_runs(csv_filename, columns=[column for column in RUN_COLUMNS if column != 'won'] + ['result'])
+        runs = runs.assign(won=runs['result'] == 1).sort_values('race_id', kind='stable')
+        race_ids = runs['race_id'].unique()
+        bounds = np.searchsorted(runs['race_id'].to_numpy(), race_ids[::self.chunk_size])
+        bounds = list(bounds) + [len(runs)]
+        chunks = [runs.iloc[start:end] for start, end in zip(bounds, bounds[1:])]
+        tasks = [(chunk, self.strategy, seed) for chunk, seed in zip(chunks, self.chunk_seeds(len(chunks)))]
+        return self.settle(self.map_chunks(historical_chunk, tasks), len(race_ids), start_time)
+
+    def settle(self, chunks, races, start_time=None):
+        """Settles the picked bets in race order through User and computes the report
+        Args:
+            chunks (list): select_bets outputs in race order
+            races (int): number of races considered
+            start_time (float): time.perf_counter() when the backtest started, for races_per_second
+        Returns:
+            dict: races, bets, wins, hit_rate, staked, returned, profit, roi, final_balance,
+            max_drawdown (largest fall from a peak balance), max_drawdown_pct,
+            profit_mean and profit_variance per bet, and races_per_second
+        """
+        _, horse_ids, odds, won = (np.concatenate(column).tolist() for column in zip(*chunks)) if chunks else ([], [], [], [])
+        user = User(start_balance=self.start_balance)
+        balances = [user.balance]
+        stakes, payouts = [], []
+        for horse_id, horse_odds, horse_won in zip(horse_ids, odds, won):
+            bet = user.balance * self.stake_fraction if self.stake_fraction else self.stake
+            if bet > user.balance or bet < 0.01:
+                break
+            user.balance -= bet
+            # a horse that did not win is settled against no winner
+            payouts.append(user.settle_bet(bet, horse_id if horse_won else None, horse_id, horse_odds))
+            stakes.append(bet)
+            balances.append(user.balance)
+
+        self.balances = np.array(balances)
+        stakes, payouts = np.array(stakes), np.array(payouts)
+        profits = payouts - stakes
+        peaks = np.maximum.accumulate(self.balances)
+        drawdowns = peaks - self.balances
+        staked = float(stakes.sum())
+        elapsed_time = time.perf_counter() - start_time if start_time is not None else 0.0
+        self.report = {
+            "races": races,
+            "bets": len(stakes),
+            "wins": int((payouts > 0).sum()),
+            "hit_rate": float((payouts > 0).mean()) if len(stakes) else 0.0,
+            "staked": staked,
+            "returned": float(payouts.sum()),
+            "profit": float(profits.sum()),
+            "roi": float(profits.sum() / staked) if staked else 0.0,
+            "final_balance": float(user.balance),
+            "max_drawdown": float(drawdowns.max()),
+            "max_drawdown_pct": float((drawdowns / peaks).max()) if peaks.max() > 0 else 0.0,
+            "profit_mean": float(profits.mean()) if len(stakes) else 0.0,
+            "profit_variance": float(profits.var()) if len(stakes) else 0.0,
+            "races_per_second": races / elapsed_time if elapsed_time > 0 else float("inf"),
+        }
+        return self.report
+
+    def get_backtest_info(self):
+        """Prints the report of the last backtest
+        Args:
+            self: Backtester
+        Returns:
+            None
+        """
+        report = self.report
+        bets = f"{report['bets']} ({report['hit_rate']:.1%} won)"
+        balance = f"${report['final_balance']:,.2f}"
+        roi = f"{report['roi']:+.2%}"
+        drawdown = f"${report['max_drawdown']:,.2f} ({report['max_drawdown_pct']:.1%})"
+        variance = f"{report['profit_variance']:,.2f}"
+        speed = f"{report['races_per_second']:,.1f}"
+        width = 40
+        separator = "+" + "-" * (width - 2) + "+"
+
+        print(
+            f"\n{separator}\n"
+            f"| {'         Backtest Overview          '} |\n"
+            f"{separator}\n"
+            f"| {'Races':<10} : {report['races']:<23} |\n"
+            f"| {'Bets':<10} : {bets:<23} |\n"
+            f"| {'Balance':<10} : {balance:<23} |\n"
+            f"| {'ROI':<10} : {roi:<23} |\n"
+            f"| {'Drawdown':<10} : {drawdown:<23} |\n"
+            f"| {'Variance':<10} : {variance:<23} |\n"
+            f"| {'Races/sec':<10} : {speed:<23} |\n"
+            f"{separator}"
+        )
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Backtest a betting strategy over simulated or historical races.")
+    parser.add_argument("--strategy", choices=sorted(STRATEGIES), default="top_rated")
+    parser.add_argument("--races", type=int, default=10000, help="simulated races, ignored with --historical")
+    parser.add_argument("--historical", metavar="CSV", nargs="?", const="runs.csv", help="replay the races of a runs.csv style data set instead")
+    parser.add_argument("--stake", type=float, default=10.0)
+    parser.add_argument("--stake-fraction", type=float, help="bet this fraction of the balance instead of --stake")
+    parser.add_argument("--start-balance", type=float, default=1000)
+    parser.add_argument("--horses", type=int, default=5)
+    parser.add_argument("--odds-samples", type=int, default=50, help="simulations used to price each simulated race, 0 pays 2.0")
+    parser.add_argument("--workers", type=int)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    backtester = Backtester(args.strategy, args.stake, args.stake_fraction, args.start_balance, args.workers, master_seed=args.seed)
+    if args.historical:
+        backtester.run_historical(args.historical)
+    else:
+        backtester.run_simulated(args.races, args.horses, args.odds_samples)
+    backtester.get_backtest_info()
+    print(json.dumps(backtester.report))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+# batch_simulator.py
+
+import numpy as np
+from horse_race_simulator.simulation.race_simulator import TICK_SECONDS
+
+class BatchRaceSimulation:
+    """A class representing many headless races simulated together with array operations
+    Methods:
+        __init__(): Initializes the batch from one or more races
+        start_race(): Runs every race in the batch to completion
+        get_positions(): Returns the finishing position of every horse
+        get_times(): Returns a dictionary of race times for one race in the batch
+        get_winning_horse_ids(): Returns the winning horse ID of every race
+    """
+    def __init__(self, races, repeats=1, seed=None, tick_seconds=TICK_SECONDS):
+        """Initializes BatchRaceSimulation
+        Args:
+            races: A Race, or a list of races (anything with 'horses' and 'track')
+            repeats (int): Number of times each race is simulated
+            seed: Seed for the random number generator
+            tick_seconds (float): Simulated seconds per tick
+        Attributes:
+            horse_ids: (N, M) array of horse IDs, padded with -1 for empty lanes
+            speeds: (N, M) array of horse speeds
+            lane_mask: (N, M) boolean array, True where a lane has a horse
+            start_line / finish_line: (N,) arrays of track coordinates
+            leg_markers: (N, 3) array of leg marker coordinates
+            weather: (N,) array of weather multipliers
+            leg_ticks: (N, M, 3) array of ticks at which each leg marker was crossed
+            finish_ticks: (N, M) array of ticks at which the finish line was crossed
+        """
+        if not isinstance(races, (list, tuple)):
+            races = [races]
+        self.races = list(races)
+        self.repeats = repeats
+        self.rng = np.random.default_rng(seed)
+        self.tick_seconds = tick_seconds
+        self.ticks = 0
+
+        num_races = len(self.races)
+        max_horses = max(len(race.horses) for race in self.races)
+        horse_ids = np.full((num_races, max_horses), -1, dtype=np.int64)
+        speeds = np.zeros((num_races, max_horses))
+        distances = np.empty(num_races)
+        weather = np.empty(num_races)
+        for i, race in enumerate(self.races):
+            count = len(race.horses)
+            horse_ids[i, :count] = [horse.horse_id for horse in race.horses]
+            speeds[i, :count] = [max(horse.speed, 5) for horse in race.horses]
+            distances[i] = race.track.track_venue[1]
+            weather[i] = race.track.track_weather[1]
+
+        # same geometry as RaceSimulation.set_markers
+        scaled_length = 0.3 * distances
+        self.horse_ids = np.repeat(horse_ids, repeats, axis=0)
+        self.speeds = np.repeat(speeds, repeats, axis=0)
+        self.lane_mask = self.horse_ids >= 0
+        self.start_line = np.repeat(-scaled_length / 2, repeats)
+        self.finish_line = np.repeat(scaled_length / 2, repeats)
+        self.leg_markers = self.start_line[:, None] + np.repeat(scaled_length, repeats)[:, None] * np.array([0.25, 0.5, 0.75])
+        self.weather = np.repeat(weather, repeats)
+
+        self.leg_ticks = np.full(self.horse_ids.shape + (3,), -1, dtype=np.int64)
+        self.finish_ticks = np.full(self.horse_ids.shape, -1, dtype=np.int64)
+
+    def start_race(self):
+        """Runs ticks until every horse in every race has crossed the finish line.
+        Each tick applies the same rules as RaceSimulation.move_horses as masked
+        array updates: 5% stall, 15% weather adjusted, otherwise speed * 0.1.
+        Args:
+            self: BatchRaceSimulation
+        Returns:
+            None
+        """
+        x = np.repeat(self.start_line[:, None], self.horse_ids.shape[1], axis=1)
+        normal_move = self.speeds * 0.1
+        weather_move = np.maximum(self.speeds * self.weather[:, None] * 0.1, 0)
+
+        # each horse only compares against the next marker it has to cross;
+        # the finish line is marker 3 and empty lanes have nothing to cross
+        markers = np.concatenate([self.leg_markers, self.finish_line[:, None]], axis=1)
+        crossing_ticks = np.full(self.horse_ids.shape + (4,), -1, dtype=np.int64)
+        next_marker = np.where(self.lane_mask, 0, 4)
+        target = np.where(self.lane_mask, markers[:, :1], np.inf)
+        running = np.count_nonzero(self.lane_mask)
+
+        while running:
+            self.ticks += 1
+            rand_chance = self.rng.random(x.shape)
+            move = np.where(rand_chance < 0.20, weather_move, normal_move)
+            move[rand_chance < 0.05] = 0
+            x += move
+
+            crossed = x >= target
+            while crossed.any():
+                rows, lanes = np.nonzero(crossed)
+                marker = next_marker[rows, lanes]
+                crossing_ticks[rows, lanes, marker] = self.ticks
+                running -= np.count_nonzero(marker == 3)
+                marker += 1
+                next_marker[rows, lanes] = marker
+                target[rows, lanes] = np.where(marker < 4, markers[rows, np.minimum(marker, 3)], np.inf)
+                crossed[rows, lanes] = x[rows, lanes] >= target[rows, lanes]
+
+        self.leg_ticks = crossing_ticks[:, :, :3]
+        self.finish_ticks = crossing_ticks[:, :, 3]
+
+    def get_positions(self):
+        """Returns the finishing position of every horse. Horses finishing on the
+        same tick are placed in lane order, as in RaceSimulation.
+        Args:
+            self: BatchRaceSimulation
+        Returns:
+            array: (N, M) array of positions starting at 1, 0 for empty lanes
+        """
+        finish = np.where(self.lane_mask, self.finish_ticks, np.iinfo(np.int64).max)
+        order = np.argsort(finish, axis=1, kind="stable")
+        positions = np.empty_like(order)
+        np.put_along_axis(positions, order, np.arange(1, order.shape[1] + 1), axis=1)
+        return np.where(self.lane_mask, positions, 0)
+
+    def get_times(self, index=0):
+        """Returns a dictionary of race times for race 'index' of the batch, in the
+        same format as RaceSimulation.get_times
+        Args:
+           self: BatchRaceSimulation
+           index (int): Row of the batch
+        Returns:
+           dict: times (Dictionary of horse IDs and leg times from race)
+        """
+        times = {}
+        for lane in np.flatnonzero(self.lane_mask[index]):
+            leg_times = self.leg_ticks[index, lane] * self.tick_seconds
+            times[self.horse_ids[index, lane].item()] = {
+                "Overall Time": round(self.finish_ticks[index, lane] * self.tick_seconds, 2),
+                "Leg 1 Time": round(leg_times[0], 2),
+                "Leg 2 Time": round(leg_times[1], 2),
+                "Leg 3 Time": round(leg_times[2], 2),
+            }
+        return times
+
+    def get_winning_horse_ids(self):
+        """Returns the winning horse ID of every race in the batch
+        Args:
+            self: BatchRaceSimulation
+        Returns:
+            array: (N,) array of winning horse IDs
+        """
+        winners = np.argmax(self.get_positions() == 1, axis=1)
+        return self.horse_ids[np.arange(len(winners)), winners]
@@ -2,7 +2,9 @@
 
 from horse_race_simulator.simulation.race_simulator import RaceSimulation
 from horse_race_simulator.simulation.race_results import RaceResults
+from horse_race_simulator.simulation.odds import OddsEngine
 from horse_race_simulator.race_data.race_details import DelayedRace
+from horse_race_simulator.instrumentation import instrumentation
 
 
 class User:
@@ -13,6 +15,7 @@ class User:
         run_game(): Consolidate the betting, race results and simulation into one method.
         show_balance(): Show user balance for the instance.
         take_bet(): Takes bet from user.
+        settle_bet(): Pays out a bet without printing.
         distribute_earnings(): Distribute earnings after the race is completed.
     """
     def __init__(self, start_balance=1000):
@@ -66,6 +69,10 @@ class User:
 
         print("+" + "-" * 105 + "+")
 
+        # Price the race from simulated outcomes
+        odds_engine = OddsEngine(race)
+        odds_engine.display_odds()
+
         selected_horse_id = None
         bet = None
         while bet is None:
@@ -84,7 +91,7 @@ class User:
             return
 
         # Display results and distribute earnings
-        self.distribute_earnings(bet, winning_horse_id, selected_horse_id)
+        self.distribute_earnings(bet, winning_horse_id, selected_horse_id, odds=odds_engine.get_odds(selected_horse_id))
         self.show_balance()
         results = RaceResults(race, race.horses, horse_times)
         results.display_options()
@@ -149,6 +156,26 @@ class User:
 
         return bet, horse_choice
 
+    def settle_bet(self, bet, winning_horse_id, selected_horse_id, odds=2.0):
+        """
+        Pays out a bet that was already taken from the balance, without printing.
+
+        Args:
+            self : Instance of the class.
+            bet (int) : Bet value.
+            winning_horse_id (int) : Horse ID of winner of the race.
+            selected_horse_id (int) : Horse ID of horse selected by the user.
+            odds (float) : Decimal odds paid on a win.
+
+        Returns:
+            winnings (float) : Amount added to the balance, 0 if the horse did not win.
+        """
+        with instrumentation.timer("bet_settlement"):
+            winnings = bet * odds if winning_horse_id == selected_horse_id else 0.0
+            self.balance += winnings
+        instrumentation.count("bets_settled")
+        return winnings
+
     def distribute_earnings(self, bet, winning_horse_id, selected_horse_id, odds=2.0):
         """
         Distribute earnings after the race is completed.
@@ -158,12 +185,11 @@ class User:
             bet (int) : Bet value.
             winning_horse_id (int) : Horse ID of winner of the race.
             selected_horse_id (int) : Horse ID of horse selected by the user.
-            odds (int) : Odds of winning, default value set to 2.0.
+            odds (float) : Decimal odds paid on a win, default value set to 2.0. run_game passes the odds estimated by OddsEngine.
 
         """
+        winnings = self.settle_bet(bet, winning_horse_id, selected_horse_id, odds)
         if winning_horse_id == selected_horse_id:
-            winnings = bet * odds
-            self.balance += winnings
             print(f"\nCongratulations! Horse ID {selected_horse_id} won. You earned ${winnings:.2f}.")
         else:
             print(f"\nSorry, Horse ID {selected_horse_id} did not win. Your balance will be reduced by ${bet:.2f}.")
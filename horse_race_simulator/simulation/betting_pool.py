@@ -0,0 +1,192 @@
+# betting_pool.py
+
+import numpy as np
+from horse_race_simulator.instrumentation import instrumentation
+
+BET_TYPES = {"win": 0, "place": 1}
+
+class BettingPool:
+    """A class representing pari-mutuel win and place pools for one race.
+    Bets are stored in NumPy columns that double in size when full, pool totals per
+    horse are updated as each bet arrives, and odds come from the pools after the
+    takeout. Settlement prices every bet in one vectorized pass.
+    Methods:
+        __init__(): Opens empty pools for a field
+        place_bet(): Adds one bet to a pool
+        place_bets(): Adds many bets in one call
+        odds(): Returns the current decimal odds of every horse
+        dividends(): Returns the payout per unit stake for a finishing order
+        settle(): Pays every bet from the race's final_results
+        payouts_by_bettor(): Totals payouts per bettor
+    """
+
+    def __init__(self, horse_ids, takeout=0.15, place_positions=None, capacity=1024, min_dividend=None):
+        """Initializes BettingPool
+        Args:
+            horse_ids (list): Horse IDs of the field
+            takeout (float): Fraction of each pool kept by the house
+            place_positions (int): Finishing positions paid by place bets, 3 for fields of 8 or more, otherwise 2
+            capacity (int): Number of bets to preallocate
+            min_dividend (float): Lowest payout per unit stake of a winning bet, paid by the house
+                when the pool falls short. None (the default) pays the pool as it stands
+        Attributes:
+            totals: (2, horses) array of win and place pool totals per horse
+            num_bets: Number of bets placed
+        """
+        self.horse_ids = list(horse_ids)
+        self.lanes = {horse_id: lane for lane, horse_id in enumerate(self.horse_ids)}
+        self.takeout = takeout
+        self.min_dividend = min_dividend
+        self.place_positions = place_positions or (3 if len(self.horse_ids) >= 8 else 2)
+        self.totals = np.zeros((len(BET_TYPES), len(self.horse_ids)))
+        self.num_bets = 0
+        self.bettor_ids = np.zeros(capacity, dtype=np.int64)
+        self.bet_lanes = np.zeros(capacity, dtype=np.int32)
+        self.bet_types = np.zeros(capacity, dtype=np.int8)
+        self.amounts = np.zeros(capacity)
+
+    def reserve(self, count):
+        """Grows the bet columns so 'count' more bets fit, doubling their size"""
+        needed = self.num_bets + count
+        if needed <= len(self.amounts):
+            return
+        size = max(needed, 2 * len(self.amounts))
+        for name in ("bettor_ids", "bet_lanes", "bet_types", "amounts"):
+            column = getattr(self, name)
+            grown = np.zeros(size, dtype=column.dtype)
+            grown[:self.num_bets] = column[:self.num_bets]
+            setattr(self, name, grown)
+
+    def place_bet(self, bettor_id, horse_id, amount, bet_type="win"):
+        """Adds one bet and updates the pool total
+        Args:
+            bettor_id (int): ID of the bettor
+            horse_id (int): Horse ID bet on
+            amount (float): Stake, finite and greater than zero
+            bet_type (str): 'win' or 'place'
+        Returns:
+            int: ticket number of the bet
+        """
+        lane = self.lanes.get(horse_id)
+        if lane is None:
+            raise ValueError(f"Horse {horse_id} is not in this race")
+        if not np.isfinite(amount) or amount <= 0:
+            raise ValueError("Bet amount must be a finite number greater than zero")
+        kind = BET_TYPES[bet_type]
+        self.reserve(1)
+        ticket = self.num_bets
+        self.bettor_ids[ticket] = bettor_id
+        self.bet_lanes[ticket] = lane
+        self.bet_types[ticket] = kind
+        self.amounts[ticket] = amount
+        self.totals[kind, lane] += amount
+        self.num_bets += 1
+        return ticket
+
+    def place_bets(self, bettor_ids, horse_ids, amounts, bet_type="win"):
+        """Adds many bets of one type at once
+        Args:
+            bettor_ids: IDs of the bettors
+            horse_ids: Horse ID of every bet
+            amounts: Stake of every bet
+            bet_type (str): 'win' or 'place'
+        Returns:
+            ndarray: ticket numbers of the bets
+        """
+        amounts = np.asarray(amounts, dtype=float)
+        try:
+            lanes = np.fromiter((self.lanes[horse_id] for horse_id in horse_ids), dtype=np.int32, count=len(amounts))
+        except KeyError as er:
+            raise ValueError(f"Horse {er.args[0]} is not in this race") from None
+        if not np.isfinite(amounts).all() or (amounts <= 0).any():
+            raise ValueError("Bet amount must be a finite number greater than zero")
+        kind = BET_TYPES[bet_type]
+        count = len(amounts)
+        self.reserve(count)
+        tickets = np.arange(self.num_bets, self.num_bets + count)
+        self.bettor_ids[tickets] = bettor_ids
+        self.bet_lanes[tickets] = lanes
+        self.bet_types[tickets] = kind
+        self.amounts[tickets] = amounts
+        np.add.at(self.totals[kind], lanes, amounts)
+        self.num_bets += count
+        return tickets
+
+    def odds(self, bet_type="win"):
+        """Returns the decimal odds of every horse if the pool closed now. Place odds
+        are an estimate: the final place dividend also depends on which other horses place.
+        Args:
+            bet_type (str): 'win' or 'place'
+        Returns:
+            dict: horse_id -> decimal odds, None for horses nobody has backed
+        """
+        totals = self.totals[BET_TYPES[bet_type]]
+        net_pool = totals.sum() * (1 - self.takeout)
+        if bet_type == "place":
+            # the profit is shared between the placed horses
+            odds = 1 + (net_pool - totals) / (self.place_positions * np.where(totals > 0, totals, 1))
+        else:
+            odds = net_pool / np.where(totals > 0, totals, 1)
+        if self.min_dividend is not None:
+            odds = np.maximum(odds, self.min_dividend)
+        return {horse_id: (round(float(value), 2) if total > 0 else None) for horse_id, value, total in zip(self.horse_ids, odds, totals)}
+
+    def dividends(self, positions):
+        """Returns the payout per unit stake of every horse for a finishing order.
+        The win pool after takeout is shared by the winner's backers. The place pool
+        after takeout first returns the stakes on the placed horses, and the profit is
+        split equally between the placed horses. When nobody backed a paying horse the
+        pool after takeout is refunded in proportion to the stakes, so the house keeps
+        the takeout of every pool unless min_dividend tops up a payout.
+        Args:
+            positions (ndarray): finishing position of every horse, in horse_ids order
+        Returns:
+            ndarray: (2, horses) dividends for win and place bets
+        """
+        dividends = np.zeros_like(self.totals)
+        win_totals, place_totals = self.totals
+        won = positions == 1
+        placed = positions <= min(self.place_positions, len(self.horse_ids))
+
+        winning_stake = win_totals[won].sum()
+        if winning_stake > 0:
+            dividends[0, won] = win_totals.sum() * (1 - self.takeout) / winning_stake
+        else:
+            dividends[0, :] = 1 - self.takeout # nobody backed the winner, win bets are refunded less the takeout
+
+        backed = placed & (place_totals > 0)
+        if backed.any():
+            profit = place_totals.sum() * (1 - self.takeout) - place_totals[backed].sum()
+            dividends[1, backed] = 1 + profit / backed.sum() / place_totals[backed]
+        else:
+            dividends[1, :] = 1 - self.takeout # nobody backed a placed horse, place bets are refunded less the takeout
+        if self.min_dividend is not None:
+            paying = np.stack([won, placed])
+            dividends[paying] = np.maximum(dividends[paying], self.min_dividend)
+        return dividends
+
+    def settle(self, final_results):
+        """Pays every bet from a race's final_results in one vectorized pass
+        Args:
+            final_results (dict): RaceSimulation.final_results (horse_id -> final_position)
+        Returns:
+            ndarray: payout of every bet, in ticket order
+        """
+        with instrumentation.timer("bet_settlement"):
+            positions = np.array([final_results[horse_id]["final_position"] for horse_id in self.horse_ids])
+            dividends = self.dividends(positions)
+            count = self.num_bets
+            payouts = self.amounts[:count] * dividends[self.bet_types[:count], self.bet_lanes[:count]]
+        instrumentation.count("bets_settled", count)
+        return payouts
+
+    def payouts_by_bettor(self, payouts):
+        """Totals payouts per bettor
+        Args:
+            payouts (ndarray): output of settle
+        Returns:
+            dict: bettor_id -> total payout
+        """
+        bettor_ids, index = np.unique(self.bettor_ids[:self.num_bets], return_inverse=True)
+        totals = np.bincount(index, weights=payouts, minlength=len(bettor_ids))
+        return dict(zip(bettor_ids.tolist(), totals.tolist()))
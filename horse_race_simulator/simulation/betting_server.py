@@ -0,0 +1,293 @@
+# betting_server.py
+
+import argparse
+import asyncio
+import itertools
+import json
+import math
+import time
+from horse_race_simulator.race_data.race_details import Race
+from horse_race_simulator.simulation.race_simulator import HeadlessRaceSimulation
+from horse_race_simulator.simulation.betting_pool import BettingPool, BET_TYPES
+from horse_race_simulator.simulation.betting import User
+
+class RaceRound:
+    """A class representing one race of the schedule: the race, its betting pool,
+    the event that closes betting early and the event that is set once the race
+    has been run and settled."""
+
+    def __init__(self, race_number, race, takeout):
+        self.race_number = race_number
+        self.race = race
+        self.pool = BettingPool([horse.horse_id for horse in race.horses], takeout=takeout)
+        self.status = "open"
+        self.closes_at = None
+        self.close_requested = asyncio.Event()
+        self.settled = asyncio.Event()
+        self.result = None
+
+    def info(self):
+        """Returns the race card sent to bettors"""
+        return {
+            "race_number": self.race_number,
+            "race_id": self.race.race_id,
+            "venue": self.race.venue,
+            "distance": self.race.distance,
+            "weather": self.race.weather,
+            "horses": [horse.horse_id for horse in self.race.horses],
+            "status": self.status,
+            "closes_in": max(self.closes_at - time.monotonic(), 0) if self.closes_at else None,
+            "win_odds": self.pool.odds("win"),
+        }
+
+class BettingServer:
+    """A class representing a local asyncio betting server. Every connection is a
+    session with its own User balance, and all sessions bet into the pari-mutuel
+    pool of the same scheduled race. Each race is simulated once, in a worker
+    thread, and settled for every bettor in one pass.
+    The protocol is one JSON object per line, answered with one JSON object per line:
+        {"cmd": "race"}                                                 current race card
+        {"cmd": "bet", "horse_id": 3917, "amount": 10, "type": "win"}   places a bet
+        {"cmd": "balance"}                                              current balance
+        {"cmd": "wait"}                                                 waits for the race bet on and returns the payout
+        {"cmd": "quit"}                                                 ends the session
+    Methods:
+        __init__(): Initializes the server
+        start(): Starts listening and running the race schedule
+        stop(): Stops the server
+        run_schedule(): Opens, runs and settles races one after another
+        close_betting(): Closes betting on the current race now
+        handle_session(): Serves one connection
+        handle_command(): Answers one command
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, unix_path=None, betting_seconds=2.0, num_horses=5, start_balance=1000, takeout=0.15, races=None, seed=None):
+        """Initializes BettingServer
+        Args:
+            host (str): TCP address to listen on
+            port (int): TCP port, 0 picks a free port
+            unix_path (str): Unix socket path, used instead of TCP when given
+            betting_seconds (float): How long betting stays open for each race, None keeps it open until close_betting is called
+            num_horses (int): Horses per race
+            start_balance (float): Balance of every new session
+            takeout (float): Fraction of each pool kept by the house
+            races (int): Number of races to run, None runs until stopped
+            seed (int): Seed of the first race simulation, race i uses seed + i
+        Attributes:
+            users: Session ID -> User
+            bet_rounds: Session ID -> RaceRound of the session's last bet, waited on by 'wait'
+            current: RaceRound currently open or running
+            sessions_served: Number of sessions that have connected
+        """
+        self.host = host
+        self.port = port
+        self.unix_path = unix_path
+        self.betting_seconds = betting_seconds
+        self.num_horses = num_horses
+        self.start_balance = start_balance
+        self.takeout = takeout
+        self.races = races
+        self.seed = seed
+        self.users = {}
+        self.bet_rounds = {}
+        self.session_ids = itertools.count(1)
+        self.sessions_served = 0
+        self.current = None
+        self.next_round = None
+        self.server = None
+        self.schedule = None
+
+    async def start(self):
+        """Starts listening and runs the race schedule in the background
+        Returns:
+            None
+        """
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self.new_round, 0) # parses the horse pool before the first bettor arrives
+        if self.unix_path:
+            self.server = await asyncio.start_unix_server(self.handle_session, path=self.unix_path)
+        else:
+            self.server = await asyncio.start_server(self.handle_session, self.host, self.port)
+            self.port = self.server.sockets[0].getsockname()[1]
+        self.schedule = asyncio.create_task(self.run_schedule())
+
+    async def stop(self):
+        """Stops the race schedule and closes the listening socket"""
+        if self.schedule is not None:
+            self.schedule.cancel()
+            try:
+                await self.schedule
+            except asyncio.CancelledError:
+                pass
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+
+    def new_round(self, race_number):
+        """Builds the race card for 'race_number'. Runs in a worker thread."""
+        self.next_round = (race_number, Race(num_horses=self.num_horses))
+
+    async def run_schedule(self):
+        """Opens betting on each race, runs it once when betting closes and settles
+        every bet, then moves on to the next race
+        Returns:
+            None
+        """
+        loop = asyncio.get_running_loop()
+        for race_number in itertools.count():
+            if self.races is not None and race_number >= self.races:
+                return
+            if self.next_round is None or self.next_round[0] != race_number:
+                await loop.run_in_executor(None, self.new_round, race_number)
+            race = self.next_round[1]
+            current = RaceRound(race_number, race, self.takeout)
+            if self.betting_seconds is not None:
+                current.closes_at = time.monotonic() + self.betting_seconds
+            self.current = current
+            try:
+                await asyncio.wait_for(current.close_requested.wait(), self.betting_seconds)
+            except asyncio.TimeoutError:
+                pass # the betting window ran out
+
+            current.status = "running"
+            seed = None if self.seed is None else self.seed + race_number
+            # the next card is drawn while this race is simulated
+            simulation, _ = await asyncio.gather(
+                loop.run_in_executor(None, self.simulate, race, seed),
+                loop.run_in_executor(None, self.new_round, race_number + 1),
+            )
+            self.settle(current, simulation)
+
+    def close_betting(self):
+        """Closes betting on the current race now instead of at the end of its window
+        Returns:
+            None
+        """
+        if self.current is not None and self.current.status == "open":
+            self.current.close_requested.set()
+
+    def simulate(self, race, seed):
+        """Runs one race headless. Runs in a worker thread."""
+        simulation = HeadlessRaceSimulation(race, race.track, seed=seed)
+        simulation.start_race()
+        return simulation
+
+    def settle(self, current, simulation):
+        """Pays every bet of the race and wakes the sessions waiting for it"""
+        payouts = current.pool.settle(simulation.final_results)
+        by_bettor = current.pool.payouts_by_bettor(payouts)
+        for session_id, payout in by_bettor.items():
+            user = self.users.get(session_id)
+            if user is not None:
+                user.balance += payout
+        current.result = {
+            "race_id": current.race.race_id,
+            "winning_horse_id": simulation.get_winning_horse_id(),
+            "payouts": by_bettor,
+        }
+        current.status = "settled"
+        current.settled.set()
+
+    async def handle_session(self, reader, writer):
+        """Serves one connection until it sends quit or disconnects"""
+        session_id = next(self.session_ids)
+        self.sessions_served += 1
+        self.users[session_id] = User(start_balance=self.start_balance)
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    request = json.loads(line)
+                    if not isinstance(request, dict):
+                        raise ValueError("A request must be a JSON object")
+                    response = await self.handle_command(session_id, request)
+                except (ValueError, KeyError, TypeError) as er:
+                    response = {"ok": False, "error": str(er)}
+                writer.write(json.dumps(response).encode() + b"\n")
+                await writer.drain()
+                if response.get("quit"):
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            self.users.pop(session_id, None)
+            self.bet_rounds.pop(session_id, None)
+            writer.close()
+
+    async def handle_command(self, session_id, request):
+        """Answers one command of a session
+        Args:
+            session_id (int): session sending the command
+            request (dict): decoded command
+        Returns:
+            dict: response sent back to the session
+        """
+        user = self.users[session_id]
+        command = request.get("cmd")
+        current = self.current
+        if current is None:
+            raise ValueError("No race has been scheduled yet")
+
+        if command == "race":
+            return {"ok": True, "race": current.info()}
+        if command == "balance":
+            return {"ok": True, "balance": user.balance}
+        if command == "bet":
+            bet_type = request.get("type", "win")
+            if bet_type not in BET_TYPES:
+                raise ValueError(f"Unknown bet type '{bet_type}'")
+            if current.status != "open":
+                raise ValueError("Betting is closed for this race")
+            amount = float(request["amount"])
+            if not (math.isfinite(amount) and amount > 0):
+                raise ValueError("Bet amount must be a finite number greater than zero")
+            if amount > user.balance:
+                raise ValueError("Insufficient funds to place bet")
+            ticket = current.pool.place_bet(session_id, request["horse_id"], amount, bet_type)
+            user.balance -= amount
+            self.bet_rounds[session_id] = current
+            return {"ok": True, "race_id": current.race.race_id, "ticket": int(ticket), "balance": user.balance}
+        if command == "wait":
+            # the race the session bet on, which may have settled and been replaced since
+            race_round = self.bet_rounds.pop(session_id, current)
+            await race_round.settled.wait()
+            return {
+                "ok": True,
+                "race_id": race_round.result["race_id"],
+                "winning_horse_id": race_round.result["winning_horse_id"],
+                "payout": race_round.result["payouts"].get(session_id, 0.0),
+                "balance": user.balance,
+            }
+        if command == "quit":
+            return {"ok": True, "quit": True, "balance": user.balance}
+        raise ValueError(f"Unknown command '{command}'")
+
+async def serve(server):
+    """Runs 'server' until it finishes its schedule or is interrupted"""
+    await server.start()
+    address = server.unix_path or f"{server.host}:{server.port}"
+    print(f"Horsle betting server listening on {address}")
+    try:
+        await server.schedule
+    finally:
+        await server.stop()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the Horsle betting server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--unix", help="listen on this Unix socket instead of TCP")
+    parser.add_argument("--betting-seconds", type=float, default=10.0)
+    parser.add_argument("--horses", type=int, default=5)
+    parser.add_argument("--races", type=int, help="number of races to run, runs until interrupted by default")
+    args = parser.parse_args(argv)
+    server = BettingServer(args.host, args.port, args.unix, args.betting_seconds, args.horses, races=args.races)
+    try:
+        asyncio.run(serve(server))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+# event_simulator.py
+
+import heapq
+import math
+from array import array
+import numpy as np
+from horse_race_simulator.simulation.race_simulator import HeadlessRaceSimulation, TICK_SECONDS
+from horse_race_simulator.simulation.trajectory import TrajectoryRecording
+from horse_race_simulator.instrumentation import instrumentation
+
+LEG_NAMES = ["First Leg", "Second Leg", "Third Leg"]
+
+class EventRaceSimulation(HeadlessRaceSimulation):
+    """A subclass of HeadlessRaceSimulation that jumps from one marker crossing to the next.
+    Horses follow the same movement rules, but instead of stepping every horse on every
+    tick, the engine keeps a priority queue with each horse's next marker crossing and
+    samples how many ticks it takes to get there. Crossing times are interpolated inside
+    the movement step, so they are exact rather than rounded to a tick boundary.
+    Positions between crossings are not simulated, so a recording interpolates each
+    horse linearly between its marker crossings.
+    Methods:
+        __init__(): Initializes event driven simulation
+        next_crossing(): Samples when a horse crosses its next marker
+        start_race(): Sets up the race and processes its crossing events
+        process_events(): Processes crossing events in time order until every horse has finished
+        record_crossings(): Builds the recording from the marker crossing times
+    """
+    def __init__(self, race, track, seed=None, tick_seconds=TICK_SECONDS, verbose=False, record=False):
+        """Initializes EventRaceSimulation
+        Attributes:
+            np_rng: NumPy generator derived from rng, used to sample waiting times
+            events: Number of crossing events processed
+        """
+        super().__init__(race, track, seed=seed, tick_seconds=tick_seconds, verbose=verbose, record=record)
+        self.np_rng = np.random.default_rng(self.rng.getrandbits(64))
+        self.events = 0
+
+    def next_crossing(self, state, marker):
+        """Samples when a horse crosses 'marker'. On a tick a horse stalls with 5% chance,
+        moves the weather adjusted step with 15% chance and its normal step otherwise.
+        When the weather step is zero (every current weather factor), the number of ticks
+        needed for k more moves is k plus a negative binomial number of idle ticks, so the
+        crossing is sampled in one draw. Otherwise the horse is stepped tick by tick.
+        Args:
+            self: EventRaceSimulation
+            state (dict): position, ticks, moves and step sizes of the horse, updated in place
+            marker (float): x coordinate of the marker
+        Returns:
+            float: simulated time of the crossing in seconds
+        """
+        step = state["step"]
+        if state["weather_step"] == 0:
+            # total normal moves needed from the start line to reach the marker
+            moves = max(math.ceil((marker - state["start"]) / step), 1)
+            new_moves = moves - state["moves"]
+            if new_moves > 0:
+                state["ticks"] += new_moves + int(self.np_rng.negative_binomial(new_moves, 0.8))
+                state["moves"] = moves
+            before = state["start"] + (moves - 1) * step
+            state["x"] = state["start"] + moves * step
+            fraction = (marker - before) / step
+            return (state["ticks"] - 1 + fraction) * self.tick_seconds
+
+        while state["x"] < marker:
+            state["ticks"] += 1
+            rand_chance = self.rng.random()
+            if rand_chance < 0.05:
+                move_distance = 0
+            elif rand_chance < 0.20:
+                move_distance = state["weather_step"]
+            else:
+                move_distance = step
+            state["x"] += move_distance
+            state["last_move"] = move_distance
+        before = state["x"] - state["last_move"]
+        fraction = (marker - before) / state["last_move"] if state["last_move"] else 1
+        return (state["ticks"] - 1 + fraction) * self.tick_seconds
+
+    def start_race(self):
+        """Sets up the race and processes marker crossing events until every horse has
+        crossed the finish line.
+        Args:
+            self: EventRaceSimulation
+        Returns:
+            None
+        """
+        instrumentation.count("races")
+        with instrumentation.race_profile(), instrumentation.timer("race"):
+            self.race_setup()
+            self.process_events()
+            if self.record:
+                self.record_crossings()
+        instrumentation.count("events", self.events)
+
+    def process_events(self):
+        """Processes marker crossing events in time order until every horse has crossed
+        the finish line. Fills race_data and final_results in the same format as
+        RaceSimulation.
+        Args:
+            self: EventRaceSimulation
+        Returns:
+            None
+        """
+        weather_multiplier = self.track.track_weather[1]
+        markers = self.leg_markers + [self.finish_line]
+
+        states = []
+        queue = []
+        for lane, (race_horse, horse) in enumerate(self.horse_objects):
+            start = race_horse.xcor()
+            state = {
+                "start": start,
+                "x": start,
+                "ticks": 0,
+                "moves": 0,
+                "last_move": 0,
+                "step": horse.speed * 0.1,
+                "weather_step": max((horse.speed * weather_multiplier) * 0.1, 0),
+            }
+            states.append(state)
+            queue.append((self.next_crossing(state, markers[0]), lane, 0))
+        heapq.heapify(queue)
+
+        while queue:
+            event_time, lane, marker_index = heapq.heappop(queue)
+            self.events += 1
+            race_horse, horse = self.horse_objects[lane]
+            horse_data = self.race_data[horse.horse_id]
+
+            if marker_index < len(self.leg_markers):
+                horse_data["leg_times"][LEG_NAMES[marker_index]] = event_time
+                next_marker = marker_index + 1
+                heapq.heappush(queue, (self.next_crossing(states[lane], markers[next_marker]), lane, next_marker))
+                continue
+
+            # Finish line crossing
+            race_horse.x = states[lane]["x"]
+            position = len(self.finished_horses) + 1
+            self.finished_horses.append(race_horse)
+            self.finished.add(race_horse)
+            horse_data["final_position"] = position
+            horse_data["overall_time"] = event_time
+            self.final_results[horse.horse_id] = {
+                "final_position": position,
+                "overall_time": round(event_time, 2),
+                "leg_times": {leg: round(time, 2) for leg, time in horse_data["leg_times"].items()}
+            }
+            self.ticks = max(self.ticks, states[lane]["ticks"])
+            if self.verbose:
+                print(f"Horse {horse.horse_id} has crossed the finish line!")
+
+    def record_crossings(self):
+        """Builds self.recording from the crossing times in race_data. Each horse moves
+        linearly from one marker to the next and stays on the finish line once it has
+        crossed it, so the recording has the same ticks as a HeadlessRaceSimulation
+        recording: the start line plus one entry per tick until the last horse finishes.
+        Args:
+            self: EventRaceSimulation
+        Returns:
+            None
+        """
+        ticks = np.arange(self.ticks + 1) * self.tick_seconds
+        start = -self.finish_line
+        positions = np.empty((len(ticks), len(self.horse_objects)))
+        for lane, (_, horse) in enumerate(self.horse_objects):
+            horse_data = self.race_data[horse.horse_id]
+            times = [0] + [horse_data["leg_times"][leg] for leg in LEG_NAMES] + [horse_data["overall_time"]]
+            xs = [start] + self.leg_markers + [self.finish_line]
+            positions[:, lane] = np.interp(ticks, times, xs)
+        self.recording = TrajectoryRecording([horse.horse_id for _, horse in self.horse_objects], self.track.track_venue, self.track.track_weather, self.tick_seconds, capacity=len(ticks))
+        self.recording.buffer = array('f', positions.astype(np.float32).tobytes())
+        self.recording.num_ticks = len(ticks)
@@ -0,0 +1,266 @@
+# historical_replay.py
+
+import argparse
+import json
+from array import array
+import numpy as np
+from horse_race_simulator.race_data.data_cache import load_runs
+from horse_race_simulator.race_data.horse_history import SECTION_COLUMNS
+from horse_race_simulator.race_data.speed_model import SECTION_LENGTH
+from horse_race_simulator.race_data.horse_stats import HorseTable, HorseView
+from horse_race_simulator.race_data.track_data import Track
+from horse_race_simulator.simulation.race_simulator import TICK_SECONDS
+from horse_race_simulator.simulation.trajectory import TrajectoryRecording
+
+POSITION_COLUMNS = [f'position_sec{section}' for section in range(1, 7)]
+HORSE_COLUMNS = ['horse_id', 'horse_age', 'actual_weight', 'horse_type', 'horse_rating', 'jockey_id']
+LEG_FRACTIONS = np.array([0.25, 0.5, 0.75, 1.0]) # leg markers and finish line, as RaceSimulation.set_markers
+
+class HistoricalRace:
+    """A class representing a race from runs.csv with the attributes of Race
+    (race_id, date, venue, distance, weather, track, horses), so it can be used
+    wherever a simulated race is."""
+
+    def __init__(self, race_id, horses, sections):
+        self.race_id = race_id
+        self.date = "historical"
+        self.prize = None
+        self.horses = horses
+        self.num_horses = len(horses)
+        self.venue = f"Historical race {race_id}"
+        self.distance = SECTION_LENGTH * sections
+        self.weather = "Recorded"
+        self.track = Track()
+        self.track.track_venue = (self.venue, self.distance)
+        self.track.track_weather = (self.weather, 1.0) # conditions are already in the recorded times
+
+class HistoricalReplay:
+    """A class that reconstructs the progression of every race in runs.csv from its
+    sectional times. Cumulative section times, running order, gaps to the leader and
+    leg times are computed for all races at once with array and grouped operations,
+    and each race can then be fed to RaceResults, a TrajectoryRecording or
+    ReplaySimulation like a simulated race. Sections are treated as equal fractions of
+    the race, since runs.csv does not give their lengths.
+    Methods:
+        __init__(): Loads the data set and reconstructs every race
+        race(): Returns a race as a HistoricalRace
+        get_times(): Returns a race's times in the format of RaceSimulation.get_times
+        results(): Returns a race's RaceResults
+        recording(): Returns a race's progression as a TrajectoryRecording
+        section_agreement(): Compares the reconstructed running order with position_sec1..6
+        compare_to_simulation(): Simulates every historical field and compares it with the real results
+    """
+
+    def __init__(self, csv_filename="runs.csv"):
+        """Initializes HistoricalReplay
+        Args:
+            csv_filename: data set in the runs.csv format, see resolve_data_path
+        Attributes:
+            runs: DataFrame of the runs, sorted by race_id
+            race_ids: ID of every race
+            starts: row where each race starts in runs, with the end of the last race appended
+            sections: number of sectionals of every run
+            boundaries: (runs, 7) elapsed time at the start and at the end of each section, NaN where missing
+            section_ranks: (runs, 6) running position at the end of each section within the race
+            gaps: (runs, 6) seconds behind the leader at the end of each section
+            leg_times: (runs, 4) elapsed time at the three leg markers and the finish line
+            horse_table: HorseTable of every run, so races share one set of horse arrays
+        """
+        import pandas as pd
+        runs = load_runs(csv_filename, columns=['race_id', 'result', 'finish_time'] + HORSE_COLUMNS + SECTION_COLUMNS + POSITION_COLUMNS)
+        self.runs = runs.sort_values('race_id', kind='stable').reset_index(drop=True)
+        race_column = self.runs['race_id'].to_numpy()
+        self.race_ids, starts = np.unique(race_column, return_index=True)
+        self.starts = np.append(starts, len(race_column))
+        self.race_index = {race_id: index for index, race_id in enumerate(self.race_ids.tolist())}
+
+        section_times = self.runs[SECTION_COLUMNS].to_numpy(dtype=float)
+        present = ~np.isnan(section_times)
+        self.sections = present.sum(axis=1)
+        cumulative = np.where(present, np.cumsum(np.nan_to_num(section_times), axis=1), np.nan)
+        self.boundaries = np.hstack([np.zeros((len(cumulative), 1)), cumulative])
+
+        # grouped by race: running order and gap to the leader at every section
+        by_race = pd.DataFrame(cumulative, columns=SECTION_COLUMNS).groupby(race_column)
+        self.section_ranks = by_race.rank(method='min').to_numpy()
+        self.gaps = cumulative - by_race.transform('min').to_numpy()
+        self.leg_times = self.times_at_fractions(LEG_FRACTIONS)
+        self.horse_table = self.build_horse_table()
+
+    def build_horse_table(self, rng=None):
+        """Returns a HorseTable of every run, with speeds drawn from 'rng' (see HorseTable)"""
+        return HorseTable(*(self.runs[column].to_numpy() for column in HORSE_COLUMNS), rng=rng)
+
+    def times_at_fractions(self, fractions):
+        """Returns the elapsed time of every run at each fraction of the race, interpolated
+        linearly inside the section the fraction falls in
+        Args:
+            fractions (ndarray): fractions of the race between 0 and 1
+        Returns:
+            ndarray: (runs, fractions) elapsed times
+        """
+        progress = fractions[None, :] * self.sections[:, None] # in sections
+        section = np.minimum(np.floor(progress).astype(int), self.sections[:, None] - 1)
+        start = np.take_along_axis(self.boundaries, section, axis=1)
+        end = np.take_along_axis(self.boundaries, section + 1, axis=1)
+        return start + (progress - section) * (end - start)
+
+    def rows(self, race_id):
+        """Returns the slice of runs holding 'race_id'"""
+        index = self.race_index.get(race_id)
+        if index is None:
+            raise ValueError(f"Race {race_id} is not in the data set")
+        return slice(self.starts[index], self.starts[index + 1])
+
+    def race(self, race_id, horse_table=None):
+        """Returns a race of the data set with its horses as HorseView objects
+        Args:
+            race_id (int): Race ID
+            horse_table (HorseTable): table the horses are read from, horse_table if None
+        Returns:
+            HistoricalRace: the race, with horses in data set order
+        """
+        rows = self.rows(race_id)
+        table = self.horse_table if horse_table is None else horse_table
+        horses = [HorseView(table, index) for index in range(rows.start, rows.stop)]
+        return HistoricalRace(race_id, horses, int(self.sections[rows].max()))
+
+    def get_times(self, race_id):
+        """Returns the times of a race in the format of RaceSimulation.get_times
+        Args:
+            race_id (int): Race ID
+        Returns:
+            dict: Horse ID -> Leg 1..3 Time and Overall Time
+        """
+        rows = self.rows(race_id)
+        times = {}
+        for horse_id, legs in zip(self.runs['horse_id'].to_numpy()[rows].tolist(), np.round(self.leg_times[rows], 2).tolist()):
+            times[horse_id] = {"Overall Time": legs[3], "Leg 1 Time": legs[0], "Leg 2 Time": legs[1], "Leg 3 Time": legs[2]}
+        return times
+
+    def results(self, race_id):
+        """Returns the RaceResults of a race, for the leaderboard and race summary
+        Args:
+            race_id (int): Race ID
+        Returns:
+            RaceResults: results built from the recorded times
+        """
+        from horse_race_simulator.simulation.race_results import RaceResults
+        race = self.race(race_id)
+        return RaceResults(race, race.horses, self.get_times(race_id))
+
+    def recording(self, race_id, tick_seconds=TICK_SECONDS):
+        """Returns the progression of a race as a TrajectoryRecording, in the track
+        coordinates of RaceSimulation, for replay_text or ReplaySimulation
+        Args:
+            race_id (int): Race ID
+            tick_seconds (float): seconds between recorded positions
+        Returns:
+            TrajectoryRecording: position of every horse on every tick until the last horse finishes
+        """
+        rows = self.rows(race_id)
+        boundaries = self.boundaries[rows]
+        sections = self.sections[rows]
+        finish = np.nanmax(boundaries)
+        ticks = np.arange(int(np.ceil(finish / tick_seconds)) + 1) * tick_seconds
+
+        # progress through each section is linear between its start and end time
+        starts, ends = boundaries[:, :-1, None], boundaries[:, 1:, None]
+        with np.errstate(invalid='ignore'):
+            section_progress = np.clip((ticks[None, None, :] - starts) / (ends - starts), 0, 1)
+        progress = np.nansum(section_progress, axis=1) / sections[:, None]
+
+        race = self.race(race_id)
+        scaled_length = 0.3 * race.distance
+        positions = -scaled_length / 2 + progress.T * scaled_length
+        recording = TrajectoryRecording([horse.horse_id for horse in race.horses], race.track.track_venue, race.track.track_weather, tick_seconds, capacity=len(ticks))
+        recording.buffer = array('f', positions.astype(np.float32).tobytes())
+        recording.num_ticks = len(ticks)
+        return recording
+
+    def section_agreement(self):
+        """Compares the running order rebuilt from the sectional times with the recorded
+        position_sec1..6, ranked within the horses of each race in the data set
+        Returns:
+            float: fraction of (run, section) pairs where both orders agree
+        """
+        recorded = self.runs[POSITION_COLUMNS].groupby(self.runs['race_id'].to_numpy()).rank(method='min').to_numpy()
+        compared = ~np.isnan(recorded) & ~np.isnan(self.section_ranks)
+        return float((recorded[compared] == self.section_ranks[compared]).mean())
+
+    def compare_to_simulation(self, seed=None, min_horses=2):
+        """Simulates every historical field once on its reconstructed track with
+        BatchRaceSimulation and compares the outcomes with the real ones. Simulated
+        times are in the simulator's own clock, so they are converted to real seconds
+        with one factor for the whole data set, chosen so that the mean simulated finish
+        time equals the mean recorded one. Winning times and spreads then show whether
+        the simulator reproduces the margins within a race, not its absolute pace.
+        Args:
+            seed: seed of the horse speeds and the simulation
+            min_horses (int): races with fewer horses are left out
+        Returns:
+            dict: races compared, winner_agreement (fraction of races won by the same horse),
+            rank_correlation (mean Spearman correlation of the finishing orders, races of 3 or more),
+            historical/simulated mean winning time and mean spread (standard deviation of finish times within a race)
+            in seconds, and time_scale, the real seconds per simulated second
+        """
+        from horse_race_simulator.simulation.batch_simulator import BatchRaceSimulation
+        counts = np.diff(self.starts)
+        race_ids = self.race_ids[counts >= min_horses]
+        if len(race_ids) == 0:
+            raise ValueError(f"No race has {min_horses} or more horses")
+        rng = np.random.default_rng(seed)
+        horse_table = self.build_horse_table(rng)
+        races = [self.race(race_id, horse_table) for race_id in race_ids.tolist()]
+        batch = BatchRaceSimulation(races, seed=rng)
+        batch.start_race()
+        simulated_positions = batch.get_positions()
+        simulated_times = np.where(batch.lane_mask, batch.finish_ticks * batch.tick_seconds, np.nan)
+
+        # historical finish times padded to the same (races, lanes) layout as the batch
+        lanes = np.arange(batch.lane_mask.shape[1])
+        rows = self.starts[np.searchsorted(self.race_ids, race_ids)][:, None] + lanes
+        historical_times = np.where(batch.lane_mask, self.leg_times[np.minimum(rows, len(self.runs) - 1), 3], np.nan)
+        time_scale = np.nanmean(historical_times) / np.nanmean(simulated_times)
+        simulated_times = simulated_times * time_scale
+        historical_positions = np.where(batch.lane_mask, np.argsort(np.argsort(np.where(batch.lane_mask, historical_times, np.inf), axis=1, kind='stable'), axis=1) + 1, 0)
+
+        same_winner = np.argmax(simulated_positions == 1, axis=1) == np.argmax(historical_positions == 1, axis=1)
+        field = batch.lane_mask.sum(axis=1)
+        larger = field >= 3
+        correlation = np.nan
+        if larger.any():
+            # Spearman correlation is the Pearson correlation of the ranks
+            mask = batch.lane_mask[larger]
+            simulated = np.where(mask, simulated_positions[larger], np.nan)
+            historical = np.where(mask, historical_positions[larger], np.nan)
+            simulated = simulated - np.nanmean(simulated, axis=1, keepdims=True)
+            historical = historical - np.nanmean(historical, axis=1, keepdims=True)
+            correlation = float(np.nanmean(np.nansum(simulated * historical, axis=1) / np.sqrt(np.nansum(simulated ** 2, axis=1) * np.nansum(historical ** 2, axis=1))))
+        return {
+            "races": len(race_ids),
+            "winner_agreement": float(same_winner.mean()),
+            "rank_correlation": correlation,
+            "historical_winning_time": float(np.nanmin(historical_times, axis=1).mean()),
+            "simulated_winning_time": float(np.nanmin(simulated_times, axis=1).mean()),
+            "historical_spread": float(np.nanstd(historical_times, axis=1).mean()),
+            "simulated_spread": float(np.nanstd(simulated_times, axis=1).mean()),
+            "time_scale": float(time_scale),
+        }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay historical races from runs.csv and compare the simulator with them.")
+    parser.add_argument("--csv", default="runs.csv", help="data set in the runs.csv format")
+    parser.add_argument("--race", type=int, help="show the leaderboard and a text replay of this race")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the comparison simulation")
+    args = parser.parse_args(argv)
+    replay = HistoricalReplay(args.csv)
+    if args.race is not None:
+        replay.results(args.race).display_leaderboard()
+        replay.recording(args.race).replay_text()
+    report = replay.compare_to_simulation(seed=args.seed)
+    report["section_agreement"] = replay.section_agreement()
+    print(json.dumps(report, indent=2))
+
+if __name__ == "__main__":
+    main()
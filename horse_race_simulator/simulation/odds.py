@@ -0,0 +1,106 @@
+# odds.py
+
+import time
+from statistics import NormalDist
+import numpy as np
+from horse_race_simulator.simulation.batch_simulator import BatchRaceSimulation
+
+MAX_ODDS = 100.0 # odds paid for a horse that never won a simulated race, and the cap on all odds
+
+class OddsEngine:
+    """A class that prices a race by simulating it many times (Monte Carlo)
+    Methods:
+        __init__(): Initializes the odds engine for a race
+        estimate_odds(): Simulates the race until the sample or time budget is used up
+        get_odds(): Returns the fair odds for one horse
+        display_odds(): Prints win probabilities and odds for every horse
+    """
+    def __init__(self, race, max_samples=20000, time_budget=0.25, batch_size=2000, confidence=0.95, max_odds=MAX_ODDS, seed=None):
+        """Initializes OddsEngine
+        Args:
+            race: Race to price (uses its horses and track)
+            max_samples (int): Maximum number of simulated races, at least 1
+            time_budget (float): Maximum seconds spent simulating
+            batch_size (int): Races simulated per batch, at least 1
+            confidence (float): Confidence level of the win probability bounds
+            max_odds (float): Odds paid for a horse that never won a simulated race
+            seed: Seed for the random number generator
+        """
+        if max_samples < 1 or batch_size < 1:
+            raise ValueError("max_samples and batch_size must be at least 1")
+        self.race = race
+        self.max_samples = max_samples
+        self.time_budget = time_budget
+        self.batch_size = batch_size
+        self.confidence = confidence
+        self.max_odds = max_odds
+        self.rng = np.random.default_rng(seed)
+        self.samples = 0
+        self.odds = {}
+
+    def estimate_odds(self):
+        """Simulates the race in batches until 'max_samples' races have been run or
+        'time_budget' seconds have passed (at least one batch is always run).
+        Args:
+            self: OddsEngine
+        Returns:
+            dict: odds (Dictionary of horse IDs with win probability, confidence bounds and fair odds)
+        """
+        horse_ids = [horse.horse_id for horse in self.race.horses]
+        wins = np.zeros(len(horse_ids), dtype=np.int64)
+        self.samples = 0
+        start_time = time.perf_counter()
+
+        while self.samples < self.max_samples:
+            repeats = min(self.batch_size, self.max_samples - self.samples)
+            batch = BatchRaceSimulation(self.race, repeats=repeats, seed=self.rng)
+            batch.start_race()
+            winning_lanes = np.argmax(batch.get_positions() == 1, axis=1)
+            wins += np.bincount(winning_lanes, minlength=len(horse_ids))
+            self.samples += repeats
+            if time.perf_counter() - start_time >= self.time_budget:
+                break
+
+        # Wilson score interval for each win probability
+        z = NormalDist().inv_cdf(0.5 + self.confidence / 2)
+        p = wins / self.samples
+        denominator = 1 + z ** 2 / self.samples
+        centre = (p + z ** 2 / (2 * self.samples)) / denominator
+        margin = z * np.sqrt(p * (1 - p) / self.samples + z ** 2 / (4 * self.samples ** 2)) / denominator
+
+        self.odds = {}
+        for i, horse_id in enumerate(horse_ids):
+            self.odds[horse_id] = {
+                "win_probability": float(p[i]),
+                "lower_bound": float(min(max(centre[i] - margin[i], 0.0), p[i])),
+                "upper_bound": float(max(min(centre[i] + margin[i], 1.0), p[i])),
+                "odds": round(float(min(1 / p[i], self.max_odds)), 2) if p[i] > 0 else self.max_odds,
+            }
+        return self.odds
+
+    def get_odds(self, horse_id):
+        """Returns the fair (decimal) odds for a horse, estimating them first if needed
+        Args:
+            self: OddsEngine
+            horse_id (int): Horse ID
+        Returns:
+            float: odds paid per unit bet if the horse wins
+        """
+        if not self.odds:
+            self.estimate_odds()
+        return self.odds[horse_id]["odds"]
+
+    def display_odds(self):
+        """Prints win probability and odds for every horse in the race
+        Args:
+            self: OddsEngine
+        Returns:
+            None
+        """
+        if not self.odds:
+            self.estimate_odds()
+        print(f"\nOdds from {self.samples:,} simulated races:")
+        print(f"{'Horse':<10}{'Win chance':<25}{'Odds':<10}")
+        for horse_id, odds in self.odds.items():
+            chance = f"{odds['win_probability']:.1%} ({odds['lower_bound']:.1%}-{odds['upper_bound']:.1%})"
+            print(f"{horse_id:<10}{chance:<25}{odds['odds']:<10}")
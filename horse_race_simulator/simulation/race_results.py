@@ -1,11 +1,40 @@
 # race_results.py
 
-import pandas as pd
+from horse_race_simulator.race_data.data_cache import load_runs
+from horse_race_simulator.race_data.horse_history import HorseHistoryIndex
+from horse_race_simulator.instrumentation import instrumentation
 
 class InvalidInputError(Exception):
     """Custom exception raised when input is not a valid input."""
     pass
 
+class LazyHistory:
+    """Class attribute that loads the historical data set on first access instead of at import time."""
+
+    def __init__(self, csv_filename):
+        """Initializes the attribute without reading 'csv_filename'"""
+        self.csv_filename = csv_filename
+        self.data = None
+
+    def __get__(self, instance, owner):
+        """Loads the data set the first time it is used and returns the cached frame afterwards"""
+        if self.data is None:
+            self.data = load_runs(self.csv_filename)
+        return self.data
+
+class LazyHistoryIndex:
+    """Class attribute that builds the per horse history index from 'hist' on first access."""
+
+    def __init__(self):
+        """Initializes the attribute without building the index"""
+        self.index = None
+
+    def __get__(self, instance, owner):
+        """Builds the index the first time it is used and returns it afterwards"""
+        if self.index is None:
+            self.index = HorseHistoryIndex(owner.hist)
+        return self.index
+
 class RaceResults:
     """A class representing the results of the race simulation
     Methods:
@@ -16,21 +45,28 @@ class RaceResults:
         display_leaderboard(): displays a leaderboard of the race results
         generate_race_summary(): displays a detailed summary of the race
         get_horse_performance(): displays performance details for a specific horse
+        add_to_history(): adds this race's results to the historical index
+        use_history_store(): answers historical comparisons from an indexed SQLite store
         get_horse_age(): retrieve horse age
         get_horse_type(): retrieve horse type (breed)
         get_horse_weight(): retrieve horse weight
         get_horse_jockey(): retrieve horse jockey (the person riding the horse)
     """
     
-    hist = pd.read_csv('runs.csv')
+    hist = LazyHistory('runs.csv') # loaded on first use
+    history_index = LazyHistoryIndex() # per horse aggregates of hist, built on first use
+    history_store = None # optional HistoryStore, used instead of history_index when set
     track_length = 50 # solely for display purposes
+    display_limit = 20 # rows printed per table, larger fields are truncated
 
     def __init__(self, race, horses, horse_timings):
         """Initializes race results information"""
         self.race_id = race.race_id
         self.date = race.date
         self.horses = horses
-        self.data = self.get_horse_timing_data_frame(horse_timings)
+        self.horses_by_id = {horse.horse_id: horse for horse in horses} # constant time lookups for large fields
+        with instrumentation.timer("results_frame"):
+            self.data = self.get_horse_timing_data_frame(horse_timings)
 
     def get_horse_timing_data_frame(self, horse_timings):
         """retrieves a data frame with the horse times across the race simulation
@@ -40,31 +76,21 @@ class RaceResults:
         Returns:
            data frame: data frame of the horse ids witht their times
         """
-        min_finish_time_overall = min(horse_timings.items(), key=lambda item: item[1]['Overall Time'])[1]['Overall Time'];
-        min_finish_time_first_leg = min(horse_timings.items(), key=lambda item: item[1]['Leg 1 Time'])[1]['Leg 1 Time'];
-        min_finish_time_second_leg = min(horse_timings.items(), key=lambda item: item[1]['Leg 2 Time'])[1]['Leg 2 Time'];
-        min_finish_time_third_leg = min(horse_timings.items(), key=lambda item: item[1]['Leg 3 Time'])[1]['Leg 3 Time'];
-        
-        horse_ids = []
-        step1_location = []
-        step2_location = []
-        step3_location = []
-        step4_location = []
-        final_position = []
-        finish_times = []
-        poisition = 1;
-
-        for horse_id, timings in horse_timings.items():
-            horse_ids.append(horse_id)
-            step1_location.append(RaceResults.track_length * 0.25 * (min_finish_time_first_leg/timings['Leg 1 Time']))
-            step2_location.append(RaceResults.track_length * 0.5 * (min_finish_time_second_leg/timings['Leg 2 Time']))
-            step3_location.append(RaceResults.track_length * 0.75 * (min_finish_time_third_leg/timings['Leg 3 Time']))
-            step4_location.append(RaceResults.track_length * (min_finish_time_overall/timings['Overall Time']))
-            finish_times.append(timings['Overall Time'])
-            final_position.append(self.get_horse_position(horse_timings, horse_id))
-            poisition += 1
-
-        horse_timing_data_set = {'horse_id': horse_ids, 'steps1': step1_location, 'steps2': step2_location, 'steps3': step3_location, 'steps4': step4_location,'result': final_position, 'finish_time': finish_times}
+        import numpy as np
+        import pandas as pd
+        horse_ids = list(horse_timings)
+        times = pd.DataFrame.from_records(list(horse_timings.values()), columns=['Leg 1 Time', 'Leg 2 Time', 'Leg 3 Time', 'Overall Time']).to_numpy(dtype=float)
+
+        # each step location is the track fraction scaled by (fastest time / horse time), one column at a time
+        track_fractions = RaceResults.track_length * np.array([0.25, 0.5, 0.75, 1.0])
+        step_locations = track_fractions * (times.min(axis=0) / times)
+
+        # a stable argsort ranks ties in the order the horses were given, like get_horse_position
+        finish_times = times[:, 3]
+        final_position = np.empty(len(horse_ids), dtype=int)
+        final_position[np.argsort(finish_times, kind='stable')] = np.arange(1, len(horse_ids) + 1)
+
+        horse_timing_data_set = {'horse_id': horse_ids, 'steps1': step_locations[:, 0], 'steps2': step_locations[:, 1], 'steps3': step_locations[:, 2], 'steps4': step_locations[:, 3], 'result': final_position, 'finish_time': finish_times}
         return pd.DataFrame(horse_timing_data_set)
 
     def get_horse_position(self, horse_timings, horse_id):
@@ -141,8 +167,9 @@ Enter your selection: """)
         print("------------------------------------------------------------")
         print(f"{'Position':<10}{'Horse':<15}{'Time (s)':<10}")
         print("------------------------------------------------------------")
-        for i in range(len(self.horses)):
+        for i in range(min(len(sub_df), RaceResults.display_limit)):
             print(f"{position[i]:<10}{horse[i]:<15}{finish_time[i]:<10}")
+        self.print_hidden_rows(len(sub_df))
     
         # Winner announcement
         print(f"\n🎉 Winner: {horse[0]} with a time of {finish_time[0]} seconds! 🎉")
@@ -167,49 +194,21 @@ Enter your selection: """)
          
         # Add visualizations
         
-        horses = self.data['horse_id']
-        positions = [0]* len(horses) # Starting positions
+        # large fields only show the leading horses
+        shown = self.data if len(self.data) <= RaceResults.display_limit else self.data.nsmallest(RaceResults.display_limit, 'result')
+        horses = shown['horse_id'].tolist()
         
         print("\n🏁 Race Snapshot 🏁")
         print("------------------------------------------------------------")
         # Print race for each stage
-        print('\nStage 1:\n')
-        # Update positions 
-        step1 = self.data['steps1'].astype(int)
-        for i in range(len(self.data)):
-            positions[i] = step1[i] 
-        
-        # Display the race track
-        for i, horse in enumerate(horses):
-            print(f"{horse}: " + "-" * positions[i] + "🐢" + "-" * (RaceResults.track_length - positions[i]))
-        
-        print('\nStage 2:\n')
-        step2 = self.data['steps2'].astype(int)
-        for i in range(len(self.data)):
-            positions[i] = step2[i]  
-        
-        # Display the race track
-        for i, horse in enumerate(horses):
-            print(f"{horse}: " + "-" * positions[i] + "🐢" + "-" * (RaceResults.track_length - positions[i]))
-        
-        
-        print('\nStage 3:\n')
-        step3 = self.data['steps3'].astype(int)
-        for i in range(len(self.data)):
-            positions[i] = step3[i]  
-        
-        # Display the race track
-        for i, horse in enumerate(horses):
-            print(f"{horse}: " + "-" * positions[i] + "🐢" + "-" * (RaceResults.track_length - positions[i]))
-        
-        print('\nStage 4:\n')
-        step4 = self.data['steps4'].astype(int)
-        for i in range(len(self.data)):
-            positions[i] = step4[i]  
-        
-        # Display the race track
-        for i, horse in enumerate(horses):
-            print(f"{horse}: " + "-" * positions[i] + "🐢" + "-" * (RaceResults.track_length - positions[i]))
+        for stage in range(1, 5):
+            print(f'\nStage {stage}:\n')
+            positions = shown[f'steps{stage}'].astype(int).tolist()
+            
+            # Display the race track
+            for horse, position in zip(horses, positions):
+                print(f"{horse}: " + "-" * position + "🐢" + "-" * (RaceResults.track_length - position))
+        self.print_hidden_rows(len(self.data))
         
     def get_horse_performance(self):
         """Retrieve performance summary for a specific horse, can be called for every horse in the race 
@@ -228,8 +227,9 @@ Enter your selection: """)
         print("------------------------------------------------------------")
         print(f"{'Position':<10}{'Horse':<15}")
         print("------------------------------------------------------------")
-        for i in range(len(self.horses)):
+        for i in range(min(len(sub_df), RaceResults.display_limit)):
             print(f"{position[i]:<10}{horse[i]:<15}")
+        self.print_hidden_rows(len(sub_df))
 
         horse_id_input = -1
         while True:
@@ -255,13 +255,9 @@ Enter your selection: """)
         finish_time = self.data.loc[self.data['horse_id'] == horse_id_input,'finish_time'].iloc[0]
         rank = self.data.loc[self.data['horse_id'] == horse_id_input,'result'].iloc[0]
             
-        # Historical data for comparison
-        average_finish_time = RaceResults.hist[RaceResults.hist['horse_id'] == horse_id_input]['finish_time'].mean()
-        win_count = RaceResults.hist[(RaceResults.hist['horse_id'] == horse_id_input) & (RaceResults.hist['won'] == 1)]['horse_id'].count()
-        average_rank = round(RaceResults.hist[RaceResults.hist['horse_id'] == horse_id_input]['result'].mean())
-        number_of_races = RaceResults.hist[RaceResults.hist['horse_id'] == horse_id_input]['race_id'].nunique()
-        win_ratio = (win_count/number_of_races)*100
-        
+        # Historical data for comparison, looked up in the SQLite store or the precomputed per horse index
+        history = (RaceResults.history_store or RaceResults.history_index).lookup(horse_id_input)
+
         # Display the Performance results
         print(f"🐢 Horse Performance : {horse_id_input} 🐢")
         print("------------------------------------------------------------")
@@ -271,42 +267,68 @@ Enter your selection: """)
         print(f" {'Horse type:':<20} {self.get_horse_type(horse_id_input)}")
         print(f" Weight: {self.get_horse_weight(horse_id_input)}")
         print(f" Jockey: {self.get_horse_jockey(horse_id_input)}")
-        print(f" Historical Win count: {win_count} of {number_of_races} races [Win ratio of {win_ratio:.2f}%] ")
+        if history is None:
+            print(" No historical results for this horse.")
+            return None
+        print(f" Historical Win count: {history['wins']} of {history['races']} races [Win ratio of {history['win_ratio']:.2f}%] ")
     
         # Display table
+        average_finish_time = history['mean_finish_time']
+        average_rank = round(history['mean_rank'])
         print("------------------------------------------------------------")
         print(f"{'Metric':<20}{'Current race':<20}{'Past performance':<20}")
         print("------------------------------------------------------------")
         print(f"{'Finish time (sec)':<20}{round(finish_time,5):<20}{round(average_finish_time,5):<20}")
         print(f"{'Rank':<20}{rank:<20}{average_rank:<20}")
+
+    def add_to_history(self):
+        """Adds the results of this race to the history store, or the historical index if no store is set
+        Parameters:
+           self: the race results object
+        Returns:
+           None
+        """
+        if RaceResults.history_store is not None:
+            RaceResults.history_store.add_results(self.race_id, self.data)
+        else:
+            RaceResults.history_index.append(self.data, self.race_id)
+
+    @classmethod
+    def use_history_store(cls, path, csv_filename='runs.csv'):
+        """Answers historical comparisons from the SQLite store at 'path' instead of the
+        in-memory history, loading 'csv_filename' into it if the store is empty
+        Parameters:
+           path: SQLite file shared by every process
+           csv_filename: data set loaded into a new store
+        Returns:
+           HistoryStore: the store
+        """
+        from horse_race_simulator.race_data.history_store import HistoryStore
+        store = HistoryStore(path)
+        store.ingest_csv(csv_filename, if_empty=True) # checked and loaded atomically, other processes may be opening it too
+        cls.history_store = store
+        return store
         
     # supplementary methods
+    def print_hidden_rows(self, num_rows):
+        if num_rows > RaceResults.display_limit:
+            print(f"... {num_rows - RaceResults.display_limit} more horses not shown")
+
     def find_horse_by_id(self, horse_id):
-        for horse in self.horses:
-            if horse.horse_id == horse_id:
-                return horse
-        return None
+        return self.horses_by_id.get(horse_id)
     
     def get_horse_age(self, horse_id):
-        for horse in self.horses:
-            if horse.horse_id == horse_id:
-                return horse.horse_age
-        return None  # Return None if the horse_id is not found
+        horse = self.horses_by_id.get(horse_id)
+        return horse.horse_age if horse else None  # Return None if the horse_id is not found
 
     def get_horse_type(self, horse_id):
-        for horse in self.horses:
-            if horse.horse_id == horse_id:
-                return horse.horse_type
-        return None  # Return None if the horse_id is not found
+        horse = self.horses_by_id.get(horse_id)
+        return horse.horse_type if horse else None  # Return None if the horse_id is not found
 
     def get_horse_weight(self, horse_id):
-        for horse in self.horses:
-            if horse.horse_id == horse_id:
-                return horse.actual_weight
-        return None  # Return None if the horse_id is not found
+        horse = self.horses_by_id.get(horse_id)
+        return horse.actual_weight if horse else None  # Return None if the horse_id is not found
 
     def get_horse_jockey(self, horse_id):
-        for horse in self.horses:
-            if horse.horse_id == horse_id:
-                return horse.jockey_id
-        return None  # Return None if the horse_id is not found
+        horse = self.horses_by_id.get(horse_id)
+        return horse.jockey_id if horse else None  # Return None if the horse_id is not found
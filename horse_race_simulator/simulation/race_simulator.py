@@ -1,47 +1,110 @@
 # race_simulator.py
 
-from random import random
-import turtle
+import random
 import time
+from types import SimpleNamespace
+from horse_race_simulator.simulation.trajectory import TrajectoryRecording
+from horse_race_simulator.instrumentation import instrumentation
+from horse_race_simulator.race_data.track_data import Track
+
+TICK_SECONDS = 0.05 # length of one simulation tick, matches the 50 ms screen timer
+FRAME_MS = 50 # delay between drawn frames in the graphical race
+LANE_SPAN = 250 # height of the lanes between the track edges, in screen units
+
+class TrackPosition:
+    """A lightweight stand-in for a turtle that only tracks a horse's x coordinate
+    Methods:
+        __init__(): Initializes position
+        forward(): Moves the position along the track
+        xcor(): Returns the current x coordinate
+    """
+    __slots__ = ("x",)
+
+    def __init__(self, x):
+        """Initializes the position at x coordinate 'x'"""
+        self.x = x
+
+    def forward(self, distance):
+        """Moves the position 'distance' units along the track"""
+        self.x += distance
+
+    def xcor(self):
+        """Returns the current x coordinate"""
+        return self.x
 
 class RaceSimulation:
     """A class representing race simulation
     Methods:
         __init__(): Initializes simulation
+        open_screen(): Opens the graphics window
         draw_track(): Creates track imagery
+        set_markers(): Scales track and places finish line and leg markers
+        lane_layout(): Returns the lane centres and lane width for a field
         race_setup(): Sets up screen and horses for race
-        update_position(): Moves horses through race
+        create_turtles(): Creates the turtles that draw the horses
+        place_horses(): Places every horse at the start line
+        add_horse(): Registers a horse and its race data
+        update_position(): Moves horses through race by one tick of the simulated clock
+        move_horses(): Applies one round of movement to every horse
+        render_frame(): Catches the physics up with the wall clock and draws one frame
+        draw_frame(): Moves the turtles to the current positions and updates the screen
         start_race(): Starts and times race
         get_times(): Returns a dictionary of race times for each horse
         get_winning_horse_id(): Returns winning horse ID
     """
-    def __init__(self, race, track):
+    def __init__(self, race, track, record=False):
         """Initializes RaceSimulation
         Attributes:
             screen: Generates race screen
             track: Contains venue and weather factors
             horses: Contains horse objects for race
-            horse_objects: Objects representing each horse
+            horse_objects: Pairs of (TrackPosition, Horse) moved by the race physics
+            horse_turtles: Turtles drawing each horse, in the same order as horse_objects
             finish_line: Establishes finish line on track
             finished_horses: List of horses finishing the race
-            start_time: Start time of race
+            finished: Set of the same horses, for constant time membership checks
+            start_time: Wall clock start of the race, only used to pace drawing
             race_data: Dictionary containing race data
             leg_markers: Marker positions for legs of race
             final_results: Dictionary of final horse race results
+            rng: Source of random numbers for horse movement
+            verbose: Print a message when a horse crosses the finish line
+            tick_seconds: Simulated seconds per physics tick
+            ticks: Number of physics ticks run so far
+            record: Record every horse's position on every tick
+            recording: TrajectoryRecording of the race when 'record' is set
         """
         try: # try-except block for step 3
-            self.screen = turtle.Screen()
+            self.screen = self.open_screen()
         except Exception as er:
             print(f"Error initializing graphics window: {er}")
         self.track = track
         self.horses = race.horses
         self.horse_objects = []
+        self.horse_turtles = []
         self.finish_line = None
         self.finished_horses = []
+        self.finished = set()
         self.start_time = None
         self.race_data = {}  # Store race data for each horse
         self.leg_markers = []  #  legs
         self.final_results = {}  # Dictionary to store final results
+        self.rng = random
+        self.verbose = True
+        self.tick_seconds = TICK_SECONDS
+        self.ticks = 0
+        self.record = record
+        self.recording = None
+
+    def open_screen(self):
+        """Opens the graphics window used for the race.
+        Args:
+            self: RaceSimulation
+        Returns:
+            turtle.Screen: the race screen
+        """
+        import turtle # imported on first use so headless callers never load tkinter
+        return turtle.Screen()
 
     def draw_track(self, scaled_length):
         """Creates track imagery used for race simulation.
@@ -51,6 +114,7 @@ class RaceSimulation:
         Returns:
             None
         """
+        import turtle
 
         # Create a track turtle for the main track
         track = turtle.Turtle()
@@ -73,13 +137,15 @@ class RaceSimulation:
         lane_turtle.color("white")
         lane_turtle.speed(0.5)
 
-        # Draw lanes for horses
-        y_lanes = [-125, -75, -25, 25, 75, 125]
-        for y_pos in y_lanes:
-            lane_turtle.goto(-scaled_length / 2, y_pos)
-            lane_turtle.pendown()
-            lane_turtle.forward(scaled_length)
-            lane_turtle.penup()
+        # Draw lanes for horses, one boundary above and below every lane
+        y_positions, lane_width = self.lane_layout(len(self.horses))
+        if lane_width >= 5: # thinner lanes would paint the track white
+            y_lanes = [y_pos - lane_width / 2 for y_pos in y_positions] + [LANE_SPAN / 2]
+            for y_pos in y_lanes:
+                lane_turtle.goto(-scaled_length / 2, y_pos)
+                lane_turtle.pendown()
+                lane_turtle.forward(scaled_length)
+                lane_turtle.penup()
 
         lane_turtle.hideturtle()
 
@@ -103,11 +169,63 @@ class RaceSimulation:
         Returns:
             None
         """
-        # Set up screen
-        self.screen.title("Horsle")
-        self.screen.bgcolor("DarkGreen")
-        self.screen.setup(width=800, height=600)
+        with instrumentation.timer("race_setup"):
+            # Set up screen
+            self.screen.title("Horsle")
+            self.screen.bgcolor("DarkGreen")
+            self.screen.setup(width=800, height=600)
+            self.screen.tracer(0)  # No automatic redraws, draw_frame pushes one update per frame
 
+            scaled_length = self.set_markers()
+
+            self.draw_track(scaled_length)  # Draw the track and lanes
+
+            self.create_turtles(scaled_length, len(self.horses))
+            self.place_horses(scaled_length)
+
+    def create_turtles(self, scaled_length, num_horses):
+        """Creates one turtle per lane at the start line to draw the horses.
+        Args:
+            self: RaceSimulation
+            scaled_length (float): Scaled length of the track
+            num_horses (int): Number of horses to draw
+        Returns:
+            None
+        """
+        import turtle
+
+        colors = ['chocolate4', 'brown3', 'DarkGoldenrod3', 'black', 'burlywood3']
+        y_positions, lane_width = self.lane_layout(num_horses)
+        stretch = min(2, max(lane_width / 25, 0.1)) # shrink the turtles to fit narrow lanes
+
+        for i in range(num_horses):
+            turtle_horse = turtle.Turtle()
+            turtle_horse.shape("turtle")
+            turtle_horse.turtlesize(stretch_wid=stretch, stretch_len=stretch)
+            turtle_horse.color(colors[i % len(colors)])
+            turtle_horse.penup()
+            turtle_horse.goto(-scaled_length / 2, y_positions[i])  # Start from left
+            self.horse_turtles.append(turtle_horse)
+
+    def place_horses(self, scaled_length):
+        """Places every horse at the start line of the race physics.
+        Args:
+            self: RaceSimulation
+            scaled_length (float): Scaled length of the track
+        Returns:
+            None
+        """
+        for horse in self.horses:
+            horse.speed = max(horse.speed, 5)
+            self.add_horse(TrackPosition(-scaled_length / 2), horse)
+
+    def set_markers(self):
+        """Scales the track length and places the finish line and leg markers.
+        Args:
+            self: RaceSimulation
+        Returns:
+            float: scaled_length (Scaled length of the track)
+        """
         track_length = self.track.track_venue[1]  # Get distance from track module
         scale = 0.3
         scaled_length = scale * track_length  # Scale length
@@ -117,49 +235,75 @@ class RaceSimulation:
             -scaled_length / 2 + (scaled_length / 2),  # End of second leg
             -scaled_length / 2 + (3 * scaled_length / 4),  # End of third leg
         ]
+        return scaled_length
 
-        self.draw_track(scaled_length)  # Draw the track and lanes
-
-        # Set up 'horses', fixed right now
-        colors = ['chocolate4', 'brown3', 'DarkGoldenrod3', 'black', 'burlywood3']
-        y_positions = [-100, -50, 0, 50, 100]
+    def lane_layout(self, num_horses):
+        """Splits the track height evenly into one lane per horse. A field of five
+        gets the original 50 unit lanes centred on -100, -50, 0, 50 and 100.
+        Args:
+            self: RaceSimulation
+            num_horses (int): Number of horses in the field
+        Returns:
+            tuple: (list of lane centre y coordinates, lane width)
+        """
+        lane_width = LANE_SPAN / max(num_horses, 1)
+        y_positions = [-LANE_SPAN / 2 + lane_width * (i + 0.5) for i in range(num_horses)]
+        return y_positions, lane_width
 
-        for i, horse in enumerate(self.horses):
-            horse.speed = max(horse.speed, 5)
-            turtle_horse = turtle.Turtle()
-            turtle_horse.shape("turtle")
-            turtle_horse.turtlesize(stretch_wid=2, stretch_len=2)
-            turtle_horse.color(colors[i % len(colors)])
-            turtle_horse.penup()
-            turtle_horse.goto(-scaled_length / 2, y_positions[i])  # Start from left
-            self.horse_objects.append((turtle_horse, horse))
+    def add_horse(self, race_horse, horse):
+        """Registers a horse for the race and initializes its race data.
+        Args:
+            self: RaceSimulation
+            race_horse (TrackPosition): Position moved along the track for this horse
+            horse (Horse): Horse taking part in the race
+        Returns:
+            None
+        """
+        self.horse_objects.append((race_horse, horse))
 
-            # Initialize horse data in race_data
-            self.race_data[horse.horse_id] = {
-                "final_position": None,
-                "overall_time": None,
-                "leg_times": {"First Leg": None, "Second Leg": None, "Third Leg": None},
-            }
+        # Initialize horse data in race_data
+        self.race_data[horse.horse_id] = {
+            "final_position": None,
+            "overall_time": None,
+            "leg_times": {"First Leg": None, "Second Leg": None, "Third Leg": None},
+        }
 
     def update_position(self):
-        """Updates horse position during race, tracks progress and checks
-        for marker/finish line crossing to update race data. Starts timer
-        and applies weather factors.
+        """Updates horse position during race by one tick of the simulated clock,
+        tracks progress and checks for marker/finish line crossing to update race
+        data. Race times come from the tick count rather than the wall clock, so
+        results do not depend on how fast the screen is drawn. When recording,
+        positions are stored after every tick (tick 0 is the start line).
         Args:
             self: RaceSimulation
         Returns:
             None
         """
-        if self.start_time is None:
-            self.start_time = time.time()
+        if self.record and self.recording is None:
+            self.recording = TrajectoryRecording([horse.horse_id for _, horse in self.horse_objects], self.track.track_venue, self.track.track_weather, self.tick_seconds)
+            self.recording.record_tick([race_horse.xcor() for race_horse, _ in self.horse_objects])
+
+        self.ticks += 1
+        with instrumentation.timer("tick"):
+            self.move_horses(self.ticks * self.tick_seconds)
+
+        if self.recording is not None:
+            self.recording.record_tick([race_horse.xcor() for race_horse, _ in self.horse_objects])
 
-        current_time = time.time()
-        elapsed_time = current_time - self.start_time
+    def move_horses(self, elapsed_time):
+        """Moves every unfinished horse once and records leg and finish
+        line crossings at 'elapsed_time'. Applies weather factors.
+        Args:
+            self: RaceSimulation
+            elapsed_time (float): Race time in seconds at which crossings are recorded
+        Returns:
+            None
+        """
         weather_multiplier = self.track.track_weather[1]
 
         for race_horse, horse in self.horse_objects:
-            if race_horse not in self.finished_horses:
-                rand_chance = random()
+            if race_horse not in self.finished:
+                rand_chance = self.rng.random()
                 if rand_chance < 0.05:
                     move_distance = 0
                 elif rand_chance < 0.20:
@@ -183,9 +327,10 @@ class RaceSimulation:
                 # Finish line crossing
                 if race_horse.xcor() >= self.finish_line:
                     try: # try-except block for step 3
-                        if race_horse not in self.finished_horses:
+                        if race_horse not in self.finished:
                             position = len(self.finished_horses) + 1
                             self.finished_horses.append(race_horse)
+                            self.finished.add(race_horse)
                             self.race_data[horse.horse_id]["final_position"] = position
                             self.race_data[horse.horse_id]["overall_time"] = elapsed_time
                             self.final_results[horse.horse_id] = {
@@ -193,27 +338,62 @@ class RaceSimulation:
                                 "overall_time": round(elapsed_time, 2),
                                 "leg_times": {leg: round(time, 2) for leg, time in self.race_data[horse.horse_id]["leg_times"].items()}
                             }
-                            print(f"Horse {horse.horse_id} has crossed the finish line!")
+                            if self.verbose:
+                                print(f"Horse {horse.horse_id} has crossed the finish line!")
                     except Exception as er:
                         print(f"Error processing final race data: {er}")
 
+    def render_frame(self):
+        """Runs the physics ticks that are due by the wall clock and draws the
+        result as one frame. If drawing falls behind, several ticks run before
+        the next draw, so frames are skipped instead of slowing the race down.
+        Args:
+            self: RaceSimulation
+        Returns:
+            None
+        """
+        now = time.perf_counter()
+        if self.start_time is None:
+            self.start_time = now
+        due_ticks = int((now - self.start_time) / self.tick_seconds) + 1
+
+        while self.ticks < due_ticks and len(self.finished_horses) < len(self.horse_objects):
+            self.update_position()
+        self.draw_frame()
+
         if len(self.finished_horses) == len(self.horse_objects):
             self.screen.ontimer(self.screen.bye, 1000)  # Close the window after the race is done
 
         else:
-            self.screen.ontimer(self.update_position, 50)
+            self.screen.ontimer(self.render_frame, FRAME_MS)
+
+    def draw_frame(self):
+        """Moves every turtle to its horse's current position and pushes a single
+        screen update for the frame.
+        Args:
+            self: RaceSimulation
+        Returns:
+            None
+        """
+        for turtle_horse, (race_horse, horse) in zip(self.horse_turtles, self.horse_objects):
+            turtle_horse.setx(min(race_horse.xcor(), self.finish_line))
+        self.screen.update()
 
     def start_race(self):
         """Starts race by setting up screen and initialization of horse movement
-        via race_setup and update_position methods.
+        via race_setup and render_frame methods.
         Args:
             self: RaceSimulation
         Returns:
             None
         """
-        self.race_setup()
-        self.screen.ontimer(self.update_position, 50)
-        turtle.mainloop()
+        import turtle
+        instrumentation.count("races")
+        with instrumentation.race_profile(), instrumentation.timer("race"):
+            self.race_setup()
+            self.draw_frame()
+            self.screen.ontimer(self.render_frame, FRAME_MS)
+            turtle.mainloop()
 
     def get_times(self):
         """Returns a dictionary of race times for each horse
@@ -239,6 +419,124 @@ class RaceSimulation:
         Returs:
             winning_horse_id: sorted results
         """
-        sorted_results = sorted(self.final_results.items(), key=lambda x: x[1]["final_position"])
-        winning_horse_id = sorted_results[0][0]
+        winning_horse_id = min(self.final_results.items(), key=lambda x: x[1]["final_position"])[0]
         return winning_horse_id
+
+class HeadlessRaceSimulation(RaceSimulation):
+    """A subclass of RaceSimulation that runs without graphics on a simulated clock.
+    Every call to update_position is one tick of 'tick_seconds', so a race runs
+    as fast as the CPU allows and does not need a display.
+    Methods:
+        __init__(): Initializes headless simulation
+        open_screen(): No window is opened in headless mode
+        race_setup(): Sets up track markers and horse positions
+        start_race(): Runs ticks until every horse has finished
+    """
+    def __init__(self, race, track, seed=None, tick_seconds=TICK_SECONDS, verbose=False, record=False):
+        """Initializes HeadlessRaceSimulation
+        Attributes:
+            rng: random.Random seeded with 'seed', or the shared random module if no seed is given
+            tick_seconds: Simulated seconds per tick
+            verbose: Print a message when a horse crosses the finish line
+        """
+        super().__init__(race, track, record=record)
+        if seed is not None:
+            self.rng = random.Random(seed)
+        self.tick_seconds = tick_seconds
+        self.verbose = verbose
+
+    def open_screen(self):
+        """No window is opened in headless mode.
+        Returns:
+            None
+        """
+        return None
+
+    def race_setup(self):
+        """Scales the track and places every horse at the start line.
+        Args:
+            self: HeadlessRaceSimulation
+        Returns:
+            None
+        """
+        with instrumentation.timer("race_setup"):
+            scaled_length = self.set_markers()
+            self.place_horses(scaled_length)
+
+    def start_race(self):
+        """Sets up the race and runs ticks until every horse has finished.
+        Args:
+            self: HeadlessRaceSimulation
+        Returns:
+            None
+        """
+        instrumentation.count("races")
+        with instrumentation.race_profile(), instrumentation.timer("race"):
+            self.race_setup()
+            while len(self.finished_horses) < len(self.horse_objects):
+                self.update_position()
+
+class ReplaySimulation(RaceSimulation):
+    """A subclass of RaceSimulation that plays a TrajectoryRecording back in the turtle
+    view. The recorded positions are drawn frame by frame, nothing is re-simulated.
+    Methods:
+        __init__(): Initializes the replay from a recording
+        place_horses(): Places one position per recorded horse
+        update_position(): Moves every horse to the positions of the next recorded tick
+        start_replay(): Opens the window and plays the recording
+    """
+    def __init__(self, recording):
+        """Initializes ReplaySimulation
+        Attributes:
+            recording: TrajectoryRecording to play back
+            track: Track rebuilt from the venue and weather stored in the recording
+        """
+        track = Track()
+        track.track_venue = recording.track_venue
+        track.track_weather = recording.track_weather
+        super().__init__(SimpleNamespace(horses=recording.horse_ids), track) # one turtle per recorded horse
+        self.recording = recording
+        self.tick_seconds = recording.tick_seconds
+
+    def place_horses(self, scaled_length):
+        """Places one position per recorded horse at the start line.
+        Args:
+            self: ReplaySimulation
+            scaled_length (float): Scaled length of the track
+        Returns:
+            None
+        """
+        for horse_id in self.recording.horse_ids:
+            self.horse_objects.append((TrackPosition(-scaled_length / 2), horse_id))
+
+    def update_position(self):
+        """Moves every horse to the positions of the next recorded tick. A horse
+        counts as finished once its recorded position reaches the finish line, and
+        horses reaching it on the same tick finish in lane order. Horses still short
+        of the line at the last recorded tick (positions are stored as float32) finish
+        with the recording.
+        Args:
+            self: ReplaySimulation
+        Returns:
+            None
+        """
+        self.ticks += 1
+        for (race_horse, horse_id), x in zip(self.horse_objects, self.recording.positions_at(self.ticks)):
+            race_horse.x = x
+            if x >= self.finish_line and race_horse not in self.finished:
+                self.finished_horses.append(race_horse)
+                self.finished.add(race_horse)
+        if self.ticks >= self.recording.num_ticks - 1:
+            for race_horse, _ in self.horse_objects:
+                if race_horse not in self.finished:
+                    self.finished_horses.append(race_horse)
+                    self.finished.add(race_horse)
+
+    def start_replay(self):
+        """Plays the recording in the turtle window at the recorded speed.
+        Args:
+            self: ReplaySimulation
+        Returns:
+            None
+        """
+        self.start_race()
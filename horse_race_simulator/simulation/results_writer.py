@@ -0,0 +1,221 @@
+# results_writer.py
+
+import csv
+import os
+import queue
+import sqlite3
+import threading
+from horse_race_simulator.race_data.history_store import check_table_name
+
+# columns written for every horse, named as in runs.csv
+RESULT_COLUMNS = ['race_id', 'horse_id', 'result', 'won', 'finish_time', 'time1', 'time2', 'time3', 'time4']
+FORMATS = {".csv": "csv", ".parquet": "parquet", ".db": "sqlite", ".sqlite": "sqlite", ".sqlite3": "sqlite"}
+STOP = object() # tells the writer thread to finish
+
+def race_rows(race_id, horse_timings):
+    """Converts the times of one race into rows in the runs.csv layout. Sectional
+    times time1..time4 are the durations of the four quarters of the race.
+    Args:
+        race_id (int): Race ID
+        horse_timings (dict): times from RaceSimulation.get_times()
+    Returns:
+        list: one tuple of RESULT_COLUMNS values per horse, in finishing order
+    """
+    # sorted() is stable, so ties keep the order the horses were given, like RaceResults
+    ordered = sorted(horse_timings.items(), key=lambda item: item[1]["Overall Time"])
+    rows = []
+    for position, (horse_id, times) in enumerate(ordered, start=1):
+        legs = [times["Leg 1 Time"], times["Leg 2 Time"], times["Leg 3 Time"], times["Overall Time"]]
+        sections = [legs[0]] + [round(end - start, 2) for start, end in zip(legs, legs[1:])]
+        rows.append((race_id, horse_id, position, int(position == 1), times["Overall Time"], *sections))
+    return rows
+
+class ResultsWriter:
+    """A class representing an append-only sink for race results. Rows are buffered
+    in memory and handed to a background thread in batches, so the simulation does
+    not wait for the disk. At most 'max_pending' batches wait to be written; when
+    the disk falls further behind, add_race waits instead of using more memory.
+    Methods:
+        __init__(): Opens the sink and starts the writer thread
+        add_race(): Buffers the results of one race
+        flush(): Writes everything buffered so far
+        close(): Flushes and stops the writer thread
+    """
+
+    def __init__(self, path, file_format=None, batch_size=10000, max_pending=4, table="runs"):
+        """Initializes ResultsWriter
+        Args:
+            path: file to append to, or a new file for Parquet
+            file_format (str): 'csv', 'sqlite' or 'parquet', taken from the file extension if None
+            batch_size (int): rows per batch handed to the writer thread
+            max_pending (int): batches allowed to wait for the writer thread
+            table (str): SQLite table name, letters, digits and underscores
+        Attributes:
+            rows_written: Rows written to disk so far
+        """
+        self.path = path
+        self.file_format = file_format or FORMATS.get(os.path.splitext(path)[1].lower())
+        if self.file_format not in ("csv", "sqlite", "parquet"):
+            raise ValueError(f"Unknown results format for '{path}', use .csv, .parquet, .db or .sqlite")
+        if self.file_format == "parquet":
+            try:
+                import pyarrow # optional, only needed for Parquet output
+            except ImportError:
+                raise ImportError("Writing Parquet requires pyarrow, install it or use a .csv or .db file") from None
+            if os.path.exists(path):
+                raise FileExistsError(f"'{path}' already exists and Parquet files cannot be appended to, write to a new file")
+        self.batch_size = batch_size
+        self.table = check_table_name(table)
+        self.buffer = []
+        self.rows_written = 0
+        self.error = None
+        self.closed = False
+        self.batches = queue.Queue(maxsize=max_pending)
+        self.thread = threading.Thread(target=self.write_batches, name="ResultsWriter", daemon=True)
+        self.thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+        return False
+
+    def add_race(self, race_id, horse_timings):
+        """Buffers the results of one race, handing a batch to the writer thread when the buffer is full
+        Args:
+            race_id (int): Race ID
+            horse_timings (dict): times from RaceSimulation.get_times()
+        Returns:
+            None
+        """
+        self.check_error()
+        if self.closed:
+            raise ValueError("ResultsWriter is closed")
+        self.buffer.extend(race_rows(race_id, horse_timings))
+        if len(self.buffer) >= self.batch_size:
+            self.send_buffer()
+
+    def send_buffer(self):
+        """Hands the buffered rows to the writer thread"""
+        if self.buffer:
+            self.batches.put(self.buffer)
+            self.buffer = []
+
+    def flush(self):
+        """Writes everything buffered so far and waits until it is on disk"""
+        self.send_buffer()
+        self.batches.join()
+        self.check_error()
+
+    def close(self):
+        """Flushes the buffer and stops the writer thread"""
+        if self.closed:
+            return
+        self.send_buffer()
+        self.closed = True
+        self.batches.put(STOP)
+        self.thread.join()
+        self.check_error()
+
+    def check_error(self):
+        """Raises the error the writer thread stopped with, if any"""
+        if self.error is not None:
+            error, self.error = self.error, None
+            raise error
+
+    def write_batches(self):
+        """Runs in the writer thread: writes batches until close() is called"""
+        sink = None
+        try:
+            sink = self.open_sink()
+            while True:
+                batch = self.batches.get()
+                if batch is STOP:
+                    self.batches.task_done()
+                    break
+                try:
+                    sink.write(batch)
+                    self.rows_written += len(batch)
+                finally:
+                    self.batches.task_done()
+        except Exception as er:
+            self.error = er
+            self.drain()
+        finally:
+            if sink is not None:
+                sink.close()
+
+    def drain(self):
+        """Discards queued batches after an error so flush() and close() do not wait forever"""
+        while True:
+            batch = self.batches.get()
+            self.batches.task_done()
+            if batch is STOP:
+                return
+
+    def open_sink(self):
+        """Opens the output file in the writer thread"""
+        if self.file_format == "csv":
+            return CsvSink(self.path)
+        if self.file_format == "sqlite":
+            return SqliteSink(self.path, self.table)
+        return ParquetSink(self.path)
+
+class CsvSink:
+    """Appends rows to a CSV file, writing the header when the file is new."""
+
+    def __init__(self, path):
+        new_file = not os.path.exists(path) or os.path.getsize(path) == 0
+        self.file = open(path, "a", newline="")
+        self.writer = csv.writer(self.file)
+        if new_file:
+            self.writer.writerow(RESULT_COLUMNS)
+
+    def write(self, rows):
+        self.writer.writerows(rows)
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+class SqliteSink:
+    """Appends rows to a SQLite table, one transaction per batch."""
+
+    def __init__(self, path, table):
+        self.connection = sqlite3.connect(path)
+        self.insert = f"INSERT INTO {table} ({', '.join(RESULT_COLUMNS)}) VALUES ({', '.join('?' * len(RESULT_COLUMNS))})"
+        self.connection.execute(
+            f"CREATE TABLE IF NOT EXISTS {table} (race_id INTEGER, horse_id INTEGER, result INTEGER, won INTEGER, "
+            "finish_time REAL, time1 REAL, time2 REAL, time3 REAL, time4 REAL)"
+        )
+        self.connection.commit()
+
+    def write(self, rows):
+        with self.connection:
+            self.connection.executemany(self.insert, rows)
+
+    def close(self):
+        self.connection.close()
+
+class ParquetSink:
+    """Writes rows to a Parquet file, one row group per batch. Parquet files cannot
+    be appended to once closed, so every writer creates a new file and ResultsWriter
+    refuses a path that already exists."""
+
+    def __init__(self, path):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        self.pa = pa
+        self.schema = pa.schema([
+            ("race_id", pa.int64()), ("horse_id", pa.int64()), ("result", pa.int32()), ("won", pa.int8()),
+            ("finish_time", pa.float64()), ("time1", pa.float64()), ("time2", pa.float64()), ("time3", pa.float64()), ("time4", pa.float64()),
+        ])
+        self.writer = pq.ParquetWriter(path, self.schema)
+
+    def write(self, rows):
+        columns = list(zip(*rows))
+        self.writer.write_table(self.pa.Table.from_arrays([self.pa.array(column, type=field.type) for column, field in zip(columns, self.schema)], schema=self.schema))
+
+    def close(self):
+        self.writer.close()
@@ -0,0 +1,128 @@
+# season.py
+
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from horse_race_simulator.simulation.race_simulator import HeadlessRaceSimulation
+from horse_race_simulator.simulation.race_results import RaceResults
+
+def run_season_race(task):
+    """Simulates one race headless and scores it with RaceResults. Runs inside a worker process.
+    Args:
+        task (tuple): (race_number, race, seed)
+    Returns:
+        dict: summary of the race and its scored results
+    """
+    race_number, race, seed = task
+    simulation = HeadlessRaceSimulation(race, race.track, seed=seed)
+    simulation.start_race()
+    results = RaceResults(race, race.horses, simulation.get_times())
+    winning_horse_id = simulation.get_winning_horse_id()
+    return {
+        "race_number": race_number,
+        "race_id": race.race_id,
+        "date": race.date,
+        "venue": race.venue,
+        "distance": race.distance,
+        "weather": race.weather,
+        "winning_horse_id": winning_horse_id,
+        "winning_time": simulation.final_results[winning_horse_id]["overall_time"],
+        "results": results.data.to_dict("records"),
+        "horse_times": simulation.get_times(),
+    }
+
+class SeasonRunner:
+    """A class that runs a season of races across a pool of worker processes
+    Methods:
+        __init__(): Initializes the runner
+        run(): Simulates and scores every race in the season
+        collect(): Stores race summaries, or streams them to a results writer, and aggregates them
+        get_season_info(): Prints a summary of the last season run
+    """
+    def __init__(self, workers=None, master_seed=0, chunksize=None):
+        """Initializes SeasonRunner
+        Args:
+            workers (int): Number of worker processes, defaults to the number of cores
+            master_seed (int): Seed every race's random stream is derived from
+            chunksize (int): Races sent to a worker at a time, picked automatically if None
+        """
+        self.workers = workers or os.cpu_count() or 1
+        self.master_seed = master_seed
+        self.chunksize = chunksize
+        self.results = []
+        self.summary = None
+        self.elapsed_time = None
+        self.races_per_second = None
+
+    def run(self, races, writer=None):
+        """Simulates and scores every race. Each race gets its own independent random
+        stream spawned from 'master_seed', so results do not depend on the number of
+        workers or on which worker ran a race. Results are returned in race order.
+        Args:
+            self: SeasonRunner
+            races (list): Race or DelayedRace instances
+            writer (ResultsWriter): sink every race's results are streamed to as it completes.
+                Only the aggregates in self.summary are kept in memory then
+        Returns:
+            list: results (one summary dictionary per race), empty when a writer is given
+        """
+        seeds = [int(child.generate_state(1)[0]) for child in np.random.SeedSequence(self.master_seed).spawn(len(races))]
+        tasks = list(zip(range(len(races)), races, seeds))
+
+        start_time = time.perf_counter()
+        self.results = []
+        if self.workers == 1:
+            self.collect(map(run_season_race, tasks), writer)
+        else:
+            chunksize = self.chunksize or max(1, len(tasks) // (self.workers * 4))
+            with ProcessPoolExecutor(max_workers=self.workers) as executor:
+                self.collect(executor.map(run_season_race, tasks, chunksize=chunksize), writer)
+        self.elapsed_time = time.perf_counter() - start_time
+        self.races_per_second = len(races) / self.elapsed_time if self.elapsed_time > 0 else float("inf")
+        return self.results
+
+    def collect(self, completed, writer):
+        """Aggregates each race summary as it completes into self.summary. Without a writer
+        the summaries are kept in self.results; with one, each race is streamed to 'writer'
+        and dropped, so memory does not grow with the season."""
+        races, horses, total_time, fastest = 0, 0, 0.0, None
+        for result in completed:
+            races += 1
+            horses += len(result["results"])
+            total_time += result["winning_time"]
+            if fastest is None or result["winning_time"] < fastest["winning_time"]:
+                fastest = {key: result[key] for key in ("race_number", "race_id", "winning_horse_id", "winning_time")}
+            if writer is None:
+                self.results.append(result)
+            else:
+                writer.add_race(result["race_id"], result["horse_times"])
+        self.summary = {
+            "races": races,
+            "horses": horses,
+            "mean_winning_time": total_time / races if races else None,
+            "fastest": fastest,
+        }
+
+    def get_season_info(self):
+        """Prints a summary of the last season run
+        Args:
+            self: SeasonRunner
+        Returns:
+            None
+        """
+        width = 40
+        separator = "+" + "-" * (width - 2) + "+"
+
+        print(
+            f"\n{separator}\n"
+            f"| {'          Season Overview           '} |\n"
+            f"{separator}\n"
+            f"| {'Races':<10} : {self.summary['races']:<23} |\n"
+            f"| {'Horses':<10} : {self.summary['horses']:<23} |\n"
+            f"| {'Workers':<10} : {self.workers:<23} |\n"
+            f"| {'Seed':<10} : {self.master_seed:<23} |\n"
+            f"| {'Time':<10} : {f'{self.elapsed_time:.2f}s':<23} |\n"
+            f"| {'Races/sec':<10} : {f'{self.races_per_second:,.1f}':<23} |\n"
+            f"{separator}"
+        )
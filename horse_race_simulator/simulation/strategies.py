@@ -0,0 +1,109 @@
+# strategies.py
+
+import numpy as np
+
+def score_rating(runs, rng):
+    """Backs the highest rated horse"""
+    return runs['horse_rating'].to_numpy(dtype=float)
+
+def score_favourite(runs, rng):
+    """Backs the horse with the lowest win_odds"""
+    return -runs['win_odds'].to_numpy(dtype=float)
+
+def score_longshot(runs, rng):
+    """Backs the horse with the highest win_odds"""
+    return runs['win_odds'].to_numpy(dtype=float)
+
+def score_fastest(runs, rng):
+    """Backs the horse with the highest speed (simulated races only)"""
+    return runs['speed'].to_numpy(dtype=float)
+
+def score_random(runs, rng):
+    """Backs a horse chosen at random"""
+    return rng.random(len(runs))
+
+# strategy name -> function(runs, rng) returning a score for every row of 'runs', a
+# table with one row per horse per race; the highest scoring horse of each race is
+# backed. Custom strategies must be module level functions so they can be sent to
+# worker processes.
+STRATEGIES = {
+    "top_rated": score_rating,
+    "favourite": score_favourite,
+    "longshot": score_longshot,
+    "fastest": score_fastest,
+    "random": score_random,
+}
+# strategies that compare odds, so they need odds estimated by OddsEngine
+ODDS_STRATEGIES = {"favourite", "longshot"}
+
+def get_strategy(strategy):
+    """Returns the scoring function of a strategy
+    Args:
+        strategy: name in STRATEGIES or a function(runs, rng) returning scores
+    Returns:
+        function: the scoring function
+    """
+    if callable(strategy):
+        return strategy
+    if strategy not in STRATEGIES:
+        raise ValueError(f"Unknown strategy '{strategy}', use one of {', '.join(STRATEGIES)}")
+    return STRATEGIES[strategy]
+
+def best_runs(runs, strategy, rng):
+    """Finds the highest scoring horse of every race in one vectorized pass
+    Args:
+        runs (DataFrame): one row per horse per race, with race_id and the columns the strategy scores
+        strategy: function(runs, rng) returning one score per row
+        rng: NumPy random generator passed to the strategy
+    Returns:
+        tuple: (picks, scored) arrays in race_id order, the row of each race's best horse and
+        whether it has a score. Ties go to the earlier row.
+    """
+    try:
+        scores = np.asarray(strategy(runs, rng), dtype=float)
+    except KeyError as er:
+        raise ValueError(f"Strategy needs column {er.args[0]}, which these races do not have") from None
+    scores = np.where(np.isnan(scores), -np.inf, scores)
+    race_ids = runs['race_id'].to_numpy()
+    # sorted by race, best score first; lexsort is stable so ties go to the earlier row
+    order = np.lexsort((-scores, race_ids))
+    _, first = np.unique(race_ids[order], return_index=True)
+    picks = order[first]
+    return picks, np.isfinite(scores[picks])
+
+def race_runs(race, odds):
+    """Returns the runs table of one race, for scoring with a strategy
+    Args:
+        race: Race to bet on
+        odds (dict): Horse ID -> decimal odds, used as win_odds
+    Returns:
+        DataFrame: one row per horse with race_id, horse_id, horse_age, actual_weight,
+        horse_rating, speed and win_odds
+    """
+    import pandas as pd
+    return pd.DataFrame({
+        'race_id': [race.race_id] * len(race.horses),
+        'horse_id': [horse.horse_id for horse in race.horses],
+        'horse_age': [horse.horse_age for horse in race.horses],
+        'actual_weight': [horse.actual_weight for horse in race.horses],
+        'horse_rating': [horse.horse_rating for horse in race.horses],
+        'speed': [horse.speed for horse in race.horses],
+        'win_odds': [odds.get(horse.horse_id, np.nan) for horse in race.horses],
+    })
+
+def select_horse(strategy, race, odds, rng=None):
+    """Picks the horse to back in 'race' with a strategy, scoring the race's runs
+    the same way Backtester scores many races
+    Args:
+        strategy: name in STRATEGIES or a function(runs, rng) returning scores
+        race: Race to bet on
+        odds (dict): Horse ID -> decimal odds
+        rng: NumPy random generator passed to the strategy, the global NumPy random state if None
+    Returns:
+        int: Horse ID to back
+    """
+    runs = race_runs(race, odds)
+    picks, scored = best_runs(runs, get_strategy(strategy), np.random if rng is None else rng)
+    if not scored[0]:
+        raise ValueError(f"Strategy '{strategy}' did not score any horse of this race")
+    return int(runs['horse_id'].iloc[picks[0]])
@@ -0,0 +1,116 @@
+# trajectory.py
+
+import json
+from array import array
+import numpy as np
+
+class TrajectoryRecording:
+    """A class representing every horse's position on every tick of a race, stored in a
+    preallocated array('f') buffer (4 bytes per horse per tick) that doubles in size
+    when it fills up.
+    Methods:
+        __init__(): Initializes an empty recording
+        record_tick(): Appends the positions of one tick
+        positions_at(): Returns the positions recorded for a tick
+        to_array(): Returns the recording as a (ticks, horses) NumPy array
+        save(): Writes the recording to a compressed .npz archive
+        load(): Reads a recording written by save()
+        replay_text(): Prints the race as text snapshots without re-simulating
+    """
+
+    def __init__(self, horse_ids, track_venue, track_weather, tick_seconds, capacity=128):
+        """Initializes TrajectoryRecording
+        Args:
+            horse_ids (list): Horse IDs in lane order
+            track_venue (tuple): (venue name, distance) of the track
+            track_weather (tuple): (weather, speed factor) of the track
+            tick_seconds (float): Simulated seconds per tick
+            capacity (int): Number of ticks to preallocate
+        """
+        self.horse_ids = list(horse_ids)
+        self.track_venue = tuple(track_venue)
+        self.track_weather = tuple(track_weather)
+        self.tick_seconds = tick_seconds
+        self.num_horses = len(self.horse_ids)
+        self.num_ticks = 0
+        self.buffer = array('f', bytes(4 * max(capacity, 1) * self.num_horses))
+
+    def record_tick(self, positions):
+        """Appends the positions of one tick, doubling the buffer when it is full
+        Args:
+            positions (list): x coordinate of every horse, in lane order
+        Returns:
+            None
+        """
+        start = self.num_ticks * self.num_horses
+        end = start + self.num_horses
+        if end > len(self.buffer):
+            self.buffer.extend(array('f', bytes(4 * max(len(self.buffer), self.num_horses))))
+        self.buffer[start:end] = array('f', positions)
+        self.num_ticks += 1
+
+    def positions_at(self, tick):
+        """Returns the positions recorded for 'tick', clamped to the recorded range.
+        Raises ValueError when nothing has been recorded yet
+        Args:
+            tick (int): tick number, 0 is the start line
+        Returns:
+            list: x coordinate of every horse, in lane order
+        """
+        if self.num_ticks == 0:
+            raise ValueError("The recording has no ticks")
+        tick = min(max(tick, 0), self.num_ticks - 1)
+        start = tick * self.num_horses
+        return self.buffer[start:start + self.num_horses].tolist()
+
+    def to_array(self):
+        """Returns the recorded positions as a (ticks, horses) float32 array sharing the buffer"""
+        return np.frombuffer(self.buffer, dtype=np.float32, count=self.num_ticks * self.num_horses).reshape(self.num_ticks, self.num_horses)
+
+    def save(self, path):
+        """Writes the recording to a compressed .npz archive
+        Args:
+            path: file to write
+        Returns:
+            None
+        """
+        metadata = {
+            "track_venue": self.track_venue,
+            "track_weather": self.track_weather,
+            "tick_seconds": self.tick_seconds,
+        }
+        np.savez_compressed(path, positions=self.to_array(), horse_ids=np.array(self.horse_ids), metadata=json.dumps(metadata))
+
+    @classmethod
+    def load(cls, path):
+        """Reads a recording written by save()
+        Args:
+            path: archive to read
+        Returns:
+            TrajectoryRecording: the recording
+        """
+        with np.load(path) as archive:
+            metadata = json.loads(archive["metadata"].item())
+            positions = archive["positions"]
+            recording = cls(archive["horse_ids"].tolist(), metadata["track_venue"], metadata["track_weather"], metadata["tick_seconds"], capacity=len(positions))
+        recording.buffer = array('f', positions.astype(np.float32).tobytes())
+        recording.num_ticks = len(positions)
+        return recording
+
+    def replay_text(self, stages=4, width=50):
+        """Prints the race as text snapshots, in the style of RaceResults.generate_race_summary
+        Args:
+            stages (int): Number of evenly spaced snapshots after the start
+            width (int): Characters used for the track
+        Returns:
+            None
+        """
+        distance = self.track_venue[1]
+        start_line = -0.3 * distance / 2
+        scaled_length = 0.3 * distance
+        for stage in range(1, stages + 1):
+            tick = round(stage * (self.num_ticks - 1) / stages)
+            print(f"\nStage {stage} ({tick * self.tick_seconds:.2f}s):\n")
+            for horse_id, x in zip(self.horse_ids, self.positions_at(tick)):
+                position = int(min(max((x - start_line) / scaled_length, 0), 1) * width)
+                print(f"{horse_id}: " + "-" * position + "🐢" + "-" * (width - position))
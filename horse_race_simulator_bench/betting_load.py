@@ -0,0 +1,156 @@
+# betting_load.py
+#
+# Scripted players for the betting server. Each player connects, reads the race
+# card, places bets, waits for the race to be settled and quits. Reports the
+# throughput of the connect, bet and settle phases apart from the betting window,
+# and bet round-trip latency, as JSON.
+#
+#     python -m horse_race_simulator_bench.betting_load --players 500            # against an in-process server
+#     python -m horse_race_simulator_bench.betting_load --port 8765 --players 500  # against a running server
+
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+import numpy as np
+from horse_race_simulator.simulation.betting_server import BettingServer
+
+async def request(reader, writer, command):
+    """Sends one command and returns the decoded response"""
+    writer.write(json.dumps(command).encode() + b"\n")
+    await writer.drain()
+    return json.loads(await reader.readline())
+
+async def open_session(connect, bets, latencies, rng, marks):
+    """Connects one scripted player, reads the race card and places its bets
+    Args:
+        connect: coroutine function returning (reader, writer)
+        bets (int): bets placed by the player
+        latencies (list): bet round-trip times in seconds are appended here
+        rng (random.Random): picks horses, amounts and bet types
+        marks (dict): the times the player connected and finished betting are appended here
+    Returns:
+        tuple: (reader, writer, completed), completed is False if a bet was refused
+    """
+    reader, writer = await connect()
+    try:
+        card = (await request(reader, writer, {"cmd": "race"}))["race"]
+        marks["connected"].append(time.perf_counter())
+        completed = True
+        for _ in range(bets):
+            command = {"cmd": "bet", "horse_id": rng.choice(card["horses"]), "amount": rng.randint(1, 20), "type": rng.choice(["win", "place"])}
+            start = time.perf_counter()
+            response = await request(reader, writer, command)
+            latencies.append(time.perf_counter() - start)
+            completed = completed and response["ok"]
+        marks["bets_placed"].append(time.perf_counter())
+        return reader, writer, completed
+    except BaseException:
+        writer.close()
+        raise
+
+async def finish_session(session, marks):
+    """Waits for the player's race to be settled and quits
+    Args:
+        session (tuple): output of open_session
+        marks (dict): the time the result arrived is appended here
+    Returns:
+        bool: True if the session completed without an error response
+    """
+    reader, writer, completed = session
+    try:
+        completed = (await request(reader, writer, {"cmd": "wait"}))["ok"] and completed
+        marks["settled"].append(time.perf_counter())
+        await request(reader, writer, {"cmd": "quit"})
+        return completed
+    finally:
+        writer.close()
+
+def rate(count, seconds):
+    """Returns count / seconds, infinite for an empty interval"""
+    return count / seconds if seconds > 0 else float("inf")
+
+async def run_load(players, bets=3, host="127.0.0.1", port=None, unix_path=None, betting_seconds=None, seed=0):
+    """Connects 'players' scripted players at once. Every player connects and bets,
+    then every player waits for the result, so the phases are timed separately:
+    connect (until the last player has read the race card), bet (from the first
+    connection to the last bet), window (from the last bet to the first result, which
+    includes running the race) and settle (from the first result to the last).
+    Starts an in-process server when no port or Unix socket is given.
+    Args:
+        players (int): concurrent sessions
+        bets (int): bets per session
+        host (str): server address
+        port (int): server TCP port
+        unix_path (str): server Unix socket
+        betting_seconds (float): betting window of the in-process server, None closes
+            betting as soon as every player has bet
+        seed (int): seed of the scripted choices
+    Returns:
+        dict: sessions, failures, per phase seconds and throughput, bets and bet latency p50/p99 in ms
+    """
+    server = None
+    if port is None and unix_path is None:
+        server = BettingServer(port=0, betting_seconds=betting_seconds, seed=seed)
+        await server.start()
+        port = server.port
+
+    async def connect():
+        if unix_path:
+            return await asyncio.open_unix_connection(unix_path)
+        return await asyncio.open_connection(host, port)
+
+    latencies = []
+    marks = {"connected": [], "bets_placed": [], "settled": []}
+    rng = random.Random(seed)
+    start = time.perf_counter()
+    try:
+        sessions = await asyncio.gather(*(open_session(connect, bets, latencies, random.Random(rng.random()), marks) for _ in range(players)), return_exceptions=True)
+        betting_done = time.perf_counter()
+        if server is not None and betting_seconds is None:
+            server.close_betting()
+        outcomes = await asyncio.gather(*(finish_session(session, marks) for session in sessions if not isinstance(session, BaseException)), return_exceptions=True)
+    finally:
+        elapsed = time.perf_counter() - start
+        if server is not None:
+            await server.stop()
+
+    completed = sum(outcome is True for outcome in outcomes)
+    connect_seconds = max(marks["connected"], default=start) - start
+    bet_seconds = max(marks["bets_placed"], default=start) - min(marks["connected"], default=start)
+    window_seconds = max(min(marks["settled"], default=betting_done) - betting_done, 0)
+    settle_seconds = max(marks["settled"], default=start) - min(marks["settled"], default=start)
+    latencies_ms = np.array(latencies) * 1000 if latencies else np.zeros(1)
+    return {
+        "sessions": players,
+        "failures": players - completed,
+        "elapsed_seconds": elapsed,
+        "connect_seconds": connect_seconds,
+        "connects_per_second": rate(len(marks["connected"]), connect_seconds),
+        "bets": len(latencies),
+        "bet_seconds": bet_seconds,
+        "bets_per_second": rate(len(latencies), bet_seconds),
+        "window_seconds": window_seconds,
+        "settle_seconds": settle_seconds,
+        "settlements_per_second": rate(len(marks["settled"]), settle_seconds),
+        "bet_p50_ms": float(np.percentile(latencies_ms, 50)),
+        "bet_p99_ms": float(np.percentile(latencies_ms, 99)),
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load test the betting server with scripted players.")
+    parser.add_argument("--players", type=int, default=200, help="concurrent sessions")
+    parser.add_argument("--bets", type=int, default=3, help="bets per session")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, help="port of a running server, an in-process server is started if omitted")
+    parser.add_argument("--unix", help="Unix socket of a running server")
+    parser.add_argument("--betting-seconds", type=float, help="betting window of the in-process server, closed once every player has bet by default")
+    args = parser.parse_args(argv)
+    report = asyncio.run(run_load(args.players, args.bets, args.host, args.port, args.unix, args.betting_seconds))
+    print(json.dumps(report, indent=2))
+    return 0 if report["failures"] == 0 else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
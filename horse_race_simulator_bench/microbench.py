@@ -0,0 +1,196 @@
+# microbench.py
+#
+# Times the hot paths of the package and compares them against a stored baseline.
+#
+#     python -m horse_race_simulator_bench.microbench                  # run and compare
+#     python -m horse_race_simulator_bench.microbench --save-baseline  # record a new baseline
+#
+# Exits with status 1 when any benchmark is slower than its baseline by more than
+# the tolerance, so it can gate a change locally or in CI.
+
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import time
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+# seed of the races the race and results benchmarks run, so every run times the same
+# track distance and field and only a code change moves the numbers
+RACE_SEED = 0
+
+def bench_create_horse():
+    from horse_race_simulator.race_data.horse_stats import Horse
+    return lambda: Horse.create_horse("runs.csv")
+
+def bench_race_init():
+    from horse_race_simulator.race_data.race_details import Race
+    return Race
+
+def bench_track():
+    from horse_race_simulator.race_data.track_data import Track
+    def create_track():
+        track = Track()
+        track.create_track()
+        track.weather_factor()
+    return create_track
+
+def bench_headless_race():
+    from horse_race_simulator.race_data.race_details import Race
+    from horse_race_simulator.simulation.race_simulator import HeadlessRaceSimulation
+    race = Race(rng=random.Random(RACE_SEED))
+    def run_race():
+        HeadlessRaceSimulation(race, race.track, seed=0).start_race()
+    return run_race
+
+def race_times(num_horses):
+    """Returns a Race and the get_times() dictionary of one headless run of it"""
+    from horse_race_simulator.race_data.race_details import Race
+    from horse_race_simulator.simulation.race_simulator import HeadlessRaceSimulation
+    race = Race(num_horses=num_horses, rng=random.Random(RACE_SEED))
+    simulation = HeadlessRaceSimulation(race, race.track, seed=0)
+    simulation.start_race()
+    return race, simulation.get_times()
+
+def bench_timing_data_frame():
+    from horse_race_simulator.simulation.race_results import RaceResults
+    race, times = race_times(5)
+    results = RaceResults(race, race.horses, times)
+    return lambda: results.get_horse_timing_data_frame(times)
+
+def bench_horse_position():
+    from horse_race_simulator.simulation.race_results import RaceResults
+    race, times = race_times(5)
+    results = RaceResults(race, race.horses, times)
+    horse_id = race.horses[-1].horse_id
+    return lambda: results.get_horse_position(times, horse_id)
+
+def bench_history_lookup():
+    from horse_race_simulator.simulation.race_results import RaceResults
+    race, times = race_times(5)
+    horse_ids = [horse.horse_id for horse in race.horses]
+    RaceResults.history_index # built once, outside the timed region
+    def lookup():
+        for horse_id in horse_ids:
+            RaceResults.history_index.lookup(horse_id)
+    return lookup
+
+# name -> (setup returning the function to time, calls per timed run)
+BENCHMARKS = {
+    "horse.create_horse": (bench_create_horse, 200),
+    "race.init": (bench_race_init, 50),
+    "track.create_track_weather_factor": (bench_track, 5000),
+    "simulation.headless_race": (bench_headless_race, 5),
+    "results.get_horse_timing_data_frame": (bench_timing_data_frame, 50),
+    "results.get_horse_position": (bench_horse_position, 2000),
+    "results.history_lookup": (bench_history_lookup, 2000),
+}
+
+def time_benchmark(func, number, repeats=7, warmup=1):
+    """Times 'func' called 'number' times per run, after 'warmup' untimed runs
+    Args:
+        func: function to time, called without arguments
+        number (int): calls per timed run
+        repeats (int): timed runs
+        warmup (int): untimed runs made first to fill caches
+    Returns:
+        dict: min, median, mean and stdev of the seconds per call
+    """
+    for _ in range(warmup):
+        for _ in range(number):
+            func()
+    per_call = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        per_call.append((time.perf_counter() - start) / number)
+    return {
+        "min": min(per_call),
+        "median": statistics.median(per_call),
+        "mean": statistics.fmean(per_call),
+        "stdev": statistics.stdev(per_call) if repeats > 1 else 0.0,
+        "number": number,
+        "repeats": repeats,
+    }
+
+def run_benchmarks(names=None, repeats=7, warmup=1, scale=1.0):
+    """Runs the named benchmarks, all of them if 'names' is None
+    Args:
+        names (list): benchmark names from BENCHMARKS
+        repeats (int): timed runs per benchmark
+        warmup (int): untimed runs per benchmark
+        scale (float): multiplier for the calls per run, below 1 for a quick check
+    Returns:
+        dict: benchmark name -> timing statistics
+    """
+    results = {}
+    for name in names or BENCHMARKS:
+        setup, number = BENCHMARKS[name]
+        results[name] = time_benchmark(setup(), max(1, int(number * scale)), repeats, warmup)
+    return results
+
+def compare_to_baseline(results, baseline, tolerance=0.5):
+    """Compares median times against a baseline
+    Args:
+        results (dict): output of run_benchmarks
+        baseline (dict): earlier output of run_benchmarks
+        tolerance (float): allowed slowdown, 0.5 allows 50% slower than the baseline
+    Returns:
+        list: (name, baseline median, current median, ratio) of every regression
+    """
+    regressions = []
+    for name, stats in results.items():
+        if name not in baseline:
+            continue
+        ratio = stats["median"] / baseline[name]["median"]
+        if ratio > 1 + tolerance:
+            regressions.append((name, baseline[name]["median"], stats["median"], ratio))
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time the package's hot paths and compare them against a baseline.")
+    parser.add_argument("benchmarks", nargs="*", help="benchmarks to run, all of them by default")
+    parser.add_argument("--repeats", type=int, default=7, help="timed runs per benchmark")
+    parser.add_argument("--warmup", type=int, default=1, help="untimed runs per benchmark")
+    parser.add_argument("--scale", type=float, default=1.0, help="multiplier for the calls per run")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="baseline JSON file")
+    parser.add_argument("--tolerance", type=float, default=0.5, help="allowed slowdown before failing, 0.5 = 50%%")
+    parser.add_argument("--output", help="also write the results JSON to this file")
+    parser.add_argument("--save-baseline", action="store_true", help="store the results as the new baseline")
+    args = parser.parse_args(argv)
+
+    unknown = [name for name in args.benchmarks if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f"unknown benchmarks: {', '.join(unknown)} (choose from {', '.join(BENCHMARKS)})")
+
+    results = run_benchmarks(args.benchmarks, args.repeats, args.warmup, args.scale)
+    report = json.dumps(results, indent=2)
+    print(report)
+    if args.output:
+        with open(args.output, "w") as output_file:
+            output_file.write(report + "\n")
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as baseline_file:
+            baseline_file.write(report + "\n")
+        print(f"Baseline written to {args.baseline}", file=sys.stderr)
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}, run with --save-baseline to create one", file=sys.stderr)
+        return 0
+    with open(args.baseline) as baseline_file:
+        baseline = json.load(baseline_file)
+    regressions = compare_to_baseline(results, baseline, args.tolerance)
+    for name, before, after, ratio in regressions:
+        print(f"REGRESSION {name}: {before * 1e6:.1f}us -> {after * 1e6:.1f}us ({ratio:.2f}x)", file=sys.stderr)
+    if regressions:
+        return 1
+    print(f"All benchmarks within {args.tolerance:.0%} of the baseline", file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
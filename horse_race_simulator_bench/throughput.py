@@ -0,0 +1,188 @@
+# throughput.py
+#
+# Runs the full pipeline (build a Race, simulate it headless, score it with
+# RaceResults, settle a bet on every horse) and sweeps worker count, horses per
+# race and data set size. Reports races/sec, p50/p99 latency per race and peak
+# RSS (where the platform reports it) as a table and as JSON.
+#
+#     python -m horse_race_simulator_bench.throughput --workers 1,2,4 --horses 5,50,500 --datasets 0.25,1,4
+#
+# A data set scale below 1 keeps the first part of runs.csv, a scale above 1
+# repeats it with new horse IDs, so larger horse pools can be tried.
+
+import argparse
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+try:
+    import resource # Unix only
+except ImportError:
+    resource = None
+
+def make_dataset(scale, directory):
+    """Writes a copy of runs.csv scaled to 'scale' times its rows into 'directory'
+    Args:
+        scale (float): row multiplier, 1 uses runs.csv itself
+        directory: where scaled copies are written
+    Returns:
+        tuple: (path of the data set, number of rows)
+    """
+    import pandas as pd
+    from horse_race_simulator.race_data.data_cache import load_runs, resolve_data_path
+    runs = load_runs("runs.csv")
+    if scale == 1:
+        return resolve_data_path("runs.csv"), len(runs)
+    rows = max(1, int(len(runs) * scale))
+    copies = -(-rows // len(runs)) # ceiling division
+    id_offset = int(runs['horse_id'].max()) + 1
+    frames = []
+    for copy in range(copies):
+        frame = runs.copy()
+        frame['horse_id'] = frame['horse_id'].astype(int) + copy * id_offset
+        frames.append(frame)
+    scaled = pd.concat(frames, ignore_index=True).head(rows)
+    path = os.path.join(directory, f"runs_x{scale}.csv")
+    scaled.to_csv(path, index=False)
+    return path, rows
+
+def peak_rss_mb():
+    """Returns the peak resident set size of this process in MB, or None where it is unavailable (Windows)"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024 # bytes on macOS, KB on Linux
+
+def warm_worker(csv_filename):
+    """Parses the horse pool before any race is timed"""
+    from horse_race_simulator.race_data.horse_stats import HorsePool
+    HorsePool.load(csv_filename)
+
+def run_pipeline(task):
+    """Runs one race through the whole pipeline. Runs inside a worker process.
+    Args:
+        task (tuple): (num_horses, csv_filename, seed)
+    Returns:
+        tuple: (seconds taken, peak RSS of the worker in MB)
+    """
+    from horse_race_simulator.race_data.race_details import Race
+    from horse_race_simulator.simulation.race_simulator import HeadlessRaceSimulation
+    from horse_race_simulator.simulation.race_results import RaceResults
+    from horse_race_simulator.simulation.betting import User
+
+    num_horses, csv_filename, seed = task
+    random.seed(seed) # track, venue, field and horse speeds
+    start = time.perf_counter()
+
+    race = Race(num_horses=num_horses, csv_filename=csv_filename)
+    simulation = HeadlessRaceSimulation(race, race.track, seed=seed)
+    simulation.start_race()
+    RaceResults(race, race.horses, simulation.get_times())
+    winning_horse_id = simulation.get_winning_horse_id()
+    user = User()
+    for horse in race.horses: # one bet on every horse at fair odds for the field
+        user.balance -= 10
+        user.settle_bet(10, winning_horse_id, horse.horse_id, odds=num_horses)
+
+    return time.perf_counter() - start, peak_rss_mb()
+
+def measure(workers, num_horses, csv_filename, races, seed=0):
+    """Runs 'races' races through the pipeline on 'workers' processes
+    Args:
+        workers (int): worker processes, 1 runs in this process
+        num_horses (int): horses per race
+        csv_filename: data set the fields are drawn from
+        races (int): number of races to run
+        seed (int): seed of the first race, race i uses seed + i
+    Returns:
+        dict: races_per_second, p50_ms, p99_ms and peak_rss_mb (None where unavailable)
+    """
+    tasks = [(num_horses, csv_filename, seed + i) for i in range(races)]
+    if workers == 1:
+        warm_worker(csv_filename)
+        start = time.perf_counter()
+        outcomes = [run_pipeline(task) for task in tasks]
+        elapsed = time.perf_counter() - start
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=warm_worker, initargs=(csv_filename,)) as executor:
+            list(executor.map(time.sleep, [0.01] * workers)) # start every worker before timing
+            start = time.perf_counter()
+            outcomes = list(executor.map(run_pipeline, tasks, chunksize=max(1, races // (workers * 4))))
+            elapsed = time.perf_counter() - start
+
+    latencies = np.array([latency for latency, _ in outcomes]) * 1000
+    peaks = [rss for rss in [peak_rss_mb()] + [rss for _, rss in outcomes] if rss is not None]
+    return {
+        "races_per_second": races / elapsed if elapsed > 0 else float("inf"),
+        "p50_ms": float(np.percentile(latencies, 50)),
+        "p99_ms": float(np.percentile(latencies, 99)),
+        "peak_rss_mb": max(peaks) if peaks else None,
+    }
+
+def sweep(workers_list, horses_list, dataset_scales, races, seed=0):
+    """Measures every combination of worker count, horses per race and data set scale
+    Args:
+        workers_list (list): worker counts
+        horses_list (list): horses per race
+        dataset_scales (list): data set scales, see make_dataset
+        races (int): races per combination
+        seed (int): seed of the first race of every combination
+    Returns:
+        list: one dictionary per combination
+    """
+    directory = tempfile.mkdtemp(prefix="horsle_throughput_")
+    rows = []
+    try:
+        for scale in dataset_scales:
+            csv_filename, dataset_rows = make_dataset(scale, directory)
+            for num_horses in horses_list:
+                for workers in workers_list:
+                    row = {"workers": workers, "horses": num_horses, "dataset_rows": dataset_rows, "races": races}
+                    row.update(measure(workers, num_horses, csv_filename, races, seed))
+                    rows.append(row)
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+    return rows
+
+def print_table(rows):
+    """Prints the sweep results as a table"""
+    header = f"{'Workers':>8} {'Horses':>8} {'Rows':>9} {'Races':>7} {'Races/sec':>11} {'p50 (ms)':>10} {'p99 (ms)':>10} {'RSS (MB)':>10}"
+    print(header)
+    print("-" * len(header))
+    for row in rows:
+        print(
+            f"{row['workers']:>8} {row['horses']:>8} {row['dataset_rows']:>9} {row['races']:>7} "
+            f"{row['races_per_second']:>11,.1f} {row['p50_ms']:>10.2f} {row['p99_ms']:>10.2f} "
+            f"{'n/a' if row['peak_rss_mb'] is None else format(row['peak_rss_mb'], '.1f'):>10}"
+        )
+
+def parse_list(text, kind):
+    return [kind(value) for value in text.split(",") if value]
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure end-to-end race throughput across worker counts, field sizes and data set sizes.")
+    parser.add_argument("--workers", default=f"1,{os.cpu_count() or 1}", help="comma separated worker counts")
+    parser.add_argument("--horses", default="5,50,500", help="comma separated horses per race")
+    parser.add_argument("--datasets", default="1", help="comma separated data set scales, 1 is runs.csv")
+    parser.add_argument("--races", type=int, default=200, help="races per combination")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the first race")
+    parser.add_argument("--output", help="also write the results JSON to this file")
+    args = parser.parse_args(argv)
+
+    workers_list = sorted(set(parse_list(args.workers, int)))
+    rows = sweep(workers_list, parse_list(args.horses, int), parse_list(args.datasets, float), args.races, args.seed)
+    print_table(rows)
+    report = json.dumps(rows, indent=2)
+    print(report)
+    if args.output:
+        with open(args.output, "w") as output_file:
+            output_file.write(report + "\n")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,90 @@
+# test_backtest.py
+
+import random
+import unittest
+import numpy as np
+import pandas as pd
+from horse_race_simulator.race_data.data_cache import resolve_data_path
+from horse_race_simulator.simulation.backtest import Backtester, select_bets, simulated_chunk
+from horse_race_simulator.simulation.odds import MAX_ODDS
+from horse_race_simulator.simulation.strategies import score_rating, score_favourite, score_longshot
+
+class TestBacktester(unittest.TestCase):
+
+    def setUp(self):
+        print("Setting up backtest test")
+        self.runs = pd.DataFrame({
+            'race_id': [7, 7, 7, 9, 9, 11],
+            'horse_id': [1, 2, 3, 4, 5, 6],
+            'horse_rating': [60, 80, 80, 50, 70, 40],
+            'win_odds': [2.5, 4.0, 9.0, 1.5, np.nan, np.nan],
+            'won': [True, False, False, False, True, True],
+        })
+
+    def tearDown(self):
+        print("Tearing down after backtest test.")
+
+    def test_select_bets(self):
+        print("Running test_select_bets")
+        race_ids, horse_ids, odds, won = select_bets(self.runs, score_rating, np.random.default_rng(0))
+        # ties go to the earlier horse, races where the backed horse has no odds get no bet
+        self.assertEqual(race_ids.tolist(), [7])
+        self.assertEqual(horse_ids.tolist(), [2])
+        race_ids, horse_ids, odds, won = select_bets(self.runs, score_favourite, np.random.default_rng(0))
+        self.assertEqual(race_ids.tolist(), [7, 9]) # missing odds are never the favourite
+        self.assertEqual(horse_ids.tolist(), [1, 4])
+        self.assertEqual(odds.tolist(), [2.5, 1.5])
+        self.assertEqual(won.tolist(), [True, False])
+
+    def test_settle(self):
+        print("Running test_settle")
+        backtester = Backtester(stake=10, start_balance=25)
+        chunks = [(np.array([1, 2, 3, 4]), np.array([1, 2, 3, 4]), np.array([3.0, 2.0, 5.0, 2.0]), np.array([False, True, False, False]))]
+        report = backtester.settle(chunks, 4)
+        # 25 -> 15 -> 25 -> 15 -> 5, and 5 no longer covers the stake of 10
+        self.assertEqual(backtester.balances.tolist(), [25, 15, 25, 15, 5])
+        self.assertEqual(report["bets"], 4)
+        self.assertEqual(report["wins"], 1)
+        self.assertAlmostEqual(report["roi"], -0.5)
+        self.assertAlmostEqual(report["max_drawdown"], 20)
+        self.assertAlmostEqual(report["max_drawdown_pct"], 0.8)
+        self.assertAlmostEqual(report["profit_variance"], np.var([-10, 10, -10, -10]))
+
+    def test_historical(self):
+        print("Running test_historical")
+        backtester = Backtester("favourite", workers=1)
+        report = backtester.run_historical()
+        self.assertEqual(report["races"], pd.read_csv(resolve_data_path("runs.csv"))["race_id"].nunique())
+        self.assertEqual(len(backtester.balances), report["bets"] + 1)
+        self.assertAlmostEqual(report["final_balance"], 1000 + report["profit"])
+        with self.assertRaises(ValueError): # runs.csv has no simulated speed
+            Backtester("fastest", workers=1).run_historical()
+
+    def test_simulated_reproducible(self):
+        print("Running test_simulated_reproducible")
+        reports = []
+        random.seed(11)
+        np.random.seed(11)
+        expected = random.random(), np.random.random()
+        random.seed(11)
+        np.random.seed(11)
+        for workers in (1, 2):
+            backtester = Backtester("top_rated", workers=workers, chunk_size=20, master_seed=5)
+            report = backtester.run_simulated(60, odds_samples=5)
+            report.pop("races_per_second")
+            reports.append(report)
+        self.assertEqual(reports[0], reports[1]) # same bets whatever the number of workers
+        self.assertEqual((random.random(), np.random.random()), expected) # the caller's random states are untouched
+        self.assertEqual(reports[0]["races"], 60)
+        self.assertGreater(reports[0]["bets"], 0)
+        self.assertLessEqual(reports[0]["wins"], reports[0]["bets"])
+
+    def test_simulated_odds_cap(self):
+        print("Running test_simulated_odds_cap")
+        # with 300 pricing samples a horse that wins once would be priced at 300
+        race_ids, horse_ids, odds, won = simulated_chunk((0, 10, 8, 300, 2.0, score_longshot, 3))
+        self.assertEqual(len(odds), 10)
+        self.assertEqual(odds.max(), MAX_ODDS) # the longshot is paid what the game pays
+
+if __name__ == "__main__":
+    unittest.main()
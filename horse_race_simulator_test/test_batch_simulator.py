@@ -0,0 +1,56 @@
+# test_batch_simulator.py
+
+import unittest
+from random import seed
+from horse_race_simulator.race_data.race_details import Race
+from horse_race_simulator.simulation.batch_simulator import BatchRaceSimulation
+
+class TestBatchRaceSimulation(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        print("setUpClass for testing BatchRaceSimulation.")
+        seed(0)
+        cls.races = [Race(), Race(num_horses=3)]
+
+    @classmethod
+    def tearDownClass(cls):
+        print("tearDownClass for testing BatchRaceSimulation.")
+        cls.races = None
+
+    def setUp(self):
+        print("Setting up batch simulation test")
+        self.batch = BatchRaceSimulation(self.races, repeats=50, seed=7)
+        self.batch.start_race()
+
+    def tearDown(self):
+        print("Tearing down after batch simulation test.")
+        self.batch = None
+
+    def test_start_race(self):
+        print("Running test_start_race")
+        self.assertEqual(self.batch.finish_ticks.shape, (100, 5)) # 2 races x 50 repeats, padded to 5 lanes
+        self.assertTrue((self.batch.finish_ticks[self.batch.lane_mask] > 0).all()) # every horse finishes
+        self.assertTrue((self.batch.finish_ticks[~self.batch.lane_mask] == -1).all()) # empty lanes never run
+        legs = self.batch.leg_ticks[self.batch.lane_mask]
+        self.assertTrue((legs[:, 0] <= legs[:, 1]).all()) # legs are crossed in order
+        self.assertTrue((legs[:, 2] <= self.batch.finish_ticks[self.batch.lane_mask]).all())
+
+    def test_positions_and_winners(self):
+        print("Running test_positions_and_winners")
+        positions = self.batch.get_positions()
+        self.assertEqual(sorted(positions[0]), [1, 2, 3, 4, 5])
+        self.assertEqual(sorted(positions[-1]), [0, 0, 1, 2, 3]) # padded lanes get position 0
+        winners = self.batch.get_winning_horse_ids()
+        race_horse_ids = [horse.horse_id for horse in self.races[1].horses]
+        self.assertIn(winners[-1], race_horse_ids)
+
+    def test_get_times(self):
+        print("Running test_get_times")
+        times = self.batch.get_times(0)
+        self.assertEqual(set(times), {horse.horse_id for horse in self.races[0].horses})
+        winner = self.batch.get_winning_horse_ids()[0]
+        self.assertEqual(times[winner]["Overall Time"], min(t["Overall Time"] for t in times.values()))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -43,5 +43,14 @@ class TestUser(unittest.TestCase):
         self.assertEqual(self.user.balance, 950, "Balance should decrease by the bet amount")
         self.assertIn(horse_choice, self.user.get_horse_info, "Chosen horse not a valid horse")
 
+    def test_settle_bet(self):
+        print("Running settle bet testing")
+        self.user.balance -= 100
+        self.assertEqual(self.user.settle_bet(100, 3614, 3615, odds=3.0), 0.0, "Losing bets pay nothing")
+        self.assertEqual(self.user.balance, 900)
+        self.user.balance -= 100
+        self.assertEqual(self.user.settle_bet(100, 3614, 3614, odds=3.0), 300.0, "Winning bets pay bet times odds")
+        self.assertEqual(self.user.balance, 1100)
+
 if __name__ == "__main__":
     unittest.main()
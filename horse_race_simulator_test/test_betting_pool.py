@@ -0,0 +1,104 @@
+# test_betting_pool.py
+
+import unittest
+from random import seed
+import numpy as np
+from horse_race_simulator.race_data.race_details import Race
+from horse_race_simulator.simulation.race_simulator import HeadlessRaceSimulation
+from horse_race_simulator.simulation.betting_pool import BettingPool
+
+class TestBettingPool(unittest.TestCase):
+
+    def setUp(self):
+        print("Setting up betting pool test")
+        self.pool = BettingPool([1, 2, 3, 4], takeout=0.2, capacity=2)
+        self.final_results = {1: {"final_position": 2}, 2: {"final_position": 1}, 3: {"final_position": 3}, 4: {"final_position": 4}}
+
+    def tearDown(self):
+        print("Tearing down after betting pool test.")
+        self.pool = None
+
+    def test_pool_totals_and_odds(self):
+        print("Running test_pool_totals_and_odds")
+        self.pool.place_bet(100, 1, 30)
+        self.pool.place_bet(101, 2, 10)
+        self.pool.place_bets([102, 103, 104], [2, 3, 1], [40, 20, 10]) # columns grow past the capacity of 2
+        self.assertEqual(self.pool.num_bets, 5)
+        self.assertEqual(self.pool.totals[0].tolist(), [40, 50, 20, 0]) # totals follow every bet
+        odds = self.pool.odds()
+        self.assertEqual(odds[1], round(110 * 0.8 / 40, 2))
+        self.assertIsNone(odds[4]) # nobody backed horse 4
+        with self.assertRaises(ValueError):
+            self.pool.place_bet(105, 9, 10) # horse not in the race
+        with self.assertRaises(ValueError):
+            self.pool.place_bets([105], [1], [0])
+
+    def test_non_finite_stakes(self):
+        print("Running test_non_finite_stakes")
+        self.pool.place_bet(100, 1, 30)
+        for amount in [float("nan"), float("inf"), -float("inf")]:
+            with self.assertRaises(ValueError):
+                self.pool.place_bet(101, 2, amount)
+            with self.assertRaises(ValueError):
+                self.pool.place_bets([101, 102], [2, 3], [10, amount])
+        self.assertEqual(self.pool.num_bets, 1) # rejected bets leave the pool unchanged
+        self.assertEqual(self.pool.totals[0].tolist(), [30, 0, 0, 0])
+        self.assertEqual(self.pool.odds()[1], round(30 * 0.8 / 30, 2))
+
+    def test_settle(self):
+        print("Running test_settle")
+        self.pool.place_bets([1, 2, 3, 1], [1, 2, 2, 3], [10, 30, 10, 60], "win")
+        self.pool.place_bets([4, 5, 6], [1, 2, 4], [20, 20, 60], "place")
+        payouts = self.pool.settle(self.final_results)
+        # win pool 110 * 0.8 = 88 shared by the 40 staked on horse 2
+        self.assertEqual(payouts[:4].tolist(), [0, 30 * 2.2, 10 * 2.2, 0])
+        # place pool 100 * 0.8 = 80: stakes of 40 returned and the profit of 40 split between horses 1 and 2
+        self.assertEqual(payouts[4:].tolist(), [40, 40, 0])
+        self.assertAlmostEqual(payouts.sum(), 88 + 80)
+        self.assertEqual(self.pool.payouts_by_bettor(payouts), {1: 0.0, 2: 66.0, 3: 22.0, 4: 40.0, 5: 40.0, 6: 0.0})
+
+    def test_refund_when_winner_unbacked(self):
+        print("Running test_refund_when_winner_unbacked")
+        self.pool.place_bets([1, 2], [3, 4], [10, 20])
+        payouts = self.pool.settle(self.final_results)
+        self.assertEqual(payouts.tolist(), [8, 16]) # refunded less the takeout of 0.2
+        self.assertAlmostEqual(self.pool.totals.sum() - payouts.sum(), 6) # the house keeps its share
+
+    def test_house_share(self):
+        print("Running test_house_share")
+        self.pool.place_bet(1, 2, 50) # a lone bettor on the winner only gets the pool back
+        self.pool.place_bet(2, 1, 90, "place") # horse 1 places but holds most of the place pool
+        self.pool.place_bet(3, 2, 10, "place")
+        payouts = self.pool.settle(self.final_results)
+        self.assertAlmostEqual(payouts[0], 40)
+        # place pool 100 * 0.8 = 80: a loss of 20 split between horses 1 and 2
+        self.assertAlmostEqual(payouts[1], 90 - 10)
+        self.assertAlmostEqual(payouts[2], 10 - 10)
+        self.assertAlmostEqual(self.pool.totals.sum() - payouts.sum(), 0.2 * 150)
+        floored = BettingPool([1, 2, 3, 4], takeout=0.2, min_dividend=1.0)
+        floored.place_bet(1, 2, 50)
+        floored.place_bets([2, 3], [1, 2], [90, 10], "place")
+        self.assertEqual(floored.settle(self.final_results).tolist(), [50, 90, 10]) # the house tops up every winning bet
+        self.assertEqual(floored.odds()[2], 1.0)
+        self.assertEqual(self.pool.odds()[2], 0.8)
+
+    def test_many_bettors(self):
+        print("Running test_many_bettors")
+        seed(1)
+        race = Race(num_horses=8)
+        simulation = HeadlessRaceSimulation(race, race.track, seed=1)
+        simulation.start_race()
+        horse_ids = [horse.horse_id for horse in race.horses]
+        pool = BettingPool(horse_ids, takeout=0.15)
+        rng = np.random.default_rng(0)
+        for bet_type in ("win", "place"):
+            pool.place_bets(rng.integers(0, 3000, 20000), rng.choice(horse_ids, 20000), rng.uniform(1, 50, 20000), bet_type)
+        payouts = pool.settle(simulation.final_results)
+        self.assertEqual(len(payouts), 40000)
+        self.assertAlmostEqual(payouts.sum(), pool.totals.sum() * 0.85, places=4) # everything but the takeout is paid out
+        winner = simulation.get_winning_horse_id()
+        winning_bets = (pool.bet_types[:pool.num_bets] == 0) & (pool.bet_lanes[:pool.num_bets] == horse_ids.index(winner))
+        self.assertTrue((payouts[winning_bets] > 0).all())
+
+if __name__ == "__main__":
+    unittest.main()
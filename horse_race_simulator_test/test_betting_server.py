@@ -0,0 +1,66 @@
+# test_betting_server.py
+
+import asyncio
+import unittest
+from horse_race_simulator.simulation.betting_server import BettingServer
+from horse_race_simulator_bench.betting_load import request, run_load
+
+class TestBettingServer(unittest.TestCase):
+
+    def setUp(self):
+        print("Setting up betting server test")
+
+    def tearDown(self):
+        print("Tearing down after betting server test.")
+
+    def test_session(self):
+        print("Running test_session")
+
+        async def scenario():
+            server = BettingServer(port=0, betting_seconds=None, start_balance=100, seed=1) # closed below
+            await server.start()
+            reader, writer = await asyncio.open_connection("127.0.0.1", server.port)
+            try:
+                card = (await request(reader, writer, {"cmd": "race"}))["race"]
+                self.assertEqual(card["status"], "open")
+                horse_id = card["horses"][0]
+                bet = await request(reader, writer, {"cmd": "bet", "horse_id": horse_id, "amount": 40})
+                self.assertTrue(bet["ok"])
+                self.assertEqual(bet["balance"], 60)
+                self.assertFalse((await request(reader, writer, {"cmd": "bet", "horse_id": horse_id, "amount": 500}))["ok"]) # more than the balance
+                self.assertFalse((await request(reader, writer, {"cmd": "bet", "horse_id": -1, "amount": 1}))["ok"]) # not in the race
+                self.assertFalse((await request(reader, writer, {"cmd": "dance"}))["ok"])
+                for amount in ["nan", "inf", -5]:
+                    self.assertFalse((await request(reader, writer, {"cmd": "bet", "horse_id": horse_id, "amount": amount}))["ok"])
+                for bad_request in [[1], None, 3]: # valid JSON, but not an object
+                    self.assertFalse((await request(reader, writer, bad_request))["ok"])
+                self.assertEqual((await request(reader, writer, {"cmd": "balance"}))["balance"], 60) # the session survived
+                server.close_betting()
+                await server.bet_rounds[1].settled.wait() # waiting after the race settled still gets its result
+                result = await request(reader, writer, {"cmd": "wait"})
+                self.assertEqual(result["race_id"], card["race_id"])
+                self.assertIn(result["winning_horse_id"], card["horses"])
+                # a lone bettor gets the pool back less the takeout, whether or not the horse won
+                self.assertAlmostEqual(result["payout"], 40 * 0.85)
+                self.assertAlmostEqual(result["balance"], 60 + 40 * 0.85)
+                late = await request(reader, writer, {"cmd": "race"})
+                self.assertNotEqual(late["race"]["race_number"], card["race_number"]) # the next race has opened
+                self.assertTrue((await request(reader, writer, {"cmd": "quit"}))["quit"])
+            finally:
+                writer.close()
+                await server.stop()
+
+        asyncio.run(scenario())
+
+    def test_load(self):
+        print("Running test_load")
+        report = asyncio.run(run_load(players=50, bets=2)) # betting closes once every player has bet
+        self.assertEqual(report["failures"], 0)
+        self.assertEqual(report["bets"], 100)
+        for rate in ("connects_per_second", "bets_per_second", "settlements_per_second"):
+            self.assertGreater(report[rate], 0)
+        self.assertLessEqual(report["connect_seconds"] + report["window_seconds"] + report["settle_seconds"], report["elapsed_seconds"])
+        self.assertLessEqual(report["bet_p50_ms"], report["bet_p99_ms"])
+
+if __name__ == "__main__":
+    unittest.main()
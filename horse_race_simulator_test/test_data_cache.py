@@ -0,0 +1,84 @@
+# test_data_cache.py
+
+import os
+import shutil
+import tempfile
+import unittest
+import numpy as np
+import pandas as pd
+from horse_race_simulator.race_data.data_cache import DataCache, resolve_data_path
+
+class TestDataCache(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        print("setUpClass for testing DataCache.")
+        cls.source = pd.read_csv(resolve_data_path("runs.csv"), nrows=200)
+
+    @classmethod
+    def tearDownClass(cls):
+        print("tearDownClass for testing DataCache.")
+        cls.source = None
+
+    def setUp(self):
+        print("Setting up data cache test")
+        self.temp_dir = tempfile.mkdtemp()
+        self.csv_filename = os.path.join(self.temp_dir, "runs.csv")
+        self.source.to_csv(self.csv_filename, index=False)
+        self.cache = DataCache(self.csv_filename)
+
+    def tearDown(self):
+        print("Tearing down after data cache test.")
+        shutil.rmtree(self.temp_dir)
+
+    def test_load(self):
+        print("Running test_load")
+        data = self.cache.load()
+        self.assertTrue(os.path.exists(self.cache.manifest_path)) # cache written on first load
+        self.assertEqual(list(data.columns), list(self.source.columns))
+        self.assertEqual(data['horse_age'].dtype, np.int8) # numeric columns are downcast
+        self.assertEqual(data['finish_time'].dtype, np.float64) # 83.92 has no exact float32
+        self.assertEqual(data['position_sec4'].dtype, np.float32) # whole numbers with missing values do
+        self.assertIsInstance(data['horse_type'].dtype, pd.CategoricalDtype) # text columns are dictionary encoded
+        cached = self.cache.load(columns=['horse_id', 'horse_type', 'finish_time'])
+        self.assertEqual(list(cached.columns), ['horse_id', 'horse_type', 'finish_time'])
+        self.assertEqual(cached['horse_id'].tolist(), self.source['horse_id'].tolist())
+        self.assertEqual(cached['horse_type'].tolist(), self.source['horse_type'].tolist())
+        self.assertEqual(cached['finish_time'].tolist(), self.source['finish_time'].tolist())
+
+    def test_invalidation(self):
+        print("Running test_invalidation")
+        self.cache.load()
+        first_hash = self.cache.read_manifest()["sha256"]
+        # touching the file without changing it keeps the cache
+        os.utime(self.csv_filename, ns=(0, 10**9))
+        self.assertTrue(self.cache.is_fresh(self.cache.read_manifest()))
+        self.assertEqual(self.cache.read_manifest()["mtime_ns"], 10**9)
+        # changing the contents rebuilds it
+        self.source.head(50).to_csv(self.csv_filename, index=False)
+        self.assertFalse(self.cache.is_fresh(self.cache.read_manifest()))
+        self.assertEqual(len(self.cache.load()), 50)
+        self.assertNotEqual(self.cache.read_manifest()["sha256"], first_hash)
+        # each build has its own data directory and only the current one is kept
+        data_dirs = [name for name in os.listdir(self.cache.cache_dir) if name.startswith("data-")]
+        self.assertEqual(data_dirs, [self.cache.read_manifest()["data_dir"]])
+
+    def test_concurrent_builds(self):
+        print("Running test_concurrent_builds")
+        self.cache.load()
+        first_dir = self.cache.read_manifest()["data_dir"]
+        # another build still writing its columns, with no manifest published yet
+        writing_dir = tempfile.mkdtemp(prefix="data-", dir=self.cache.cache_dir)
+        np.save(os.path.join(writing_dir, "0.npy"), np.arange(3))
+        self.cache.build()
+        current_dir = self.cache.read_manifest()["data_dir"]
+        data_dirs = sorted(name for name in os.listdir(self.cache.cache_dir) if name.startswith("data-"))
+        self.assertEqual(data_dirs, sorted([current_dir, os.path.basename(writing_dir)])) # the replaced build is removed
+        self.assertNotEqual(current_dir, first_dir)
+        # a reader whose data directory disappears rebuilds instead of failing
+        shutil.rmtree(os.path.join(self.cache.cache_dir, current_dir))
+        self.assertEqual(self.cache.load(columns=['horse_id'])['horse_id'].tolist(), self.source['horse_id'].tolist())
+        self.assertNotEqual(self.cache.read_manifest()["data_dir"], current_dir)
+
+if __name__ == "__main__":
+    unittest.main()
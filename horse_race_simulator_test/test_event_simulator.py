@@ -0,0 +1,69 @@
+# test_event_simulator.py
+
+import unittest
+import numpy as np
+from random import seed
+from horse_race_simulator.race_data.race_details import Race
+from horse_race_simulator.simulation.event_simulator import EventRaceSimulation
+
+class TestEventRaceSimulation(unittest.TestCase):
+
+    def setUp(self):
+        print("Setting up event simulation test")
+        seed(0)
+        self.race = Race()
+        self.simulation = EventRaceSimulation(self.race, self.race.track, seed=5)
+
+    def tearDown(self):
+        print("Tearing down after event simulation test.")
+        self.simulation = None
+
+    def test_start_race(self):
+        print("Running test_start_race")
+        self.simulation.start_race()
+        self.assertEqual(self.simulation.events, 4 * len(self.race.horses)) # three legs and the finish per horse
+        results = self.simulation.final_results
+        self.assertEqual(sorted(r["final_position"] for r in results.values()), [1, 2, 3, 4, 5])
+        by_position = sorted(results.values(), key=lambda r: r["final_position"])
+        finish_times = [r["overall_time"] for r in by_position]
+        self.assertEqual(finish_times, sorted(finish_times)) # positions follow the exact crossing times
+        for race_horse, horse in self.simulation.horse_objects:
+            legs = self.simulation.race_data[horse.horse_id]["leg_times"]
+            self.assertLess(0, legs["First Leg"])
+            self.assertLess(legs["First Leg"], legs["Second Leg"])
+            self.assertLess(legs["Second Leg"], legs["Third Leg"])
+            self.assertLess(legs["Third Leg"], self.simulation.race_data[horse.horse_id]["overall_time"])
+            self.assertGreaterEqual(race_horse.xcor(), self.simulation.finish_line)
+        winner = [horse_id for horse_id, r in results.items() if r["final_position"] == 1][0]
+        self.assertEqual(self.simulation.get_winning_horse_id(), winner)
+
+    def test_exact_crossing_times(self):
+        print("Running test_exact_crossing_times")
+        self.simulation.start_race()
+        overall_times = [data["overall_time"] for data in self.simulation.race_data.values()]
+        # interpolated inside a movement step rather than snapped to 0.05s ticks
+        self.assertTrue(any(abs(t / 0.05 - round(t / 0.05)) > 1e-6 for t in overall_times))
+        self.assertLessEqual(max(overall_times), self.simulation.ticks * self.simulation.tick_seconds)
+        again = EventRaceSimulation(self.race, self.race.track, seed=5)
+        again.start_race()
+        self.assertEqual(again.final_results, self.simulation.final_results) # reproducible for a seed
+
+    def test_record(self):
+        print("Running test_record")
+        simulation = EventRaceSimulation(self.race, self.race.track, seed=5, record=True)
+        simulation.start_race()
+        self.simulation.start_race()
+        self.assertEqual(simulation.final_results, self.simulation.final_results) # recording does not change the race
+        positions = simulation.recording.to_array()
+        self.assertEqual(positions.shape, (simulation.ticks + 1, len(self.race.horses))) # start line plus one entry per tick
+        self.assertEqual(simulation.recording.positions_at(0), [-simulation.finish_line] * len(self.race.horses))
+        self.assertTrue((np.diff(positions, axis=0) >= 0).all()) # horses never move backwards
+        for lane, (_, horse) in enumerate(simulation.horse_objects):
+            first_leg = simulation.race_data[horse.horse_id]["leg_times"]["First Leg"]
+            tick = int(first_leg / simulation.tick_seconds)
+            self.assertLessEqual(positions[tick, lane], simulation.leg_markers[0] + 1e-3) # float32 storage
+            self.assertGreaterEqual(positions[tick + 1, lane], simulation.leg_markers[0] - 1e-3)
+            self.assertAlmostEqual(positions[-1, lane], simulation.finish_line, places=3)
+
+if __name__ == "__main__":
+    unittest.main()
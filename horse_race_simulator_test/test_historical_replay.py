@@ -0,0 +1,66 @@
+# test_historical_replay.py
+
+import unittest
+import numpy as np
+import pandas as pd
+from horse_race_simulator.race_data.data_cache import resolve_data_path
+from horse_race_simulator.simulation.historical_replay import HistoricalReplay
+
+class TestHistoricalReplay(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.replay = HistoricalReplay() # reconstructs every race once for all tests
+        cls.runs = pd.read_csv(resolve_data_path("runs.csv"))
+
+    def setUp(self):
+        print("Setting up historical replay test")
+        self.race_id = int(self.replay.race_ids[np.argmax(np.diff(self.replay.starts))]) # the largest field
+
+    def tearDown(self):
+        print("Tearing down after historical replay test.")
+
+    def test_reconstruction(self):
+        print("Running test_reconstruction")
+        self.assertEqual(len(self.replay.race_ids), self.runs["race_id"].nunique())
+        # the finish is the sum of the sectionals, which is the recorded finish time
+        np.testing.assert_allclose(self.replay.leg_times[:, 3], self.replay.runs["finish_time"].to_numpy(dtype=float), atol=1e-3)
+        self.assertTrue((np.diff(self.replay.leg_times, axis=1) > 0).all()) # legs are crossed in order
+        self.assertEqual(np.nanmin(self.replay.gaps), 0) # the leader of each section is 0 seconds behind
+        self.assertGreater(self.replay.section_agreement(), 0.9)
+
+    def test_results_and_recording(self):
+        print("Running test_results_and_recording")
+        expected = self.runs[self.runs["race_id"] == self.race_id].sort_values("finish_time", kind="stable")["horse_id"].tolist()
+        results = self.replay.results(self.race_id)
+        self.assertEqual(results.data.sort_values("result")["horse_id"].tolist(), expected)
+        times = self.replay.get_times(self.race_id)
+        self.assertEqual(sorted(times, key=lambda horse_id: times[horse_id]["Overall Time"]), expected)
+
+        recording = self.replay.recording(self.race_id)
+        positions = recording.to_array()
+        scaled_length = 0.3 * self.replay.race(self.race_id).distance
+        np.testing.assert_allclose(positions[0], -scaled_length / 2)
+        np.testing.assert_allclose(positions[-1], scaled_length / 2)
+        self.assertTrue((np.diff(positions, axis=0) >= 0).all()) # horses never move backwards
+        with self.assertRaises(ValueError):
+            self.replay.race(-1)
+
+    def test_compare_to_simulation(self):
+        print("Running test_compare_to_simulation")
+        report = self.replay.compare_to_simulation(seed=0)
+        self.assertEqual(report["races"], int((self.runs.groupby("race_id").size() >= 2).sum()))
+        self.assertTrue(0 <= report["winner_agreement"] <= 1)
+        self.assertTrue(-1 <= report["rank_correlation"] <= 1)
+        self.assertGreater(report["historical_winning_time"], 0)
+        self.assertGreater(report["simulated_winning_time"], 0)
+        self.assertGreater(report["time_scale"], 1) # the simulator's clock runs faster than a real race
+        # both winning times are in real seconds, below the mean finish time of the data set
+        mean_finish = self.runs["finish_time"].mean()
+        self.assertLess(report["historical_winning_time"], mean_finish)
+        self.assertLess(report["simulated_winning_time"], mean_finish)
+        self.assertGreater(report["simulated_winning_time"], mean_finish / 2)
+        self.assertEqual(report, self.replay.compare_to_simulation(seed=0))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,108 @@
+# test_history_store.py
+
+import os
+import shutil
+import tempfile
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+from unittest.mock import patch
+from horse_race_simulator.race_data.horse_stats import Horse
+from horse_race_simulator.race_data.history_store import HistoryStore
+from horse_race_simulator.simulation.race_results import RaceResults
+
+def read_wins(task):
+    """Opens the store in a worker process and looks up one horse"""
+    path, horse_id = task
+    return HistoryStore(path).lookup(horse_id)['wins']
+
+def open_store(path):
+    """Opens a shared store in a worker process, loading runs.csv if it is new"""
+    return RaceResults.use_history_store(path).count()
+
+class Race:
+    def __init__(self):
+        self.race_id = 999999
+        self.date = "2024-01-01"
+
+class TestHistoryStore(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        print("setUpClass for testing HistoryStore.")
+        cls.directory = tempfile.mkdtemp()
+        cls.path = os.path.join(cls.directory, "history.db")
+        cls.rows = HistoryStore(cls.path).ingest_csv("runs.csv", chunksize=1000) # several chunks
+
+    @classmethod
+    def tearDownClass(cls):
+        print("tearDownClass for testing HistoryStore.")
+        shutil.rmtree(cls.directory)
+
+    def setUp(self):
+        print("Setting up history store test")
+        self.store = HistoryStore(self.path)
+
+    def tearDown(self):
+        print("Tearing down after history store test.")
+        self.store.close()
+        RaceResults.history_store = None
+
+    def test_ingest_lookup(self):
+        print("Running test_ingest_lookup")
+        self.assertEqual(self.rows, len(RaceResults.hist))
+        self.assertEqual(self.store.count(), self.rows)
+        indexes = [row[1] for row in self.store.connection.execute("PRAGMA index_list(runs)")]
+        for column in ['horse_id', 'race_id', 'jockey_id', 'trainer_id']:
+            self.assertIn(f"runs_{column}", indexes)
+        for horse_id in RaceResults.hist['horse_id'].head(20).tolist():
+            expected = RaceResults.history_index.lookup(horse_id)
+            stats = self.store.lookup(horse_id)
+            self.assertEqual(set(stats), set(expected))
+            self.assertEqual(stats['races'], expected['races'])
+            self.assertEqual(stats['wins'], expected['wins'])
+            self.assertAlmostEqual(stats['mean_finish_time'], expected['mean_finish_time'], places=4)
+            self.assertAlmostEqual(stats['median_finish_time'], expected['median_finish_time'], places=4)
+        self.assertIsNone(self.store.lookup(-1))
+        jockey_runs = self.store.runs_for('jockey_id', 2)
+        self.assertEqual(len(jockey_runs), (RaceResults.hist['jockey_id'] == 2).sum())
+        with self.assertRaises(ValueError):
+            self.store.runs_for('horse_age', 3) # not indexed
+
+    def test_concurrent_readers(self):
+        print("Running test_concurrent_readers")
+        horse_ids = RaceResults.hist['horse_id'].head(8).tolist()
+        with ProcessPoolExecutor(max_workers=2) as executor:
+            wins = list(executor.map(read_wins, [(self.path, horse_id) for horse_id in horse_ids]))
+        self.assertEqual(wins, [self.store.lookup(horse_id)['wins'] for horse_id in horse_ids])
+
+    def test_race_results_store(self):
+        print("Running test_race_results_store")
+        path = os.path.join(self.directory, "results.db")
+        store = RaceResults.use_history_store(path)
+        self.assertEqual(store.count(), self.rows)
+        self.assertEqual(RaceResults.use_history_store(path).count(), self.rows) # an existing store is not loaded twice
+        shared = os.path.join(self.directory, "shared.db")
+        with ProcessPoolExecutor(max_workers=2) as executor:
+            counts = list(executor.map(open_store, [shared] * 4))
+        self.assertEqual(counts, [self.rows] * 4) # only one process loads a new store
+        horse = Horse(3917, 3, 133, "Gelding", 60, 2)
+        newcomer = Horse(-5, 3, 120, "Colt", 40, 2)
+        times = {3917: {"Overall Time": 80.0, "Leg 1 Time": 20.0, "Leg 2 Time": 40.0, "Leg 3 Time": 60.0},
+                 -5: {"Overall Time": 90.0, "Leg 1 Time": 22.0, "Leg 2 Time": 44.0, "Leg 3 Time": 66.0}}
+        results = RaceResults(Race(), [horse, newcomer], times)
+        before = store.lookup(3917)
+        results.add_to_history()
+        after = store.lookup(3917)
+        self.assertEqual(after['races'], before['races'] + 1)
+        self.assertEqual(after['wins'], before['wins'] + 1)
+        self.assertEqual(store.lookup(-5)['races'], 1)
+        results.add_to_history() # the same race again replaces its runs
+        self.assertEqual(store.lookup(3917), after)
+        self.assertEqual(store.count(), self.rows + 2)
+        with patch('builtins.input', side_effect=[3917]), patch('builtins.print') as mock_print:
+            results.get_horse_performance()
+        printed = " ".join(str(call.args[0]) for call in mock_print.call_args_list)
+        self.assertIn(f"Historical Win count: {after['wins']} of {after['races']} races", printed)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+# test_horse_history.py
+
+import unittest
+import pandas as pd
+from horse_race_simulator.race_data.horse_history import HorseHistoryIndex
+
+class TestHorseHistoryIndex(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        print("setUpClass for testing HorseHistoryIndex.")
+        cls.history = pd.DataFrame({
+            'race_id': [1, 1, 2, 2, 3],
+            'horse_id': [10, 20, 10, 20, 10],
+            'result': [1, 2, 2, 1, 1],
+            'won': [1, 0, 0, 1, 1],
+            'finish_time': [70.0, 71.0, 80.0, 79.0, 75.0],
+            'time1': [20.0, 21.0, 22.0, 21.0, 20.0],
+            'time2': [50.0, 50.0, 58.0, 58.0, None],
+        })
+
+    @classmethod
+    def tearDownClass(cls):
+        print("tearDownClass for testing HorseHistoryIndex.")
+        cls.history = None
+
+    def setUp(self):
+        print("Setting up history index test")
+        self.index = HorseHistoryIndex(self.history)
+
+    def tearDown(self):
+        print("Tearing down after history index test.")
+        self.index = None
+
+    def test_lookup(self):
+        print("Running test_lookup")
+        stats = self.index.lookup(10)
+        self.assertEqual(stats['races'], 3)
+        self.assertEqual(stats['wins'], 2)
+        self.assertAlmostEqual(stats['win_ratio'], 200 / 3)
+        self.assertAlmostEqual(stats['mean_finish_time'], 75.0)
+        self.assertEqual(stats['median_finish_time'], 75.0)
+        self.assertEqual(stats['best_finish_time'], 70.0)
+        self.assertAlmostEqual(stats['mean_rank'], 4 / 3)
+        self.assertAlmostEqual(stats['sectional_times'][0], 62.0 / 3)
+        self.assertEqual(stats['sectional_times'][1], 54.0) # time2 skips the missing value
+        self.assertEqual(stats['sectional_times'][2:], [None] * 4) # sections never run
+        self.assertIsNone(self.index.lookup(99))
+
+    def test_append(self):
+        print("Running test_append")
+        new_results = pd.DataFrame({'horse_id': [20, 30], 'result': [1, 2], 'finish_time': [72.0, 90.0]})
+        self.index.append(new_results)
+        stats = self.index.lookup(20)
+        self.assertEqual(stats['races'], 3)
+        self.assertEqual(stats['wins'], 2)
+        self.assertAlmostEqual(stats['mean_finish_time'], (71.0 + 79.0 + 72.0) / 3)
+        self.assertEqual(stats['median_finish_time'], 72.0)
+        new_horse = self.index.lookup(30) # horses without history are added
+        self.assertEqual((new_horse['races'], new_horse['wins'], new_horse['best_finish_time']), (1, 0, 90.0))
+
+    def test_append_race_once(self):
+        print("Running test_append_race_once")
+        new_results = pd.DataFrame({'horse_id': [20, 30], 'result': [1, 2], 'finish_time': [72.0, 90.0]})
+        self.assertEqual(self.index.append(new_results, race_id=500), 2)
+        before = self.index.lookup(20)
+        self.assertEqual(self.index.append(new_results, race_id=500), 0) # the same race again
+        self.assertEqual(self.index.lookup(20), before)
+        self.assertEqual(self.index.lookup(30)['races'], 1)
+        self.assertEqual(self.index.append(new_results, race_id=1), 1) # horse 20 ran race 1 in the history, horse 30 did not
+
+if __name__ == "__main__":
+    unittest.main()
@@ -3,7 +3,8 @@
 import unittest
 from pandas import read_csv
 from random import uniform
-from horse_race_simulator.race_data.horse_stats import Horse
+import numpy as np
+from horse_race_simulator.race_data.horse_stats import Horse, HorsePool, HorseTable
 
 class TestHorse(unittest.TestCase):
 
@@ -43,5 +44,45 @@ class TestHorse(unittest.TestCase):
         if self.horse.actual_weight < 125:
             self.assertGreater(race_speed, initial_speed)
 
+    def test_horse_pool(self):
+        print("Running test_horse_pool")
+        pool = HorsePool.load("runs.csv")
+        self.assertIs(HorsePool.load("runs.csv"), pool) # the data set is parsed once and shared
+        field = pool.draw(10)
+        self.assertEqual(len(field), 10)
+        self.assertEqual(len({horse.horse_id for horse in field}), 10) # no horse appears twice
+        for horse in field:
+            self.assertIsInstance(horse, Horse)
+            self.assertIn(horse.horse_id, pool.horse_ids)
+        self.assertIsInstance(Horse.create_horse("runs.csv"), Horse)
+        self.assertIsNone(Horse.create_horse("missing.csv"))
+
+    def test_horse_table(self):
+        print("Running test_horse_table")
+        self.assertFalse(hasattr(self.horse, '__dict__')) # Horse uses __slots__
+        table = HorseTable([1, 2, 3, 4], [2, 7, 4, 4], [130, 120, 120, 130], ['Colt', 'Mare', 'Gelding', 'Colt'], [60, 40, 40, 40], [5, 6, 7, 8], rng=np.random.default_rng(0))
+        self.assertEqual(len(table), 4)
+        self.assertEqual(table.type_names, ['Colt', 'Gelding', 'Mare'])
+        # same rules as update_horse_stats: rating > 50 +5, age < 3 -2, age > 5 -5, otherwise weight < 125 +5
+        self.assertTrue(33.0 <= table.speed[0] <= 53.0)
+        self.assertTrue(25.0 <= table.speed[1] <= 45.0)
+        self.assertTrue(35.0 <= table.speed[2] <= 55.0)
+        self.assertTrue(30.0 <= table.speed[3] <= 50.0)
+        horses = table.horses()
+        self.assertIsInstance(horses[1], Horse)
+        self.assertEqual((horses[1].horse_id, horses[1].horse_type, horses[1].speed), (2, 'Mare', table.speed[1]))
+        horses[1].speed = 5 # views write through to the table
+        self.assertEqual(table.speed[1], 5)
+        self.assertEqual(table[-1].jockey_id, 8)
+        with self.assertRaises(IndexError):
+            table[4]
+        drawn = HorsePool.load("runs.csv").draw_table(6)
+        self.assertEqual(len(set(drawn.horse_id.tolist())), 6)
+        seeded = [HorsePool.load("runs.csv").draw_table(6, np_rng=np.random.default_rng(4)) for _ in range(2)]
+        self.assertEqual(seeded[0].horse_id.tolist(), seeded[1].horse_id.tolist())
+        self.assertEqual(seeded[0].speed.tolist(), seeded[1].speed.tolist())
+        copied = HorseTable.from_horses([self.horse])
+        self.assertEqual(copied[0].speed, self.horse.speed)
+
 if __name__ == "__main__":
     unittest.main()
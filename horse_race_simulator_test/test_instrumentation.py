@@ -0,0 +1,72 @@
+# test_instrumentation.py
+
+import json
+import os
+import tempfile
+import unittest
+from random import seed
+from horse_race_simulator.race_data.race_details import Race
+from horse_race_simulator.simulation.race_simulator import HeadlessRaceSimulation
+from horse_race_simulator.simulation.race_results import RaceResults
+from horse_race_simulator.simulation.betting import User
+from horse_race_simulator.instrumentation import instrumentation, NULL_TIMER
+
+class TestInstrumentation(unittest.TestCase):
+
+    def setUp(self):
+        print("Setting up instrumentation test")
+        seed(0)
+        instrumentation.reset()
+
+    def tearDown(self):
+        print("Tearing down after instrumentation test.")
+        instrumentation.disable()
+        instrumentation.reset()
+
+    def run_pipeline(self):
+        race = Race()
+        simulation = HeadlessRaceSimulation(race, race.track, seed=1)
+        simulation.start_race()
+        RaceResults(race, race.horses, simulation.get_times())
+        User().settle_bet(10, simulation.get_winning_horse_id(), race.horses[0].horse_id)
+        return simulation
+
+    def test_disabled(self):
+        print("Running test_disabled")
+        self.assertIs(instrumentation.timer("tick"), NULL_TIMER) # no timer objects are created while disabled
+        self.run_pipeline()
+        self.assertEqual(instrumentation.snapshot(), {"counters": {}, "timers": {}})
+
+    def test_enabled(self):
+        print("Running test_enabled")
+        instrumentation.enable()
+        simulation = self.run_pipeline()
+        snapshot = instrumentation.snapshot()
+        self.assertEqual(snapshot["counters"]["races"], 1)
+        self.assertEqual(snapshot["counters"]["bets_settled"], 1)
+        for name in ["race_field", "race_setup", "tick", "race", "results_frame", "bet_settlement"]:
+            self.assertIn(name, snapshot["timers"])
+        tick = snapshot["timers"]["tick"]
+        self.assertEqual(tick["count"], simulation.ticks)
+        self.assertLessEqual(tick["mean"], tick["max"])
+
+        path = os.path.join(tempfile.mkdtemp(), "timings.jsonl")
+        instrumentation.export_jsonl(path, race_id=1)
+        instrumentation.export_jsonl(path, race_id=2)
+        with open(path) as jsonl_file:
+            lines = [json.loads(line) for line in jsonl_file]
+        os.remove(path)
+        self.assertEqual([line["race_id"] for line in lines], [1, 2])
+        self.assertEqual(lines[0]["timers"]["tick"]["count"], simulation.ticks)
+
+    def test_profile_next_race(self):
+        print("Running test_profile_next_race")
+        instrumentation.profile_next_race()
+        self.run_pipeline()
+        self.assertIn("move_horses", str(instrumentation.last_profile.stats)) # the race itself was profiled
+        instrumentation.last_profile = None
+        self.run_pipeline()
+        self.assertIsNone(instrumentation.last_profile) # only the next race is profiled
+
+if __name__ == "__main__":
+    unittest.main()
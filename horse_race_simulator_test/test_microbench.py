@@ -0,0 +1,31 @@
+# test_microbench.py
+
+import unittest
+from horse_race_simulator_bench.microbench import BENCHMARKS, run_benchmarks, compare_to_baseline
+
+class TestMicrobench(unittest.TestCase):
+
+    def setUp(self):
+        print("Setting up microbenchmark test")
+
+    def tearDown(self):
+        print("Tearing down after microbenchmark test.")
+
+    def test_run_benchmarks(self):
+        print("Running test_run_benchmarks")
+        results = run_benchmarks(repeats=2, warmup=0, scale=0.01) # one or two calls each, just checks every benchmark runs
+        self.assertEqual(set(results), set(BENCHMARKS))
+        for stats in results.values():
+            self.assertGreater(stats["median"], 0)
+            self.assertLessEqual(stats["min"], stats["median"])
+
+    def test_compare_to_baseline(self):
+        print("Running test_compare_to_baseline")
+        baseline = {"fast": {"median": 1.0}, "slow": {"median": 1.0}}
+        results = {"fast": {"median": 1.2}, "slow": {"median": 2.0}, "new": {"median": 5.0}}
+        regressions = compare_to_baseline(results, baseline, tolerance=0.5)
+        self.assertEqual([name for name, *_ in regressions], ["slow"]) # new benchmarks have nothing to compare against
+        self.assertEqual(regressions[0][3], 2.0)
+
+if __name__ == "__main__":
+    unittest.main()
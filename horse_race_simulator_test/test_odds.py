@@ -0,0 +1,58 @@
+# test_odds.py
+
+import unittest
+from random import seed
+from horse_race_simulator.race_data.race_details import Race
+from horse_race_simulator.simulation.odds import OddsEngine
+
+class TestOddsEngine(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        print("setUpClass for testing OddsEngine.")
+        seed(0)
+        cls.race = Race(num_horses=3)
+        # one clear favourite and two slower horses
+        cls.race.horses[0].speed = 55.0
+        cls.race.horses[1].speed = 40.0
+        cls.race.horses[2].speed = 39.0
+
+    @classmethod
+    def tearDownClass(cls):
+        print("tearDownClass for testing OddsEngine.")
+        cls.race = None
+
+    def setUp(self):
+        print("Setting up odds test")
+        self.engine = OddsEngine(self.race, max_samples=4000, batch_size=1000, seed=3)
+
+    def tearDown(self):
+        print("Tearing down after odds test.")
+        self.engine = None
+
+    def test_estimate_odds(self):
+        print("Running test_estimate_odds")
+        odds = self.engine.estimate_odds()
+        self.assertEqual(self.engine.samples, 4000) # sample budget is respected
+        self.assertAlmostEqual(sum(o["win_probability"] for o in odds.values()), 1.0)
+        for horse_odds in odds.values():
+            self.assertLessEqual(horse_odds["lower_bound"], horse_odds["win_probability"])
+            self.assertGreaterEqual(horse_odds["upper_bound"], horse_odds["win_probability"])
+            self.assertGreaterEqual(horse_odds["odds"], 1.0)
+        favourite, outsider = self.race.horses[0].horse_id, self.race.horses[2].horse_id
+        self.assertLess(odds[favourite]["odds"], odds[outsider]["odds"]) # the fastest horse pays the least
+
+    def test_time_budget(self):
+        print("Running test_time_budget")
+        engine = OddsEngine(self.race, max_samples=10**9, batch_size=500, time_budget=0.05, seed=3)
+        engine.estimate_odds()
+        self.assertGreaterEqual(engine.samples, 500) # at least one batch is always run
+        self.assertLess(engine.samples, 10**9) # stopped by the time budget
+        self.assertEqual(engine.get_odds(self.race.horses[0].horse_id), engine.odds[self.race.horses[0].horse_id]["odds"])
+        with self.assertRaises(ValueError): # no samples to estimate from
+            OddsEngine(self.race, max_samples=0)
+        with self.assertRaises(ValueError):
+            OddsEngine(self.race, batch_size=0)
+
+if __name__ == "__main__":
+    unittest.main()
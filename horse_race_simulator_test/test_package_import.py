@@ -0,0 +1,74 @@
+# test_package_import.py
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+PACKAGE_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+IMPORT_BUDGET = 0.5 # seconds allowed for a cold import of the betting module
+
+IMPORT_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+import horse_race_simulator.simulation.betting
+elapsed = time.perf_counter() - start
+from horse_race_simulator.simulation.race_results import RaceResults
+print(json.dumps({
+    "elapsed": elapsed,
+    "modules": [name for name in ("turtle", "tkinter", "pandas") if name in sys.modules],
+    "history_loaded": RaceResults.__dict__["hist"].data is not None,
+}))
+"""
+
+HISTORY_SCRIPT = """
+from horse_race_simulator.simulation.race_results import RaceResults
+from horse_race_simulator.race_data.race_details import Race
+print(len(RaceResults.hist), len(Race().horses))
+"""
+
+LAYERING_SCRIPT = """
+import glob, importlib, os, sys
+import horse_race_simulator.instrumentation
+package = os.path.dirname(horse_race_simulator.instrumentation.__file__)
+for path in sorted(glob.glob(os.path.join(package, "race_data", "*.py"))):
+    importlib.import_module("horse_race_simulator.race_data." + os.path.basename(path)[:-3])
+print(sorted(name for name in sys.modules if name.startswith("horse_race_simulator.simulation")))
+"""
+
+class TestPackageImport(unittest.TestCase):
+
+    def setUp(self):
+        print("Setting up package import test")
+        self.work_dir = tempfile.mkdtemp() # run away from the repository so runs.csv is not in the working directory
+        self.env = dict(os.environ, PYTHONPATH=PACKAGE_ROOT)
+
+    def tearDown(self):
+        print("Tearing down after package import test.")
+        os.rmdir(self.work_dir)
+
+    def run_script(self, script):
+        result = subprocess.run([sys.executable, "-c", script], cwd=self.work_dir, env=self.env, capture_output=True, text=True, check=True)
+        return result.stdout.strip().splitlines()[-1]
+
+    def test_cold_import(self):
+        print("Running test_cold_import")
+        report = json.loads(self.run_script(IMPORT_SCRIPT))
+        self.assertEqual(report["modules"], []) # no turtle/tkinter/pandas at import time
+        self.assertFalse(report["history_loaded"]) # runs.csv is read on first use only
+        self.assertLess(report["elapsed"], IMPORT_BUDGET)
+
+    def test_any_working_directory(self):
+        print("Running test_any_working_directory")
+        history_rows, num_horses = self.run_script(HISTORY_SCRIPT).split()
+        self.assertGreater(int(history_rows), 0) # the bundled runs.csv is found from another directory
+        self.assertEqual(int(num_horses), 5)
+
+    def test_layering(self):
+        print("Running test_layering")
+        self.assertEqual(self.run_script(LAYERING_SCRIPT), "[]") # race_data never imports simulation
+
+if __name__ == "__main__":
+    unittest.main()
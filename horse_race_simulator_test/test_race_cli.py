@@ -0,0 +1,69 @@
+# test_race_cli.py
+
+import io
+import json
+import random
+import unittest
+import numpy as np
+from contextlib import redirect_stdout
+from race_cli import run_races, main
+from horse_race_simulator.race_data.race_details import Race
+from horse_race_simulator.simulation.strategies import STRATEGIES, select_horse, race_runs, score_favourite
+from horse_race_simulator.simulation.backtest import select_bets
+
+class TestRaceCli(unittest.TestCase):
+
+    def setUp(self):
+        print("Setting up race CLI test")
+
+    def tearDown(self):
+        print("Tearing down after race CLI test.")
+
+    def test_strategies(self):
+        print("Running test_strategies")
+        race = Race(num_horses=5)
+        odds = {horse.horse_id: float(lane + 2) for lane, horse in enumerate(race.horses)}
+        horse_ids = [horse.horse_id for horse in race.horses]
+        self.assertEqual(select_horse("favourite", race, odds), horse_ids[0])
+        self.assertEqual(select_horse("longshot", race, odds), horse_ids[-1])
+        self.assertEqual(select_horse("fastest", race, odds), max(race.horses, key=lambda horse: horse.speed).horse_id)
+        self.assertEqual(select_horse("top_rated", race, odds), max(race.horses, key=lambda horse: horse.horse_rating).horse_id)
+        # the same scoring as the backtester
+        runs = race_runs(race, odds).assign(won=False)
+        self.assertEqual(select_bets(runs, score_favourite, np.random.default_rng(0))[1].tolist(), [select_horse(score_favourite, race, odds)])
+        for strategy in STRATEGIES:
+            self.assertIn(select_horse(strategy, race, odds), horse_ids)
+        with self.assertRaises(ValueError):
+            select_horse("hunch", race, odds)
+
+    def test_run_races(self):
+        print("Running test_run_races")
+        state = random.getstate()
+        records = list(run_races(4, "favourite", stake=10, seed=3, odds_samples=200))
+        self.assertEqual(random.getstate(), state) # seeded runs leave the shared random state alone
+        self.assertEqual(len(records), 4)
+        balance = 1000
+        for record in records:
+            balance += record["payout"] - 10
+            self.assertAlmostEqual(record["balance"], balance)
+            self.assertEqual(record["payout"] > 0, record["horse_id"] == record["winning_horse_id"])
+        again = list(run_races(4, "favourite", stake=10, seed=3, odds_samples=200))
+        strip = lambda rows: [{key: value for key, value in row.items() if key != "race_id"} for row in rows]
+        self.assertEqual(strip(records), strip(again)) # same seed, same races and bets
+        self.assertLess(len(list(run_races(10, "random", stake=600, seed=3, odds_samples=0))), 10) # stops once the stake is not covered
+
+    def test_main_jsonl(self):
+        print("Running test_main_jsonl")
+        output = io.StringIO()
+        with redirect_stdout(output):
+            self.assertEqual(main(["--races", "3", "--strategy", "random", "--seed", "1", "--odds-samples", "0", "--format", "jsonl"]), 0)
+        lines = [json.loads(line) for line in output.getvalue().splitlines()]
+        self.assertEqual([line["race_number"] for line in lines[:-1]], [0, 1, 2])
+        self.assertEqual(lines[-1]["summary"]["races"], 3)
+        self.assertEqual(lines[-1]["summary"]["balance"], lines[-2]["balance"])
+        with self.assertRaises(SystemExit): # favourite needs estimated odds
+            with redirect_stdout(io.StringIO()):
+                main(["--races", "1", "--odds-samples", "0"])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,9 +1,10 @@
 # test_race_details.py
 
+import random
 import unittest
 from datetime import timedelta
 from datetime import datetime
-from horse_race_simulator.race_data.race_details import DelayedRace
+from horse_race_simulator.race_data.race_details import Race, DelayedRace
 
 class TestRace(unittest.TestCase):
     
@@ -82,5 +83,18 @@ class TestRace(unittest.TestCase):
         print("Running test_get_race_info")
         self.race.get_race_info() 
 
+    def test_reproducible(self):
+        print("Running test_reproducible")
+        def details(race):
+            return race.venue, race.weather, race.prize, [(horse.horse_id, horse.speed) for horse in race.horses]
+        random.seed(0)
+        first = details(Race(num_horses=self.num_horses))
+        random.seed(0) # the shared random module decides the whole race
+        self.assertEqual(details(Race(num_horses=self.num_horses)), first)
+        state = random.getstate()
+        seeded = details(Race(num_horses=self.num_horses, rng=random.Random(7)))
+        self.assertEqual(random.getstate(), state) # a race with its own rng leaves the shared state alone
+        self.assertEqual(details(Race(num_horses=self.num_horses, rng=random.Random(7))), seeded)
+
 if __name__ == "__main__":
     unittest.main(argv=[''], verbosity=2, exit=False)
\ No newline at end of file
@@ -82,6 +82,38 @@ class TestRaceResults(unittest.TestCase):
         position = self.race_results.get_horse_position(self.horse_times, invalid_horse_id)
         self.assertEqual(position, -1)
 
+    def test_get_horse_timing_data_frame(self):
+        print("Running test_get_horse_timing_data_frame")
+        data = self.race_results.data
+        self.assertEqual(list(data.columns), ['horse_id', 'steps1', 'steps2', 'steps3', 'steps4', 'result', 'finish_time'])
+        self.assertEqual(data['result'].tolist(), [1, 2, 3])
+        for location, expected in zip(data['steps4'], [1, 100 / 120, 100 / 140]):
+            self.assertAlmostEqual(location, RaceResults.track_length * expected)
+        self.assertEqual(data['steps1'].iloc[0], RaceResults.track_length * 0.25)
+        # ties keep the order the horses were given, the same as get_horse_position
+        tied_times = {horse_id: dict(self.horse_times[self.horse1.horse_id]) for horse_id in (3003, 1001, 2002)}
+        tied = self.race_results.get_horse_timing_data_frame(tied_times)
+        self.assertEqual(tied['result'].tolist(), [1, 2, 3])
+        for horse_id, position in zip(tied['horse_id'], tied['result']):
+            self.assertEqual(self.race_results.get_horse_position(tied_times, horse_id), position)
+
+    def test_large_field_display(self):
+        print("Running test_large_field_display")
+        horses = [Horse(i, 3, 120, "Colt", 60, 1) for i in range(1, 101)]
+        times = {horse.horse_id: {"Overall Time": 200.0 - horse.horse_id, "Leg 1 Time": 50.0, "Leg 2 Time": 100.0, "Leg 3 Time": 150.0} for horse in horses}
+        results = RaceResults(self.race, horses, times)
+        self.assertEqual(results.get_horse_age(57), 3)
+        self.assertIsNone(results.find_horse_by_id(1000))
+        with patch('builtins.print') as mock_print:
+            results.display_leaderboard()
+        lines = [call.args[0] for call in mock_print.call_args_list]
+        self.assertIn("... 80 more horses not shown", lines) # only display_limit rows are printed
+        self.assertLess(len(lines), 40)
+        self.assertTrue(lines[-1].startswith("\n🎉 Winner: 100 "))
+        with patch('builtins.print') as mock_print:
+            results.generate_race_summary()
+        self.assertLess(mock_print.call_count, 4 * (RaceResults.display_limit + 1) + 20)
+
     @patch('builtins.input', side_effect=['A', 'B', '1234', 'C', 'horseId', 00000, 2002, 'D'])  # Mock input to simulate inputs
     def test_display_options_and_getters(self, mock_input): # extra test, just making sure no exception raised when printing info
         print("Running test_display_options_and_getters")
@@ -1,9 +1,34 @@
+import sys
 import unittest
 from random import seed
-from horse_race_simulator.simulation.race_simulator import RaceSimulation
+from unittest.mock import patch, MagicMock
+from horse_race_simulator.simulation.race_simulator import RaceSimulation, HeadlessRaceSimulation
 from horse_race_simulator.race_data.race_details import Race
 from horse_race_simulator.race_data.track_data import Track
 
+class FakeScreen:
+    """Stand-in for turtle.Screen that runs timer callbacks in order without a display"""
+    def __init__(self):
+        self.callbacks = []
+        self.updates = 0
+        self.closed = False
+
+    def ontimer(self, callback, delay):
+        self.callbacks.append(callback)
+
+    def update(self):
+        self.updates += 1
+
+    def bye(self):
+        self.closed = True
+
+    def __getattr__(self, name): # title, bgcolor, setup, tracer
+        return lambda *args, **kwargs: None
+
+def fake_mainloop(screen):
+    while screen.callbacks and not screen.closed:
+        screen.callbacks.pop(0)()
+
 class TestRaceSimulation(unittest.TestCase):
 
     def setUp(self):
@@ -50,5 +75,66 @@ class TestRaceSimulation(unittest.TestCase):
         winning_horse_id = self.simulation.get_winning_horse_id()
         self.assertEqual(winning_horse_id, 3614)
 
+    def test_render_independent_of_draw_speed(self):
+        print("Running test_render_independent_of_draw_speed")
+        results = []
+        frames = []
+        for frame_seconds in (0.05, 0.5): # a fast renderer and one that falls ten ticks behind per frame
+            seed(3)
+            screen = FakeScreen()
+            clock = iter(i * frame_seconds for i in range(10**6))
+            fake_turtle = MagicMock()
+            fake_turtle.mainloop.side_effect = lambda: fake_mainloop(screen)
+            with patch.dict(sys.modules, {"turtle": fake_turtle}), \
+                 patch.object(RaceSimulation, "open_screen", return_value=screen), \
+                 patch("horse_race_simulator.simulation.race_simulator.time.perf_counter", side_effect=lambda: next(clock)):
+                simulation = RaceSimulation(self.race, self.track)
+                simulation.start_race()
+            self.assertTrue(screen.closed)
+            self.assertEqual(len(simulation.horse_turtles), len(self.race.horses))
+            results.append(simulation.final_results)
+            frames.append(screen.updates)
+        self.assertEqual(results[0], results[1]) # race outcome and times do not depend on drawing speed
+        self.assertLess(frames[1], frames[0]) # the slow renderer skips frames
+
+    def test_headless_start_race(self):
+        print("Running test_headless_start_race")
+        simulation = HeadlessRaceSimulation(self.race, self.track, seed=1)
+        simulation.start_race()
+        self.assertIsNone(simulation.screen) # no graphics window in headless mode
+        self.assertEqual(len(simulation.final_results), len(self.race.horses)) # every horse finishes
+        positions = sorted(result["final_position"] for result in simulation.final_results.values())
+        self.assertEqual(positions, list(range(1, len(self.race.horses) + 1)))
+        for horse_id, times in simulation.get_times().items():
+            # legs are crossed in order on the simulated clock
+            self.assertGreater(times["Leg 1 Time"], 0)
+            self.assertLessEqual(times["Leg 1 Time"], times["Leg 2 Time"])
+            self.assertLessEqual(times["Leg 2 Time"], times["Leg 3 Time"])
+            self.assertLessEqual(times["Leg 3 Time"], times["Overall Time"])
+        self.assertAlmostEqual(max(t["Overall Time"] for t in simulation.get_times().values()), simulation.ticks * simulation.tick_seconds)
+
+    def test_headless_seed_reproducible(self):
+        print("Running test_headless_seed_reproducible")
+        first = HeadlessRaceSimulation(self.race, self.track, seed=42)
+        first.start_race()
+        second = HeadlessRaceSimulation(self.race, self.track, seed=42)
+        second.start_race()
+        self.assertEqual(first.final_results, second.final_results) # same seed gives the same race
+        self.assertEqual(first.get_winning_horse_id(), second.get_winning_horse_id())
+
+    def test_large_field(self):
+        print("Running test_large_field")
+        race = Race(num_horses=300)
+        simulation = HeadlessRaceSimulation(race, race.track, seed=3)
+        simulation.start_race()
+        self.assertEqual(len(simulation.final_results), 300)
+        self.assertEqual(len(simulation.finished), 300)
+        self.assertEqual(sorted(result["final_position"] for result in simulation.final_results.values()), list(range(1, 301)))
+        y_positions, lane_width = simulation.lane_layout(5)
+        self.assertEqual(y_positions, [-100, -50, 0, 50, 100]) # the original five lane layout
+        y_positions, lane_width = simulation.lane_layout(300)
+        self.assertEqual(len(y_positions), 300)
+        self.assertTrue(-125 < y_positions[0] < y_positions[-1] < 125)
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,111 @@
+# test_results_writer.py
+
+import importlib.util
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+from random import seed
+import pandas as pd
+from horse_race_simulator.race_data.race_details import Race
+from horse_race_simulator.simulation.season import SeasonRunner
+from horse_race_simulator.simulation.results_writer import ResultsWriter, RESULT_COLUMNS, race_rows
+
+HAS_PYARROW = importlib.util.find_spec("pyarrow") is not None
+
+class TestResultsWriter(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        print("setUpClass for testing ResultsWriter.")
+        seed(0)
+        cls.races = [Race() for _ in range(6)]
+        cls.season = SeasonRunner(workers=1, master_seed=5).run(cls.races)
+
+    @classmethod
+    def tearDownClass(cls):
+        print("tearDownClass for testing ResultsWriter.")
+        cls.races = None
+        cls.season = None
+
+    def setUp(self):
+        print("Setting up results writer test")
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        print("Tearing down after results writer test.")
+        shutil.rmtree(self.directory)
+
+    def test_race_rows(self):
+        print("Running test_race_rows")
+        times = {7: {"Overall Time": 10.0, "Leg 1 Time": 2.0, "Leg 2 Time": 5.0, "Leg 3 Time": 7.5},
+                 3: {"Overall Time": 9.0, "Leg 1 Time": 2.5, "Leg 2 Time": 4.0, "Leg 3 Time": 7.0}}
+        rows = race_rows(1, times)
+        self.assertEqual(rows[0], (1, 3, 1, 1, 9.0, 2.5, 1.5, 3.0, 2.0)) # sectional times add up to the finish time
+        self.assertEqual(rows[1], (1, 7, 2, 0, 10.0, 2.0, 3.0, 2.5, 2.5))
+
+    def test_csv(self):
+        print("Running test_csv")
+        path = os.path.join(self.directory, "results.csv")
+        with ResultsWriter(path, batch_size=7) as writer: # several batches, the last one partial
+            for result in self.season:
+                writer.add_race(result["race_id"], result["horse_times"])
+        with ResultsWriter(path) as writer: # append to the same file without a second header
+            writer.add_race(-1, self.season[0]["horse_times"])
+        data = pd.read_csv(path)
+        self.assertEqual(list(data.columns), RESULT_COLUMNS)
+        self.assertEqual(len(data), sum(len(race.horses) for race in self.races) + len(self.races[0].horses))
+        self.assertEqual(data.groupby("race_id")["won"].sum().tolist(), [1] * (len(self.races) + 1))
+        first = pd.DataFrame(self.season[0]["results"]).sort_values("result")
+        written = data[data["race_id"] == self.season[0]["race_id"]]
+        self.assertEqual(written["horse_id"].tolist(), first["horse_id"].tolist()) # same order as RaceResults
+
+    def test_sqlite_season(self):
+        print("Running test_sqlite_season")
+        path = os.path.join(self.directory, "results.db")
+        writer = ResultsWriter(path, batch_size=3, max_pending=1)
+        runner = SeasonRunner(workers=1, master_seed=5)
+        self.assertEqual(runner.run(self.races, writer=writer), []) # only aggregates are kept in memory
+        writer.flush()
+        self.assertEqual(writer.rows_written, sum(len(race.horses) for race in self.races))
+        self.assertEqual(runner.summary["races"], len(self.races))
+        self.assertEqual(runner.summary["horses"], writer.rows_written)
+        self.assertEqual(runner.summary["fastest"]["winning_time"], min(result["winning_time"] for result in self.season))
+        writer.close()
+        with sqlite3.connect(path) as connection:
+            count, races = connection.execute("SELECT COUNT(*), COUNT(DISTINCT race_id) FROM runs").fetchone()
+        self.assertEqual((count, races), (writer.rows_written, len(self.races)))
+        with self.assertRaises(ValueError):
+            writer.add_race(1, self.season[0]["horse_times"])
+
+    @unittest.skipUnless(HAS_PYARROW, "writing Parquet needs pyarrow")
+    def test_parquet(self):
+        print("Running test_parquet")
+        path = os.path.join(self.directory, "results.parquet")
+        with ResultsWriter(path, batch_size=7) as writer:
+            for result in self.season:
+                writer.add_race(result["race_id"], result["horse_times"])
+        data = pd.read_parquet(path)
+        self.assertEqual(list(data.columns), RESULT_COLUMNS)
+        self.assertEqual(len(data), sum(len(race.horses) for race in self.races))
+        self.assertEqual(data.groupby("race_id")["won"].sum().tolist(), [1] * len(self.races))
+        with self.assertRaises(FileExistsError): # an existing file is never overwritten
+            ResultsWriter(path)
+        self.assertEqual(len(pd.read_parquet(path)), len(data))
+
+    def test_errors(self):
+        print("Running test_errors")
+        with self.assertRaises(ValueError):
+            ResultsWriter(os.path.join(self.directory, "results.txt"))
+        with self.assertRaises(ValueError): # table names go into the SQL text, so only identifiers are accepted
+            ResultsWriter(os.path.join(self.directory, "results.db"), table="runs; DROP TABLE runs")
+        writer = ResultsWriter(os.path.join(self.directory, "missing", "results.csv")) # directory does not exist
+        with self.assertRaises(OSError): # raised from the writer thread by the next call
+            writer.add_race(1, self.season[0]["horse_times"])
+            writer.close()
+        writer.close()
+        self.assertFalse(writer.thread.is_alive())
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,51 @@
+# test_season.py
+
+import unittest
+from random import seed
+from horse_race_simulator.race_data.race_details import Race, DelayedRace
+from horse_race_simulator.simulation.season import SeasonRunner
+
+class TestSeasonRunner(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        print("setUpClass for testing SeasonRunner.")
+        seed(0)
+        cls.races = [Race(), DelayedRace(), Race(num_horses=3), DelayedRace(num_horses=4)]
+
+    @classmethod
+    def tearDownClass(cls):
+        print("tearDownClass for testing SeasonRunner.")
+        cls.races = None
+
+    def setUp(self):
+        print("Setting up season test")
+        self.runner = SeasonRunner(workers=2, master_seed=11)
+
+    def tearDown(self):
+        print("Tearing down after season test.")
+        self.runner = None
+
+    def test_run(self):
+        print("Running test_run")
+        results = self.runner.run(self.races)
+        self.assertEqual([result["race_number"] for result in results], [0, 1, 2, 3]) # merged in race order
+        for race, result in zip(self.races, results):
+            self.assertEqual(result["race_id"], race.race_id)
+            self.assertEqual(len(result["results"]), len(race.horses)) # every horse is scored
+            self.assertIn(result["winning_horse_id"], [horse.horse_id for horse in race.horses])
+        self.assertGreater(self.runner.races_per_second, 0)
+        self.assertEqual(self.runner.summary["races"], len(self.races))
+        self.assertEqual(self.runner.summary["horses"], sum(len(race.horses) for race in self.races))
+        self.runner.get_season_info()
+
+    def test_reproducible(self):
+        print("Running test_reproducible")
+        parallel = self.runner.run(self.races)
+        serial = SeasonRunner(workers=1, master_seed=11).run(self.races)
+        self.assertEqual(parallel, serial) # same master seed, same season, whatever the worker count
+        other = SeasonRunner(workers=1, master_seed=12).run(self.races)
+        self.assertNotEqual([r["results"] for r in other], [r["results"] for r in serial])
+
+if __name__ == "__main__":
+    unittest.main()
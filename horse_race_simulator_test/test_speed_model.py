@@ -0,0 +1,82 @@
+# test_speed_model.py
+
+import os
+import random
+import shutil
+import tempfile
+import unittest
+import numpy as np
+import pandas as pd
+from horse_race_simulator.race_data.data_cache import resolve_data_path
+from horse_race_simulator.race_data.horse_stats import Horse, HorseTable
+from horse_race_simulator.race_data.speed_model import SpeedModel, MODEL_NAME, BASE_SPEED
+
+class TestSpeedModel(unittest.TestCase):
+
+    def setUp(self):
+        print("Setting up speed model test")
+        self.directory = tempfile.mkdtemp()
+        self.csv_filename = os.path.join(self.directory, "runs.csv")
+        shutil.copy(resolve_data_path("runs.csv"), self.csv_filename)
+
+    def tearDown(self):
+        print("Tearing down after speed model test.")
+        Horse.speed_model = None
+        SpeedModel._models.clear()
+        shutil.rmtree(self.directory)
+
+    def test_fit(self):
+        print("Running test_fit")
+        runs = pd.DataFrame({
+            'horse_rating': [60] * 30 + [90] * 5,
+            'horse_age': [3] * 35,
+            'actual_weight': [122] * 35,
+            'finish_time': np.linspace(70, 76, 30).tolist() + [70.0] * 5,
+            'time1': [20.0] * 35, 'time2': [25.0] * 35, 'time3': [25.0] * 35,
+            'time4': [np.nan] * 35, 'time5': [np.nan] * 35, 'time6': [np.nan] * 35,
+        })
+        model = SpeedModel.fit(runs, levels=5, min_runs=20)
+        self.assertEqual(model.quantiles.shape, (6, 4, 5, 5))
+        self.assertEqual(model.counts.sum(), 35)
+        self.assertTrue((np.diff(model.quantiles, axis=-1) >= 0).all())
+        full = model.quantiles[2, 1, 2] # rating 60, age 3, weight 122
+        self.assertAlmostEqual(full.mean(), BASE_SPEED, delta=1) # the average run is scaled to BASE_SPEED
+        # 5 runs rated 90 are too few, so that bucket falls back to all runs, like the empty buckets
+        np.testing.assert_array_equal(model.quantiles[5, 1, 2], model.quantiles[0, 0, 0])
+        self.assertFalse(np.array_equal(model.quantiles[5, 1, 2], full))
+        speeds = model.draw(np.full(1000, 60), np.full(1000, 3), np.full(1000, 122), np.random.default_rng(0))
+        self.assertTrue(((speeds >= full[0] - 0.01) & (speeds <= full[-1] + 0.01)).all())
+        self.assertTrue(full[0] - 0.01 <= model.draw_one(60, 3, 122) <= full[-1] + 0.01)
+        self.assertEqual(model.draw_one(60, 3, 122, random.Random(7)), model.draw_one(60, 3, 122, random.Random(7)))
+
+    def test_load_cache(self):
+        print("Running test_load_cache")
+        model = SpeedModel.load(self.csv_filename)
+        path = os.path.join(f"{self.csv_filename}.cache", MODEL_NAME)
+        self.assertTrue(os.path.exists(path))
+        self.assertIs(SpeedModel.load(self.csv_filename), model) # already loaded in this process
+        SpeedModel._models.clear()
+        reloaded = SpeedModel.load(self.csv_filename) # read back from disk
+        np.testing.assert_array_equal(reloaded.quantiles, model.quantiles)
+
+        with open(self.csv_filename, "a") as csv_file: # a changed data set is refitted
+            csv_file.write("99999,1,1,1,1,0,3,AUS,Gelding,60,--,1000,120,1,1,1,1,,,,1,1,1,,,,20,25,25,,,,70,3,1.5,1,1\n")
+        refitted = SpeedModel.load(self.csv_filename)
+        self.assertNotEqual(refitted.source_hash, model.source_hash)
+        self.assertEqual(refitted.counts.sum(), model.counts.sum() + 1)
+
+    def test_horse_speed_model(self):
+        print("Running test_horse_speed_model")
+        model = Horse.use_speed_model(self.csv_filename)
+        low, high = model.quantiles[..., 0].min(), model.quantiles[..., -1].max()
+        horse = Horse(1, 3, 120, "Gelding", 60, 1)
+        self.assertTrue(low - 0.01 <= horse.speed <= high + 0.01)
+        speeds = [Horse(1, 3, 120, "Gelding", 60, 1, rng=random.Random(3)).speed for _ in range(2)]
+        self.assertEqual(speeds[0], speeds[1]) # a seeded race gets the same speeds from the model
+        table = HorseTable(np.arange(500), np.full(500, 3), np.full(500, 120), ["Gelding"] * 500, np.full(500, 60), np.ones(500), rng=np.random.default_rng(1))
+        self.assertTrue(((table.speed >= low - 0.01) & (table.speed <= high + 0.01)).all())
+        Horse.speed_model = None
+        self.assertTrue(30 <= Horse(1, 3, 120, "Gelding", 60, 1).speed <= 60) # the fixed rules again
+
+if __name__ == "__main__":
+    unittest.main()
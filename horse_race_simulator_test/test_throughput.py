@@ -0,0 +1,36 @@
+# test_throughput.py
+
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+from horse_race_simulator.race_data.horse_stats import HorsePool
+from horse_race_simulator_bench import throughput
+from horse_race_simulator_bench.throughput import make_dataset, sweep
+
+class TestThroughput(unittest.TestCase):
+
+    def setUp(self):
+        print("Setting up throughput test")
+
+    def tearDown(self):
+        print("Tearing down after throughput test.")
+
+    def test_sweep(self):
+        print("Running test_sweep")
+        rows = sweep([1], [3, 12], [1], races=4)
+        self.assertEqual([(row["workers"], row["horses"]) for row in rows], [(1, 3), (1, 12)])
+        for row in rows:
+            self.assertGreater(row["races_per_second"], 0)
+            self.assertLessEqual(row["p50_ms"], row["p99_ms"])
+            self.assertGreater(row["peak_rss_mb"], 0)
+        with patch.object(throughput, "resource", None): # as on Windows
+            self.assertIsNone(sweep([1], [3], [1], races=2)[0]["peak_rss_mb"])
+        directory = tempfile.mkdtemp()
+        path, rows = make_dataset(2, directory)
+        pool = HorsePool(path)
+        self.assertEqual(len(pool.horse_ids), 2 * len(HorsePool.load("runs.csv").horse_ids)) # repeated with new horse IDs
+        shutil.rmtree(directory) # the data set and its cache
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,87 @@
+# test_trajectory.py
+
+import os
+import sys
+import tempfile
+import unittest
+from random import seed
+from unittest.mock import patch, MagicMock
+from horse_race_simulator.race_data.race_details import Race
+from horse_race_simulator.simulation.race_simulator import HeadlessRaceSimulation, ReplaySimulation
+from horse_race_simulator.simulation.trajectory import TrajectoryRecording
+from horse_race_simulator_test.test_race_simulator import FakeScreen, fake_mainloop
+
+class TestTrajectoryRecording(unittest.TestCase):
+
+    def setUp(self):
+        print("Setting up trajectory test")
+        seed(0)
+        self.race = Race()
+        self.simulation = HeadlessRaceSimulation(self.race, self.race.track, seed=2, record=True)
+        self.simulation.start_race()
+        self.recording = self.simulation.recording
+
+    def tearDown(self):
+        print("Tearing down after trajectory test.")
+        self.simulation = None
+        self.recording = None
+
+    def test_record_tick(self):
+        print("Running test_record_tick")
+        self.assertEqual(self.recording.num_ticks, self.simulation.ticks + 1) # start line plus one entry per tick
+        self.assertEqual(self.recording.horse_ids, [horse.horse_id for horse in self.race.horses])
+        start = -0.3 * self.race.distance / 2
+        self.assertEqual(self.recording.positions_at(0), [start] * len(self.race.horses))
+        for x in self.recording.positions_at(self.recording.num_ticks - 1):
+            self.assertGreaterEqual(x, self.simulation.finish_line - 1e-3) # float32 storage
+        self.assertEqual(self.recording.to_array().shape, (self.recording.num_ticks, len(self.race.horses)))
+        small = TrajectoryRecording([1, 2], ("Pony Speedway", 1000), ("Sunny", 0), 0.05, capacity=1)
+        for tick in range(5):
+            small.record_tick([tick, tick * 2])
+        self.assertEqual(len(small.buffer), 16) # grown geometrically: 2 -> 4 -> 8 -> 16 values
+        self.assertEqual(small.positions_at(4), [4.0, 8.0])
+        empty = TrajectoryRecording([1, 2], ("Pony Speedway", 1000), ("Sunny", 0), 0.05)
+        with self.assertRaises(ValueError):
+            empty.positions_at(0)
+
+    def test_save_load_replay(self):
+        print("Running test_save_load_replay")
+        path = os.path.join(tempfile.mkdtemp(), "race.npz")
+        self.recording.save(path)
+        loaded = TrajectoryRecording.load(path)
+        os.remove(path)
+        self.assertEqual(loaded.horse_ids, self.recording.horse_ids)
+        self.assertEqual(loaded.track_venue, self.recording.track_venue)
+        self.assertEqual(loaded.to_array().tolist(), self.recording.to_array().tolist())
+        loaded.replay_text()
+
+        screen = FakeScreen()
+        fake_turtle = MagicMock()
+        fake_turtle.mainloop.side_effect = lambda: fake_mainloop(screen)
+        clock = iter(i * 0.05 for i in range(10**6))
+        with patch.dict(sys.modules, {"turtle": fake_turtle}), \
+             patch.object(ReplaySimulation, "open_screen", return_value=screen), \
+             patch("horse_race_simulator.simulation.race_simulator.time.perf_counter", side_effect=lambda: next(clock)):
+            replay = ReplaySimulation(loaded)
+            replay.start_replay()
+        self.assertTrue(screen.closed)
+        self.assertEqual(replay.ticks, loaded.num_ticks - 1) # every recorded tick was played
+        self.assertEqual([race_horse.xcor() for race_horse, _ in replay.horse_objects], loaded.positions_at(loaded.num_ticks - 1))
+
+    def test_replay_finish_order(self):
+        print("Running test_replay_finish_order")
+        recording = TrajectoryRecording([1, 2, 3], ("Pony Speedway", 1000), ("Sunny", 0), 0.05)
+        for positions in ([-150, -150, -150], [0, 150, -50], [150, 150, 100], [151, 150, 149.99]):
+            recording.record_tick(positions)
+        replay = ReplaySimulation(recording)
+        replay.place_horses(replay.set_markers())
+        lanes = [race_horse for race_horse, _ in replay.horse_objects]
+        replay.update_position()
+        self.assertEqual(replay.finished_horses, [lanes[1]]) # finished on the tick it reached the line
+        replay.update_position()
+        self.assertEqual(replay.finished_horses, [lanes[1], lanes[0]])
+        replay.update_position() # horse 3 stays short of the line and finishes with the recording
+        self.assertEqual(replay.finished_horses, [lanes[1], lanes[0], lanes[2]])
+
+if __name__ == "__main__":
+    unittest.main()
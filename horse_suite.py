@@ -5,27 +5,114 @@ from horse_race_simulator_test.test_track_data import TestTrack
 from horse_race_simulator_test.test_race_simulator import TestRaceSimulation
 from horse_race_simulator_test.test_race_details import TestRace
 from horse_race_simulator_test.test_race_results import TestRaceResults
+from horse_race_simulator_test.test_batch_simulator import TestBatchRaceSimulation
+from horse_race_simulator_test.test_odds import TestOddsEngine
+from horse_race_simulator_test.test_season import TestSeasonRunner
+from horse_race_simulator_test.test_data_cache import TestDataCache
+from horse_race_simulator_test.test_package_import import TestPackageImport
+from horse_race_simulator_test.test_horse_history import TestHorseHistoryIndex
+from horse_race_simulator_test.test_event_simulator import TestEventRaceSimulation
+from horse_race_simulator_test.test_trajectory import TestTrajectoryRecording
+from horse_race_simulator_test.test_microbench import TestMicrobench
+from horse_race_simulator_test.test_throughput import TestThroughput
+from horse_race_simulator_test.test_instrumentation import TestInstrumentation
+from horse_race_simulator_test.test_results_writer import TestResultsWriter
+from horse_race_simulator_test.test_history_store import TestHistoryStore
+from horse_race_simulator_test.test_betting_pool import TestBettingPool
+from horse_race_simulator_test.test_betting_server import TestBettingServer
+from horse_race_simulator_test.test_race_cli import TestRaceCli
+from horse_race_simulator_test.test_backtest import TestBacktester
+from horse_race_simulator_test.test_historical_replay import TestHistoricalReplay
+from horse_race_simulator_test.test_speed_model import TestSpeedModel
 
 def horse_suite(): # temporary name, please feel free to change if you have a preference
     suite = unittest.TestSuite()
     result = unittest.TestResult()
     suite.addTest(TestHorse('test_horse_creation'))
     suite.addTest(TestHorse('test_update_horse_stats'))
+    suite.addTest(TestHorse('test_horse_pool'))
+    suite.addTest(TestHorse('test_horse_table'))
     suite.addTest(TestUser('test_balance_horse_id'))
     suite.addTest(TestUser('test_take_bet'))
+    suite.addTest(TestUser('test_settle_bet'))
     suite.addTest(TestTrack('test_create_track'))
     suite.addTest(TestTrack('test_weather_factor'))
     suite.addTest(TestTrack('test_get_track_info'))
     suite.addTest(TestRaceSimulation('test_start_race'))
     suite.addTest(TestRaceSimulation('test_get_times'))
     suite.addTest(TestRaceSimulation('test_get_winning_horse_id'))
+    suite.addTest(TestRaceSimulation('test_render_independent_of_draw_speed'))
+    suite.addTest(TestRaceSimulation('test_headless_start_race'))
+    suite.addTest(TestRaceSimulation('test_headless_seed_reproducible'))
+    suite.addTest(TestRaceSimulation('test_large_field'))
     suite.addTest(TestRace('test_constructor'))
     suite.addTest(TestRace('test_set_delayed_date'))
     suite.addTest(TestRace('test_set_date'))
     suite.addTest(TestRace('test_get_race_info'))
+    suite.addTest(TestRace('test_reproducible'))
     suite.addTest(TestRaceResults('test_constructor'))
     suite.addTest(TestRaceResults('test_get_horse_position'))
+    suite.addTest(TestRaceResults('test_get_horse_timing_data_frame'))
+    suite.addTest(TestRaceResults('test_large_field_display'))
     suite.addTest(TestRaceResults('test_display_options_and_getters'))
+    suite.addTest(TestBatchRaceSimulation('test_start_race'))
+    suite.addTest(TestBatchRaceSimulation('test_positions_and_winners'))
+    suite.addTest(TestBatchRaceSimulation('test_get_times'))
+    suite.addTest(TestOddsEngine('test_estimate_odds'))
+    suite.addTest(TestOddsEngine('test_time_budget'))
+    suite.addTest(TestSeasonRunner('test_run'))
+    suite.addTest(TestSeasonRunner('test_reproducible'))
+    suite.addTest(TestDataCache('test_load'))
+    suite.addTest(TestDataCache('test_invalidation'))
+    suite.addTest(TestDataCache('test_concurrent_builds'))
+    suite.addTest(TestPackageImport('test_cold_import'))
+    suite.addTest(TestPackageImport('test_any_working_directory'))
+    suite.addTest(TestPackageImport('test_layering'))
+    suite.addTest(TestHorseHistoryIndex('test_lookup'))
+    suite.addTest(TestHorseHistoryIndex('test_append'))
+    suite.addTest(TestHorseHistoryIndex('test_append_race_once'))
+    suite.addTest(TestEventRaceSimulation('test_start_race'))
+    suite.addTest(TestEventRaceSimulation('test_exact_crossing_times'))
+    suite.addTest(TestEventRaceSimulation('test_record'))
+    suite.addTest(TestTrajectoryRecording('test_record_tick'))
+    suite.addTest(TestTrajectoryRecording('test_save_load_replay'))
+    suite.addTest(TestTrajectoryRecording('test_replay_finish_order'))
+    suite.addTest(TestMicrobench('test_run_benchmarks'))
+    suite.addTest(TestMicrobench('test_compare_to_baseline'))
+    suite.addTest(TestThroughput('test_sweep'))
+    suite.addTest(TestInstrumentation('test_disabled'))
+    suite.addTest(TestInstrumentation('test_enabled'))
+    suite.addTest(TestInstrumentation('test_profile_next_race'))
+    suite.addTest(TestResultsWriter('test_race_rows'))
+    suite.addTest(TestResultsWriter('test_csv'))
+    suite.addTest(TestResultsWriter('test_sqlite_season'))
+    suite.addTest(TestResultsWriter('test_parquet'))
+    suite.addTest(TestResultsWriter('test_errors'))
+    suite.addTest(TestHistoryStore('test_ingest_lookup'))
+    suite.addTest(TestHistoryStore('test_concurrent_readers'))
+    suite.addTest(TestHistoryStore('test_race_results_store'))
+    suite.addTest(TestBettingPool('test_pool_totals_and_odds'))
+    suite.addTest(TestBettingPool('test_non_finite_stakes'))
+    suite.addTest(TestBettingPool('test_settle'))
+    suite.addTest(TestBettingPool('test_refund_when_winner_unbacked'))
+    suite.addTest(TestBettingPool('test_house_share'))
+    suite.addTest(TestBettingPool('test_many_bettors'))
+    suite.addTest(TestBettingServer('test_session'))
+    suite.addTest(TestBettingServer('test_load'))
+    suite.addTest(TestRaceCli('test_strategies'))
+    suite.addTest(TestRaceCli('test_run_races'))
+    suite.addTest(TestRaceCli('test_main_jsonl'))
+    suite.addTest(TestBacktester('test_select_bets'))
+    suite.addTest(TestBacktester('test_settle'))
+    suite.addTest(TestBacktester('test_historical'))
+    suite.addTest(TestBacktester('test_simulated_reproducible'))
+    suite.addTest(TestBacktester('test_simulated_odds_cap'))
+    suite.addTest(TestHistoricalReplay('test_reconstruction'))
+    suite.addTest(TestHistoricalReplay('test_results_and_recording'))
+    suite.addTest(TestHistoricalReplay('test_compare_to_simulation'))
+    suite.addTest(TestSpeedModel('test_fit'))
+    suite.addTest(TestSpeedModel('test_load_cache'))
+    suite.addTest(TestSpeedModel('test_horse_speed_model'))
     runner = unittest.TextTestRunner()
     print(runner.run(suite))
 
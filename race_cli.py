@@ -0,0 +1,116 @@
+# race_cli.py
+#
+# Runs races without any prompts, betting on each one with a scripted strategy,
+# and streams every result and the running balance to stdout.
+#
+#     python race_cli.py --races 100 --strategy favourite --stake 10 --seed 1
+#     python race_cli.py --races 100 --strategy random --format jsonl > runs.jsonl
+
+import argparse
+import json
+import random
+import sys
+import numpy as np
+from horse_race_simulator.race_data.race_details import Race
+from horse_race_simulator.simulation.race_simulator import HeadlessRaceSimulation
+from horse_race_simulator.simulation.odds import OddsEngine
+from horse_race_simulator.simulation.betting import User
+from horse_race_simulator.simulation.strategies import STRATEGIES, ODDS_STRATEGIES, select_horse
+
+def run_races(races, strategy="favourite", stake=10.0, seed=None, num_horses=5, start_balance=1000, odds_samples=2000, fixed_odds=2.0, csv_filename="runs.csv"):
+    """Runs 'races' races headless, betting 'stake' on the horse picked by 'strategy'
+    in each, and yields one record per race. The horse is picked by scoring the race's runs
+    like Backtester, with the estimated odds as win_odds. Stops early when the balance cannot cover the stake.
+    Args:
+        races (int): number of races to run
+        strategy (str): bet selection strategy, one of STRATEGIES
+        stake (float): amount bet on every race
+        seed (int): seeds the race cards, odds and simulations, so the same seed gives the same records (apart from race_id)
+        num_horses (int): horses per race
+        start_balance (float): balance before the first race
+        odds_samples (int): simulated races used by OddsEngine to price each race, 0 pays 'fixed_odds' instead
+        fixed_odds (float): odds paid on a win when odds_samples is 0
+        csv_filename: data set the horses are drawn from
+    Yields:
+        dict: race number, race details, horse backed, its odds, winner, winning time, payout and balance
+    """
+    if odds_samples <= 0 and strategy in ODDS_STRATEGIES:
+        raise ValueError(f"The '{strategy}' strategy needs estimated odds, odds_samples must be greater than zero")
+    if stake <= 0:
+        raise ValueError("Bet amount must be greater than zero")
+    race_rng = random.Random(seed) # race cards
+    pick_rng = np.random.default_rng(seed) # strategies that score at random
+    user = User(start_balance=start_balance)
+
+    for race_number in range(races):
+        if stake > user.balance:
+            return
+        race = Race(num_horses=num_horses, csv_filename=csv_filename, rng=race_rng)
+        race_seed = None if seed is None else seed + race_number
+        if odds_samples > 0:
+            # no time budget, so the number of samples (and the odds) only depend on the seed
+            engine = OddsEngine(race, max_samples=odds_samples, time_budget=float("inf"), seed=race_seed)
+            odds = {horse_id: horse_odds["odds"] for horse_id, horse_odds in engine.estimate_odds().items()}
+        else:
+            odds = {horse.horse_id: fixed_odds for horse in race.horses}
+        selected_horse_id = select_horse(strategy, race, odds, pick_rng)
+
+        user.balance -= stake
+        simulation = HeadlessRaceSimulation(race, race.track, seed=race_seed)
+        simulation.start_race()
+        winning_horse_id = simulation.get_winning_horse_id()
+        payout = user.settle_bet(stake, winning_horse_id, selected_horse_id, odds[selected_horse_id])
+
+        yield {
+            "race_number": race_number,
+            "race_id": race.race_id,
+            "venue": race.venue,
+            "distance": race.distance,
+            "weather": race.weather,
+            "horse_id": selected_horse_id,
+            "odds": odds[selected_horse_id],
+            "stake": stake,
+            "winning_horse_id": winning_horse_id,
+            "winning_time": simulation.final_results[winning_horse_id]["overall_time"],
+            "payout": payout,
+            "balance": user.balance,
+        }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run Horsle races headless with scripted bets.")
+    parser.add_argument("--races", type=int, default=10, help="number of races to run")
+    parser.add_argument("--strategy", choices=sorted(STRATEGIES), default="favourite", help="how the horse to back is picked")
+    parser.add_argument("--stake", type=float, default=10.0, help="amount bet on every race")
+    parser.add_argument("--seed", type=int, help="seed for reproducible runs")
+    parser.add_argument("--horses", type=int, default=5, help="horses per race")
+    parser.add_argument("--start-balance", type=float, default=1000)
+    parser.add_argument("--odds-samples", type=int, default=2000, help="simulated races used to price each race, 0 pays --fixed-odds")
+    parser.add_argument("--fixed-odds", type=float, default=2.0)
+    parser.add_argument("--format", choices=["text", "jsonl"], default="text", help="one line of text or one JSON object per race")
+    args = parser.parse_args(argv)
+
+    try:
+        records = run_races(args.races, args.strategy, args.stake, args.seed, args.horses, args.start_balance, args.odds_samples, args.fixed_odds)
+        count, wins, balance = 0, 0, args.start_balance
+        for record in records:
+            count += 1
+            wins += record["payout"] > 0
+            balance = record["balance"]
+            if args.format == "jsonl":
+                print(json.dumps(record), flush=True)
+            else:
+                outcome = f"won ${record['payout']:.2f}" if record["payout"] > 0 else "lost"
+                print(f"Race {record['race_number'] + 1}: backed {record['horse_id']} at {record['odds']:.2f}, "
+                      f"winner {record['winning_horse_id']} in {record['winning_time']:.2f}s, {outcome}, balance ${balance:.2f}", flush=True)
+    except ValueError as er:
+        parser.error(str(er))
+
+    summary = {"races": count, "wins": wins, "start_balance": args.start_balance, "balance": balance, "profit": balance - args.start_balance}
+    if args.format == "jsonl":
+        print(json.dumps({"summary": summary}))
+    else:
+        print(f"Ran {count} races, won {wins}, balance ${balance:.2f} ({summary['profit']:+.2f})")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())